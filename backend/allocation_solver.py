@@ -0,0 +1,221 @@
+"""
+allocation_solver.py - 최적화 기반 자산 배분
+
+카테고리 비중은 평균-분산 QP 로 구합니다.
+    최소화   w' Σ w
+    조건     Σ w = 1,  μ' w ≥ 목표 수익률,  하한 ≤ w ≤ 상한 (투자 성향별)
+카테고리가 4개뿐이라 가능한 활성 제약 조합을 모두 풀어 보는 정확한 active-set 방식을 쓰고,
+가까운 입력에서 찾은 활성 제약 조합을 캐시해 두었다가 먼저 시도(warm start)합니다.
+KKT 조건을 만족하면 전체 탐색 없이 바로 끝납니다.
+
+카테고리 안 종목 비중은 선형계획(기대수익 최대화, 종목당 상/하한)으로 정하며,
+하한을 먼저 배정한 뒤 상한까지 수익률 높은 순서로 채우는 greedy 해가 정확한 최적해입니다.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import product
+from threading import Lock
+from typing import Dict, Optional, Sequence, Tuple
+
+try:
+    from backend.lazy_import import lazy_import
+except ImportError:  # backend 디렉터리에서 직접 실행하는 경우
+    from lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+# 위험 카테고리(현금흐름 제외) 간 상관계수
+RISKY_CORRELATION = 0.5
+_TOL = 1e-9
+
+# 변수별 상태: 0 = 자유, -1 = 하한, 1 = 상한
+ActiveSet = Tuple[Tuple[int, ...], bool]
+
+
+@dataclass(frozen=True)
+class AllocationSolution:
+    weights: Tuple[float, ...]  # CATEGORY_ORDER 순서
+    expected_return: float  # 연 %
+    volatility: float  # 연 %
+    target_return: float  # 연 %
+    target_reachable: bool
+    warm_started: bool
+
+
+def build_covariance(volatility: Sequence[float], cash_index: int = 0) -> np.ndarray:
+    sigma = np.asarray(volatility, dtype=float) / 100
+    corr = np.full((len(sigma), len(sigma)), RISKY_CORRELATION)
+    corr[cash_index, :] = 0.0
+    corr[:, cash_index] = 0.0
+    np.fill_diagonal(corr, 1.0)
+    return corr * np.outer(sigma, sigma)
+
+
+def _solve_active_set(cov: np.ndarray, mu: np.ndarray, lo: np.ndarray, hi: np.ndarray,
+                      target: float, active: ActiveSet) -> Optional[Tuple[np.ndarray, float, float]]:
+    """주어진 활성 제약 조합에서 등식 제약 QP 를 풀어 (w, ν, η) 반환. 풀 수 없으면 None"""
+    states, return_active = active
+    n = len(mu)
+    w = np.zeros(n)
+    free = [i for i in range(n) if states[i] == 0]
+    for i in range(n):
+        if states[i] < 0:
+            w[i] = lo[i]
+        elif states[i] > 0:
+            w[i] = hi[i]
+    fixed_sum = w.sum()
+    if not free:
+        if abs(fixed_sum - 1) > 1e-9 or return_active:
+            return None
+        return w, 0.0, 0.0
+
+    k = len(free)
+    size = k + 1 + (1 if return_active else 0)
+    a = np.zeros((size, size))
+    b = np.zeros(size)
+    cov_ff = cov[np.ix_(free, free)]
+    a[:k, :k] = 2 * cov_ff
+    a[:k, k] = -1.0
+    a[k, :k] = 1.0
+    b[:k] = -2 * cov[free] @ w
+    b[k] = 1 - fixed_sum
+    if return_active:
+        a[:k, k + 1] = -mu[free]
+        a[k + 1, :k] = mu[free]
+        b[k + 1] = target - mu @ w
+    try:
+        x = np.linalg.solve(a, b)
+    except np.linalg.LinAlgError:
+        return None
+    w[free] = x[:k]
+    nu = x[k]
+    eta = x[k + 1] if return_active else 0.0
+    return w, nu, eta
+
+
+def _is_feasible(w: np.ndarray, mu: np.ndarray, lo: np.ndarray, hi: np.ndarray, target: float) -> bool:
+    return bool(np.all(w >= lo - 1e-7) and np.all(w <= hi + 1e-7) and mu @ w >= target - 1e-7)
+
+
+def _is_optimal(cov: np.ndarray, mu: np.ndarray, lo: np.ndarray, hi: np.ndarray, target: float,
+                active: ActiveSet, result: Tuple[np.ndarray, float, float]) -> bool:
+    """KKT 조건 (원 문제 실행 가능 + 라그랑주 승수 부호) 확인"""
+    w, nu, eta = result
+    if not _is_feasible(w, mu, lo, hi, target) or eta < -1e-9:
+        return False
+    grad = 2 * cov @ w - nu - eta * mu
+    for i, state in enumerate(active[0]):
+        if state < 0 and grad[i] < -1e-9:
+            return False
+        if state > 0 and grad[i] > 1e-9:
+            return False
+    return True
+
+
+def max_feasible_return(mu: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> float:
+    """상하한 + 합계 1 조건에서 μ'w 최대값 (수익률 높은 순으로 상한까지 채우는 LP 해)"""
+    w = lo.copy()
+    remaining = 1 - w.sum()
+    for i in np.argsort(-mu):
+        add = min(hi[i] - w[i], remaining)
+        w[i] += add
+        remaining -= add
+    return float(mu @ w)
+
+
+def item_weights(returns: Sequence[float], max_weight: float = 0.6, min_weight: float = 0.1) -> Tuple[float, ...]:
+    """종목 비중 LP: 기대수익 최대화, 종목당 하한 min_weight / 상한 max_weight (종목 수에 맞게 완화)"""
+    n = len(returns)
+    if n == 0:
+        return ()
+    floor = min(min_weight, 1 / n)
+    cap = max(max_weight, 1 / n)
+    weights = [floor] * n
+    remaining = 1.0 - floor * n
+    for i in sorted(range(n), key=lambda j: -returns[j]):
+        add = min(cap - floor, remaining)
+        weights[i] += add
+        remaining -= add
+    return tuple(weights)
+
+
+class AllocationSolver:
+    def __init__(self, cache_size: int = 1024):
+        self.cache_size = cache_size
+        self._active_sets: "OrderedDict[Tuple[str, int], ActiveSet]" = OrderedDict()
+        self._lock = Lock()
+        self._all_active_sets = [
+            (states, return_active)
+            for states in product((0, -1, 1), repeat=4)
+            for return_active in (True, False)
+        ]
+
+    def _cached_active_set(self, risk_level: str, bucket: int) -> Optional[ActiveSet]:
+        with self._lock:
+            for delta in (0, -1, 1, -2, 2):
+                active = self._active_sets.get((risk_level, bucket + delta))
+                if active is not None:
+                    return active
+        return None
+
+    def _remember(self, risk_level: str, bucket: int, active: ActiveSet) -> None:
+        with self._lock:
+            self._active_sets[(risk_level, bucket)] = active
+            self._active_sets.move_to_end((risk_level, bucket))
+            while len(self._active_sets) > self.cache_size:
+                self._active_sets.popitem(last=False)
+
+    def solve(self, risk_level: str, expected_returns: Sequence[float], volatility: Sequence[float],
+              bounds: Sequence[Tuple[float, float]], target_return: float) -> AllocationSolution:
+        """
+        expected_returns/volatility/target_return 은 연 % 단위, bounds 는 (하한, 상한) 비중.
+        목표 수익률이 도달 불가능하면 도달 가능한 최대 수익률을 목표로 삼습니다.
+        """
+        mu = np.asarray(expected_returns, dtype=float) / 100
+        cov = build_covariance(volatility)
+        lo = np.array([b[0] for b in bounds], dtype=float)
+        hi = np.array([b[1] for b in bounds], dtype=float)
+
+        max_return = max_feasible_return(mu, lo, hi)
+        target = target_return / 100
+        reachable = target <= max_return + _TOL
+        target = min(target, max_return - _TOL)
+
+        bucket = int(round(target * 1000))  # 0.1%p 단위로 가까운 입력을 묶음
+        cached = self._cached_active_set(risk_level, bucket)
+        if cached is not None:
+            result = _solve_active_set(cov, mu, lo, hi, target, cached)
+            if result is not None and _is_optimal(cov, mu, lo, hi, target, cached, result):
+                return self._solution(result[0], mu, cov, target_return, reachable, warm_started=True)
+
+        best = None
+        for active in self._all_active_sets:
+            result = _solve_active_set(cov, mu, lo, hi, target, active)
+            if result is None or not _is_feasible(result[0], mu, lo, hi, target):
+                continue
+            variance = float(result[0] @ cov @ result[0])
+            if best is None or variance < best[0] - 1e-15:
+                best = (variance, result[0], active)
+        if best is None:  # 하한 합계 > 1 등 제약 자체가 모순인 경우
+            raise ValueError("allocation bounds are infeasible")
+        self._remember(risk_level, bucket, best[2])
+        return self._solution(best[1], mu, cov, target_return, reachable, warm_started=False)
+
+    @staticmethod
+    def _solution(w: np.ndarray, mu: np.ndarray, cov: np.ndarray, target_return: float,
+                  reachable: bool, warm_started: bool) -> AllocationSolution:
+        w = np.clip(w, 0.0, 1.0)
+        w = w / w.sum()
+        return AllocationSolution(
+            weights=tuple(float(x) for x in w),
+            expected_return=float(mu @ w * 100),
+            volatility=float(np.sqrt(w @ cov @ w) * 100),
+            target_return=target_return,
+            target_reachable=reachable,
+            warm_started=warm_started,
+        )
+
+    def stats(self) -> Dict:
+        return {"cached_active_sets": len(self._active_sets)}
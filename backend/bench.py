@@ -0,0 +1,308 @@
+"""
+bench.py - HolinFlow 마이크로 벤치마크 + 인프로세스 부하 테스트
+
+마이크로 벤치마크는 핫패스 함수를 직접 반복 호출하고, 부하 테스트는 네트워크 없이
+ASGI 앱을 직접 호출해 동시성별 p50/p99 지연과 처리량을 잽니다.
+결과는 JSON 으로 저장하고, 이전 결과와 비교해 느려진 항목이 있으면 종료 코드 1 을 돌려줍니다.
+
+사용 예 (저장소 루트에서):
+    python -m backend.bench --output bench.json
+    python -m backend.bench --only load --concurrency 16 --requests 500
+    python -m backend.bench --output new.json --compare bench.json --threshold 0.2
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+
+# 모든 요청이 한 클라이언트에서 나가므로 클라이언트별 요청 제한은 기본으로 끔
+# (main 이 import 시점에 환경 변수로 제한기를 만들므로 그 전에 설정, 직접 지정한 값은 유지)
+for _endpoint in ("PDF", "BULK", "EMAIL"):
+    os.environ.setdefault(f"REPORT_{_endpoint}_RATE_PER_MIN", "0")
+# 합성 플랜을 실제 플랜 DB 에 쓰지 않도록 저장소는 기본으로 끔
+os.environ.setdefault("PLAN_STORE_PATH", "")
+
+try:
+    from backend import main as api
+except ImportError:  # backend 디렉터리에서 직접 실행하는 경우
+    import main as api
+
+try:
+    from planner import FinancialPlanner
+except ImportError:  # 저장소 루트가 sys.path 에 없으면 CLI 벤치마크는 건너뜀
+    FinancialPlanner = None
+
+SAMPLE_REQUEST = {"monthly_goal": 300, "current_assets": 50000, "risk_level": "중립"}
+RISK_LEVELS = ("보수적", "중립", "공격적")
+
+# compare 에서 보는 지표: (이름, 클수록 나쁜지)
+COMPARED_METRICS = (("p50_ms", True), ("p99_ms", True), ("rps", False))
+# 이보다 작은 지연 변화(ms)는 측정 잡음으로 보고 회귀로 치지 않음
+MIN_DELTA_MS = 0.05
+# 지연 표본으로 인정하는 응답 (그 외 상태가 하나라도 있으면 엔드포인트 실패)
+OK_STATUSES = frozenset(range(200, 300)) | {304}
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(q / 100 * len(sorted_values)) - 1)  # nearest-rank
+    return sorted_values[index]
+
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 4),
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 4),
+        "p99_ms": round(_percentile(ordered, 99) * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+    }
+
+
+# ===== 마이크로 벤치마크 =====
+def _time_calls(fn: Callable[[], Any], repeat: int, warmup: int) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return _summarize(samples)
+
+
+def _sample_plan(strategy: str = "fixed", goal_offset: float = 0.0) -> "api.DetailedPlanResponse":
+    request = {**SAMPLE_REQUEST, "monthly_goal": SAMPLE_REQUEST["monthly_goal"] + goal_offset}
+    return api.generate_detailed_plan(api.PlanRequest(**request, allocation_strategy=strategy))
+
+
+def run_micro(repeat: int) -> Dict[str, Dict]:
+    plan = _sample_plan()
+    existing_codes = {item["code"] for asset in plan.assets for item in asset.items}
+    rng = random.Random(0)
+    goals = iter(range(10 ** 9))
+
+    cases: List[Tuple[str, Callable[[], Any], int]] = [
+        # 같은 요청은 플랜 저장소에서 바로 반환되므로 목표 금액을 조금씩 바꿔 매번 새로 계산
+        ("generate_detailed_plan", lambda: _sample_plan(goal_offset=next(goals) / 1000), repeat),
+        ("generate_detailed_plan[optimized]", lambda: _sample_plan("optimized", next(goals) / 1000), repeat),
+        ("_pick_extra_recommendations", lambda: api._pick_extra_recommendations(existing_codes, 3, rng), repeat),
+        # PDF 캐시/렌더 풀을 거치지 않는 동기 렌더라 매번 전체 렌더 비용을 잼
+        ("_build_report_pdf", lambda: api._build_report_pdf(plan, fingerprint=f"{next(goals):064x}"),
+         max(5, repeat // 20)),
+    ]
+    if FinancialPlanner is not None:
+        planner = FinancialPlanner(300, 50000, "중립")
+        cases.append(("FinancialPlanner.generate_plan", planner.generate_plan, repeat))
+
+    results: Dict[str, Dict] = {}
+    for name, fn, n in cases:
+        try:
+            results[name] = _time_calls(fn, n, warmup=min(3, n))
+        except Exception as exc:  # PDF 라이브러리/폰트가 없는 환경 등
+            results[name] = {"skipped": f"{type(exc).__name__}: {exc}"}
+        _print_row(name, results[name])
+    return results
+
+
+# ===== 인프로세스 ASGI 부하 테스트 =====
+async def _asgi_request(app, method: str, path: str, body: bytes) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    sent = False
+    status = 0
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(3600)  # 응답이 끝나기 전에 연결이 끊기지 않도록 대기
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+# 실행 전체에서 겹치지 않는 요청 번호 (준비 요청과 본 측정이 같은 본문을 쓰지 않도록)
+_request_numbers = itertools.count()
+
+
+def _load_bodies(endpoint: str, total: int, report_plans: int) -> List[bytes]:
+    """엔드포인트별 요청 본문 목록 (요청마다 순환 사용)"""
+    rng = random.Random(1)
+
+    def request() -> Dict[str, Any]:
+        # 목표 금액에 요청 번호를 더해 모두 다른 요청으로 만듦 (플랜 저장소 적중이 아니라 설계 계산을 잼)
+        return {"monthly_goal": rng.randrange(50, 1000) + next(_request_numbers) / 1000,
+                "current_assets": rng.randrange(1000, 200000), "risk_level": rng.choice(RISK_LEVELS)}
+
+    if endpoint != "/api/report-pdf":
+        return [json.dumps(request()).encode() for _ in range(total)]
+    # report_plans 개 플랜을 돌려 쓰므로 캐시 미스(렌더)와 적중이 섞입니다
+    plans = [api.generate_detailed_plan(api.PlanRequest(**request())) for _ in range(max(1, report_plans))]
+    return [json.dumps({"plan": p.model_dump()}).encode() for p in plans]
+
+
+async def _load_endpoint(app, endpoint: str, total: int, concurrency: int, report_plans: int) -> Dict:
+    bodies = _load_bodies(endpoint, total, report_plans)
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        for i in counter:
+            start = time.perf_counter()
+            status = await _asgi_request(app, "POST", endpoint, bodies[i % len(bodies)])
+            if status in OK_STATUSES:
+                latencies.append(time.perf_counter() - start)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    result = {"concurrency": concurrency, "statuses": statuses}
+    # 오류 응답은 빨리 끝나므로 표본에 넣으면 고장 난 엔드포인트가 빨라진 것처럼 보임
+    if len(latencies) < total:
+        result["failed"] = f"{total - len(latencies)}/{total} responses were not 2xx/304"
+    if latencies:
+        result.update(_summarize(latencies), rps=round(len(latencies) / elapsed, 2))
+    return result
+
+
+def run_load(endpoints: List[str], total: int, concurrency: int, report_plans: int) -> Dict[str, Dict]:
+    results: Dict[str, Dict] = {}
+
+    async def run_all() -> None:
+        for endpoint in endpoints:
+            # 첫 요청들(지연 import, 렌더 프로세스 기동 등)은 측정에서 제외
+            await _load_endpoint(api.app, endpoint, concurrency, concurrency, report_plans)
+            api.report_cache.clear()
+            requests = total if endpoint != "/api/report-pdf" else max(concurrency, total // 4)
+            results[endpoint] = await _load_endpoint(api.app, endpoint, requests, concurrency, report_plans)
+            _print_row(endpoint, results[endpoint])
+
+    try:
+        asyncio.run(run_all())
+    finally:
+        api.render_pool.shutdown()
+    return results
+
+
+# ===== 결과 저장/비교 =====
+def _print_row(name: str, result: Dict) -> None:
+    if "skipped" in result:
+        print(f"  {name:<40} skipped ({result['skipped']})")
+        return
+    if "failed" in result:
+        print(f"  {name:<40} FAILED ({result['failed']}, statuses {result['statuses']})")
+        return
+    extra = f"  {result['rps']:>9.1f} req/s" if "rps" in result else ""
+    print(f"  {name:<40} p50 {result['p50_ms']:>9.3f} ms  p99 {result['p99_ms']:>9.3f} ms{extra}")
+
+
+def _metadata() -> Dict:
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float, min_delta_ms: float = MIN_DELTA_MS) -> List[str]:
+    """threshold(비율) 이상 나빠진 항목 목록 (실패한 엔드포인트도 포함)"""
+    regressions = []
+    for section in ("micro", "load"):
+        for name, result in current.get(section, {}).items():
+            if "failed" in result:
+                print(f"  {section}:{name:<40} FAILED ({result['failed']})")
+                regressions.append(f"{section}:{name}:failed")
+                continue
+            base = baseline.get(section, {}).get(name)
+            if not base or "skipped" in base or "failed" in base or "skipped" in result:
+                continue
+            for metric, higher_is_worse in COMPARED_METRICS:
+                if metric not in result or not base.get(metric):
+                    continue
+                ratio = result[metric] / base[metric]
+                if higher_is_worse:
+                    worse = ratio > 1 + threshold and result[metric] - base[metric] > min_delta_ms
+                else:
+                    worse = ratio < 1 - threshold
+                mark = "REGRESSION" if worse else ""
+                print(f"  {section}:{name:<40} {metric:<7} {base[metric]:>10.3f} -> {result[metric]:>10.3f}"
+                      f"  ({ratio - 1:+.1%}) {mark}")
+                if worse:
+                    regressions.append(f"{section}:{name}:{metric}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="HolinFlow 벤치마크 / 부하 테스트")
+    parser.add_argument("--only", choices=("micro", "load"), help="한 종류만 실행")
+    parser.add_argument("--repeat", type=int, default=200, help="마이크로 벤치마크 반복 횟수")
+    parser.add_argument("--requests", type=int, default=400, help="엔드포인트별 요청 수 (report-pdf 는 1/4)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--endpoints", default="/api/plan,/api/plan-detailed,/api/report-pdf")
+    parser.add_argument("--report-plans", type=int, default=16, help="report-pdf 부하에 쓸 서로 다른 플랜 수")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="회귀로 볼 변화 비율 (기본 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=MIN_DELTA_MS, help="무시할 지연 변화 (ms)")
+    args = parser.parse_args(argv)
+
+    result: Dict[str, Any] = {"meta": _metadata()}
+    if args.only in (None, "micro"):
+        print("[micro]")
+        result["micro"] = run_micro(args.repeat)
+    if args.only in (None, "load"):
+        print(f"[load] concurrency={args.concurrency}")
+        endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+        result["load"] = run_load(endpoints, args.requests, args.concurrency, args.report_plans)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"saved {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"[compare] {args.compare} (threshold {args.threshold:.0%})")
+        regressions = compare(baseline, result, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+        print("no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+cashflow_calendar.py - 월별 현금흐름 달력 (배당 / 이자 / 리츠 분배금)
+
+카탈로그를 읽을 때 상품별 12개월 지급 행렬(상품 수 x 12, 값 = 투자금 대비 그 달 지급 비율)을
+한 번 만들어 두고, 포트폴리오 달력은 보유 금액 벡터와 행렬의 곱 한 번으로 계산합니다.
+
+지급 규칙:
+    배당주   payout_months 에 연 배당률을 균등 분할
+    현금성   매월 이자 (연 수익률 / 12)
+    리츠     분기 분배 (3, 6, 9, 12월)
+    ETF      현금 분배 없음 (수익은 평가액 증가로 봄)
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Mapping, Tuple
+
+try:
+    from backend.catalog import ProductCatalog
+    from backend.lazy_import import lazy_import
+except ImportError:  # backend 디렉터리에서 직접 실행하는 경우
+    from catalog import ProductCatalog
+    from lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+REIT_PAYOUT_MONTHS = (3, 6, 9, 12)
+# 달력 응답의 수입 종류 -> 카탈로그 상품 종류
+INCOME_KINDS = (("dividend", "dividend"), ("interest", "cash"), ("reit", "reit"))
+
+
+class PayoutMatrix:
+    """카탈로그 상품별 월 지급 비율 행렬 (불변, 스냅샷마다 한 번 생성)"""
+
+    __slots__ = ("matrix", "kind_mask", "index_by_code")
+
+    def __init__(self, catalog: ProductCatalog):
+        count = len(catalog)
+        matrix = np.zeros((count, 12))
+        kind_mask = np.zeros((count, len(INCOME_KINDS)))
+        kind_column = {kind: j for j, (_, kind) in enumerate(INCOME_KINDS)}
+        for i, product in enumerate(catalog.products):
+            months, annual_rate = _payout_schedule(product.kind, product.payout_months,
+                                                   catalog.expected_returns[i], catalog.dividend_rates[i])
+            for month in months:
+                matrix[i, month - 1] = annual_rate / 100 / len(months)
+            if product.kind in kind_column:
+                kind_mask[i, kind_column[product.kind]] = 1.0
+        matrix.flags.writeable = False
+        kind_mask.flags.writeable = False
+        self.matrix = matrix
+        self.kind_mask = kind_mask
+        self.index_by_code = {product.code: i for i, product in enumerate(catalog.products)}
+
+    def holdings_vector(self, holdings: Mapping[str, float]) -> Tuple[np.ndarray, List[str]]:
+        """{상품 코드: 금액} -> 상품 순서 금액 벡터 (카탈로그에 없는 코드 목록도 반환)"""
+        vector = np.zeros(len(self.index_by_code))
+        unmatched = []
+        for code, amount in holdings.items():
+            i = self.index_by_code.get(code)
+            if i is None:
+                unmatched.append(code)
+            else:
+                vector[i] += amount
+        return vector, unmatched
+
+    def calendar(self, holdings: np.ndarray, years: int = 1, reinvest: bool = False) -> Dict[str, np.ndarray]:
+        """
+        holdings: 상품 순서 금액 벡터. 반환 배열은 (years, 12).
+        reinvest=True 면 받은 분배금을 같은 상품에 다시 넣는 것으로 보고 매달 원금을 늘립니다.
+        """
+        # 카탈로그 전체가 아니라 보유 중인 상품 행만 골라 계산
+        held = np.flatnonzero(holdings)
+        amounts = holdings[held]
+        matrix = self.matrix[held]
+        kind_mask = self.kind_mask[held]
+        if not reinvest:
+            # 원금이 그대로면 해마다 같은 달력 -> 행렬 곱 한 번
+            by_kind = (amounts[:, None] * kind_mask).T @ matrix  # (종류, 12)
+            by_kind = np.repeat(by_kind[:, None, :], years, axis=1)
+        else:
+            # 원금(월초) = 보유액 * 이전 달까지 (1 + 지급 비율) 의 누적곱 -> 전 기간을 한 번에 계산
+            rates = np.tile(matrix, (1, years))  # (보유 상품, years * 12)
+            growth = np.cumprod(1 + rates, axis=1)
+            principal = amounts[:, None] * np.hstack([np.ones((len(held), 1)), growth[:, :-1]])
+            by_kind = (kind_mask.T @ (principal * rates)).reshape(len(INCOME_KINDS), years, 12)
+        result = {name: by_kind[j] for j, (name, _) in enumerate(INCOME_KINDS)}
+        result["total"] = by_kind.sum(axis=0)
+        return result
+
+
+def _payout_schedule(kind: str, payout_months, expected_return: float,
+                     dividend_rate: float) -> Tuple[Tuple[int, ...], float]:
+    if kind == "dividend":
+        return tuple(payout_months), dividend_rate
+    if kind == "cash":
+        return tuple(range(1, 13)), expected_return
+    if kind == "reit":
+        return REIT_PAYOUT_MONTHS, expected_return
+    return (), 0.0
+
+
+def plan_holdings(assets) -> Dict[str, float]:
+    """상세 설계 응답의 assets -> {상품 코드: 배분액}"""
+    holdings: Dict[str, float] = {}
+    for asset in assets:
+        for item in asset.items:
+            code = item.get("code") if isinstance(item, dict) else None
+            if code:
+                holdings[code] = holdings.get(code, 0.0) + float(item.get("allocation") or 0.0)
+    return holdings
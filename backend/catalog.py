@@ -0,0 +1,159 @@
+"""
+catalog.py - 투자 상품 카탈로그 (인덱스 + 메모리 절약형 레코드)
+
+상품은 `__slots__` 레코드로 한 번만 만들고, 수치 컬럼은 `array` 로 따로 보관합니다.
+코드/종류/위험 등급별 해시 인덱스를 미리 만들어 두므로 요청마다 상품 목록을
+다시 만들거나 전체를 훑지 않습니다.
+"""
+from array import array
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+import hashlib
+import json
+import random
+
+try:
+    from backend.products import CASH_PRODUCTS, DIVIDEND_STOCKS, INVESTMENTS, REAL_ESTATE_PRODUCTS
+except ImportError:  # backend 디렉터리에서 직접 실행하는 경우
+    from products import CASH_PRODUCTS, DIVIDEND_STOCKS, INVESTMENTS, REAL_ESTATE_PRODUCTS
+
+# 상품 종류 -> 리포트 표시 이름
+KIND_LABELS = {
+    "etf": "ETF",
+    "dividend": "배당주",
+    "reit": "REITs",
+    "cash": "현금성",
+}
+
+
+class Product:
+    __slots__ = (
+        "index", "name", "code", "kind", "risk_tier", "risk_label",
+        "expected_return", "dividend_rate", "annual_dividend", "payout_months", "description",
+    )
+
+    def __init__(self, index: int, name: str, code: str, kind: str, description: str,
+                 expected_return: float = 0.0, risk_tier: Optional[str] = None, risk_label: Optional[str] = None,
+                 dividend_rate: float = 0.0, annual_dividend: float = 0.0, payout_months: Tuple[int, ...] = ()):
+        self.index = index
+        self.name = name
+        self.code = code
+        self.kind = kind
+        self.risk_tier = risk_tier
+        self.risk_label = risk_label
+        self.expected_return = expected_return
+        self.dividend_rate = dividend_rate
+        self.annual_dividend = annual_dividend
+        self.payout_months = payout_months
+        self.description = description
+
+    @property
+    def type_label(self) -> str:
+        return KIND_LABELS[self.kind]
+
+    def __repr__(self) -> str:
+        return f"Product({self.code!r}, {self.name!r}, kind={self.kind!r})"
+
+
+class ProductCatalog:
+    def __init__(self, products: Iterable[Product], version: str = "builtin",
+                 category_rates: Optional[Mapping[str, float]] = None):
+        self.version = version
+        # 파일에서 읽은 카탈로그는 카테고리 금리도 함께 가집니다 (None 이면 기본값 사용)
+        self.category_rates = category_rates
+        self.products: Tuple[Product, ...] = tuple(products)
+        self.expected_returns = array("d", (p.expected_return for p in self.products))
+        self.dividend_rates = array("d", (p.dividend_rate for p in self.products))
+
+        # (종류, 위험 등급) 조합별 인덱스. None 은 "전체" 를 뜻합니다.
+        self.by_code: Dict[str, Product] = {}
+        pools: Dict[Tuple[Optional[str], Optional[str]], List[Product]] = {(None, None): []}
+        for product in self.products:
+            self.by_code[product.code] = product
+            keys = {(None, None), (product.kind, None)}
+            if product.risk_tier:
+                keys.update({(None, product.risk_tier), (product.kind, product.risk_tier)})
+            for key in keys:
+                pools.setdefault(key, []).append(product)
+        self._pools: Dict[Tuple[Optional[str], Optional[str]], Tuple[Product, ...]] = {
+            key: tuple(items) for key, items in pools.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def get(self, code: str) -> Optional[Product]:
+        return self.by_code.get(code)
+
+    def pool(self, kind: Optional[str] = None, risk_tier: Optional[str] = None) -> Sequence[Product]:
+        return self._pools.get((kind, risk_tier), ())
+
+    def sample(self, count: int, rng: Optional[random.Random] = None, exclude_codes: Iterable[str] = (),
+               kind: Optional[str] = None, risk_tier: Optional[str] = None) -> List[Product]:
+        """
+        제외 코드를 뺀 상품 중 count 개를 무작위로 선택합니다.
+        인덱스를 뽑고 제외 대상이면 다시 뽑는 방식이라 풀 크기와 무관하게
+        O(count) 입니다. 제외 비율이 높아 재시도가 길어지면 필터링으로 전환합니다.
+        """
+        rng = rng or random
+        items = self.pool(kind, risk_tier)
+        excluded = set(exclude_codes)
+        size = len(items)
+        if size == 0 or count <= 0:
+            return []
+
+        picked: List[Product] = []
+        seen = set()
+        attempts = 0
+        max_attempts = 4 * count + len(excluded)
+        while len(picked) < count and attempts < max_attempts:
+            attempts += 1
+            i = rng.randrange(size)
+            if i in seen:
+                continue
+            seen.add(i)
+            product = items[i]
+            if product.code in excluded:
+                continue
+            picked.append(product)
+        if len(picked) == count:
+            return picked
+
+        candidates = [p for p in items if p.code not in excluded]
+        if len(candidates) <= count:
+            return candidates
+        return rng.sample(candidates, count)
+
+
+def content_version(label: str, products: Sequence[Product], category_rates: Optional[Mapping[str, float]]) -> str:
+    """상품 필드와 카테고리 금리로 만든 버전 "라벨+해시" (내용이 바뀌면 plan_id / ETag 도 바뀜)"""
+    payload = json.dumps(
+        [[getattr(p, field) for field in Product.__slots__ if field != "index"] for p in products]
+        + [sorted((category_rates or {}).items())],
+        ensure_ascii=False,
+    )
+    return f"{label}+{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]}"
+
+
+def build_builtin_catalog(category_rates: Optional[Mapping[str, float]] = None) -> ProductCatalog:
+    """products.py 의 기본 상품 데이터로 카탈로그 생성 (category_rates 는 버전 해시에도 반영)"""
+    products: List[Product] = []
+
+    def add(**fields) -> None:
+        products.append(Product(index=len(products), **fields))
+
+    for risk_tier, items in INVESTMENTS.items():
+        for item in items:
+            add(name=item["name"], code=item["code"], kind="etf", description=item["description"],
+                expected_return=item["expected_return"], risk_tier=risk_tier, risk_label=item["risk_level"])
+    for item in DIVIDEND_STOCKS:
+        add(name=item["name"], code=item["code"], kind="dividend", description=item["description"],
+            dividend_rate=item["dividend_rate"], annual_dividend=item["annual_dividend"],
+            payout_months=tuple(item["payout_months"]))
+    for item in REAL_ESTATE_PRODUCTS:
+        add(name=item["name"], code=item["code"], kind="reit", description=item["description"],
+            expected_return=item["expected_return"])
+    for item in CASH_PRODUCTS:
+        add(name=item["name"], code=item["code"], kind="cash", description=item["description"],
+            expected_return=item["expected_return"])
+    return ProductCatalog(products, version=content_version("builtin", products, category_rates),
+                          category_rates=category_rates)
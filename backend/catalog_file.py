@@ -0,0 +1,255 @@
+"""
+catalog_file.py - 상품 카탈로그 바이너리 파일 (mmap 로딩)
+
+컬럼 단위로 저장된 파일을 mmap 으로 열어, 수치 컬럼은 복사 없이 memoryview 로 사용하고
+상품명/설명 같은 긴 문자열은 접근할 때만 디코딩합니다. 같은 파일을 여는 여러 uvicorn
+워커는 OS 페이지 캐시를 공유합니다.
+
+파일 구조 (little-endian, 각 구역은 8바이트 정렬):
+    헤더        <8sIIII  magic, 상품 수, 금리 항목 수, 버전 라벨 길이, 문자열 구역 크기
+    버전 라벨    UTF-8
+    카테고리 금리  (키 offset u32, 키 길이 u32, 값 f64) * 금리 항목 수
+    수치 컬럼    expected_return, dividend_rate, annual_dividend (f64 * 상품 수)
+    지급월 컬럼   u16 비트마스크 * 상품 수 (1월 = bit 0)
+    문자열 컬럼   필드별 (offset u32, 길이 u32) * 상품 수
+    문자열 구역   UTF-8
+
+카탈로그 버전은 "라벨+내용 해시" 입니다. plan_id, 저장된 플랜, 상품 목록 ETag 가 버전에 묶이므로
+같은 라벨로 금리/상품을 바꿔 다시 내보내도 버전이 달라집니다.
+
+사용 예:
+    python -m backend.catalog_file export catalog.bin --version 2024-06
+"""
+from typing import Dict, List, Mapping, Optional, Tuple
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+
+try:
+    from backend.catalog import Product, ProductCatalog, build_builtin_catalog
+except ImportError:  # backend 디렉터리에서 직접 실행하는 경우
+    from catalog import Product, ProductCatalog, build_builtin_catalog
+
+MAGIC = b"HFCAT001"
+_HEADER = struct.Struct("<8sIIII")
+_RATE = struct.Struct("<IId")
+STRING_FIELDS = ("code", "kind", "risk_tier", "risk_label", "name", "description")
+NUMERIC_FIELDS = ("expected_return", "dividend_rate", "annual_dividend")
+
+
+class CatalogFileError(Exception):
+    pass
+
+
+def _pad8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def _months_to_mask(months) -> int:
+    mask = 0
+    for month in months:
+        mask |= 1 << (int(month) - 1)
+    return mask
+
+
+def _mask_to_months(mask: int) -> Tuple[int, ...]:
+    return tuple(month for month in range(1, 13) if mask & (1 << (month - 1)))
+
+
+def write_catalog_file(path: str, catalog: ProductCatalog, category_rates: Mapping[str, float],
+                       version: str) -> None:
+    """
+    카탈로그를 바이너리 파일로 저장 (임시 파일에 쓴 뒤 교체하므로 읽는 쪽은 항상 완전한 파일을 봄).
+    version 은 라벨이고, 읽을 때 내용 해시가 붙습니다
+    """
+    strings = bytearray()
+    string_index: Dict[str, Tuple[int, int]] = {}
+
+    def intern(text: Optional[str]) -> Tuple[int, int]:
+        text = text or ""
+        if text not in string_index:
+            data = text.encode("utf-8")
+            string_index[text] = (len(strings), len(data))
+            strings.extend(data)
+        return string_index[text]
+
+    products = catalog.products
+    count = len(products)
+    version_bytes = version.encode("utf-8")
+
+    rate_bytes = b"".join(_RATE.pack(*intern(key), float(value)) for key, value in category_rates.items())
+    numeric_bytes = b"".join(
+        struct.pack(f"<{count}d", *(float(getattr(p, field)) for p in products)) for field in NUMERIC_FIELDS
+    )
+    mask_bytes = struct.pack(f"<{count}H", *(_months_to_mask(p.payout_months) for p in products))
+    span_bytes = b"".join(
+        struct.pack(f"<{count * 2}I", *(v for p in products for v in intern(getattr(p, field))))
+        for field in STRING_FIELDS
+    )
+
+    sections = [version_bytes, rate_bytes, numeric_bytes, mask_bytes, span_bytes, bytes(strings)]
+    header = _HEADER.pack(MAGIC, count, len(category_rates), len(version_bytes), len(strings))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".catalog-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            for section in sections:
+                f.write(section)
+                f.write(b"\0" * (_pad8(len(section)) - len(section)))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class _MappedStrings:
+    """mmap 위의 문자열 구역. 상품 레코드가 참조하는 동안 mmap 이 유지됩니다."""
+
+    __slots__ = ("mm", "view")
+
+    def __init__(self, mm: mmap.mmap, view: memoryview):
+        self.mm = mm
+        self.view = view
+
+    def decode(self, offset: int, length: int) -> str:
+        return str(self.view[offset:offset + length], "utf-8")
+
+
+class MappedProduct(Product):
+    """상품명/설명은 접근할 때 mmap 에서 디코딩하는 상품 레코드"""
+
+    __slots__ = ("_strings", "_name_span", "_description_span")
+
+    def __init__(self, index: int, strings: _MappedStrings, name_span: Tuple[int, int],
+                 description_span: Tuple[int, int], **fields):
+        self.index = index
+        self._strings = strings
+        self._name_span = name_span
+        self._description_span = description_span
+        for key, value in fields.items():
+            setattr(self, key, value)
+
+    @property
+    def name(self) -> str:
+        return self._strings.decode(*self._name_span)
+
+    @property
+    def description(self) -> str:
+        return self._strings.decode(*self._description_span)
+
+
+def _read_header(view: memoryview, path: str) -> Tuple[int, int, int, int, int]:
+    """헤더 확인 -> (상품 수, 금리 항목 수, 버전 라벨 길이, 문자열 구역 크기, 데이터 끝 위치)"""
+    if len(view) < _HEADER.size:
+        raise CatalogFileError(f"catalog file too small: {path}")
+    magic, count, rates_count, version_len, strings_size = _HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise CatalogFileError(f"not a catalog file: {path}")
+    end = (
+        _HEADER.size + _pad8(version_len) + _pad8(rates_count * _RATE.size)
+        + count * 8 * len(NUMERIC_FIELDS) + _pad8(count * 2) + count * 8 * len(STRING_FIELDS) + strings_size
+    )
+    if len(view) < end:
+        raise CatalogFileError(f"truncated catalog file: {path}")
+    return count, rates_count, version_len, strings_size, end
+
+
+def load_catalog_file(path: str) -> ProductCatalog:
+    """바이너리 카탈로그 파일을 mmap 으로 열어 카탈로그(카테고리 금리 포함) 반환"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:  # 빈 파일은 mmap 할 수 없음
+            raise CatalogFileError(f"catalog file too small: {path}")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mm)
+    try:
+        count, rates_count, version_len, strings_size, end = _read_header(view, path)
+    except CatalogFileError:
+        # 정상 파일의 mmap 은 상품 레코드가 참조하는 동안 유지되지만, 잘못된 파일은 바로 닫음
+        view.release()
+        mm.close()
+        raise
+
+    offset = _HEADER.size
+    label = str(view[offset:offset + version_len], "utf-8")
+    offset += _pad8(version_len)
+    # 라벨을 뺀 나머지 구역(금리, 수치/지급월/문자열 컬럼) 전체의 해시
+    version = f"{label}+{hashlib.sha256(view[offset:end]).hexdigest()[:12]}"
+
+    rates_offset = offset
+    offset += _pad8(rates_count * _RATE.size)
+
+    numeric: Dict[str, memoryview] = {}
+    for field in NUMERIC_FIELDS:
+        numeric[field] = view[offset:offset + count * 8].cast("d")
+        offset += count * 8
+    masks = view[offset:offset + count * 2].cast("H")
+    offset += _pad8(count * 2)
+    spans: Dict[str, memoryview] = {}
+    for field in STRING_FIELDS:
+        spans[field] = view[offset:offset + count * 8].cast("I")
+        offset += count * 8
+    strings = _MappedStrings(mm, view[offset:offset + strings_size])
+
+    def span(field: str, i: int) -> Tuple[int, int]:
+        column = spans[field]
+        return column[2 * i], column[2 * i + 1]
+
+    category_rates = {}
+    for i in range(rates_count):
+        key_off, key_len, value = _RATE.unpack_from(view, rates_offset + i * _RATE.size)
+        category_rates[strings.decode(key_off, key_len)] = value
+
+    products: List[Product] = []
+    for i in range(count):
+        products.append(MappedProduct(
+            i,
+            strings,
+            name_span=span("name", i),
+            description_span=span("description", i),
+            code=strings.decode(*span("code", i)),
+            kind=strings.decode(*span("kind", i)),
+            risk_tier=strings.decode(*span("risk_tier", i)) or None,
+            risk_label=strings.decode(*span("risk_label", i)) or None,
+            expected_return=numeric["expected_return"][i],
+            dividend_rate=numeric["dividend_rate"][i],
+            annual_dividend=numeric["annual_dividend"][i],
+            payout_months=_mask_to_months(masks[i]),
+        ))
+    catalog = ProductCatalog(products, version=version, category_rates=category_rates)
+    # 수치 컬럼은 새 배열 대신 mmap 을 그대로 사용 (워커 간 페이지 공유)
+    catalog.expected_returns = numeric["expected_return"]
+    catalog.dividend_rates = numeric["dividend_rate"]
+    return catalog
+
+
+def main() -> None:
+    try:
+        from backend.plan_templates import CATEGORY_RATES
+    except ImportError:
+        from plan_templates import CATEGORY_RATES
+
+    parser = argparse.ArgumentParser(description="HolinFlow 상품 카탈로그 파일 도구")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="기본 상품 데이터를 카탈로그 파일로 저장")
+    export.add_argument("path")
+    export.add_argument("--version", default="file", help="버전 라벨 (읽을 때 내용 해시가 붙음)")
+    show = sub.add_parser("show", help="카탈로그 파일 요약 출력")
+    show.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        write_catalog_file(args.path, build_builtin_catalog(), CATEGORY_RATES, args.version)
+        print(f"saved {args.path}")
+    else:
+        catalog = load_catalog_file(args.path)
+        print(f"version={catalog.version} products={len(catalog)} rates={catalog.category_rates}")
+
+
+if __name__ == "__main__":
+    main()
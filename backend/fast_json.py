@@ -0,0 +1,84 @@
+"""
+fast_json.py - JSON 응답 빠른 경로
+
+FastAPI 는 response_model 이 있으면 반환한 모델을 한 번 더 검증한 뒤 표준 json 으로 직렬화합니다.
+이미 서버가 만든 모델/딕셔너리는 검증이 필요 없으므로 바로 바이트로 만들어 Response 로 돌려주고,
+클라이언트가 지원하면 gzip / brotli 로 압축합니다.
+
+- 모델: pydantic-core 직렬화 (model_dump_json)
+- 딕셔너리: orjson 이 설치되어 있으면 orjson, 없으면 표준 json
+- brotli 패키지가 설치되어 있을 때만 br 을 제공
+"""
+from typing import Any, Dict, Optional, Tuple
+import gzip
+import json
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+# 이보다 작은 응답은 압축해도 이득이 거의 없음
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 5
+
+
+def dumps(content: Any) -> bytes:
+    if isinstance(content, BaseModel):
+        return content.model_dump_json().encode("utf-8")
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Accept-Encoding 에서 지원하는 압축 중 q 값이 가장 큰 것 (같으면 br 우선)"""
+    if not accept_encoding:
+        return None
+    supported = ("br", "gzip") if brotli is not None else ("gzip",)
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    best: Tuple[float, Optional[str]] = (0.0, None)
+    for encoding in supported:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best[0]:
+            best = (q, encoding)
+    return best[1]
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def json_response(content: Any, accept_encoding: Optional[str] = None, status_code: int = 200,
+                  headers: Optional[Dict[str, str]] = None) -> Response:
+    """검증 없이 직렬화한 JSON 응답 (필요하면 압축)"""
+    body = content if isinstance(content, bytes) else dumps(content)
+    response_headers = dict(headers or {})
+    response_headers["Vary"] = "Accept-Encoding"
+    encoding = negotiate_encoding(accept_encoding) if len(body) >= COMPRESS_MIN_BYTES else None
+    if encoding is not None:
+        body = compress(body, encoding)
+        response_headers["Content-Encoding"] = encoding
+    return Response(body, status_code=status_code, media_type="application/json", headers=response_headers)
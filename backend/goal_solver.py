@@ -0,0 +1,114 @@
+"""
+goal_solver.py - 목표 자산 도달에 필요한 월 적립액 / 기간 계산
+
+목표 자산 = 월 목표 현금흐름 / 월 수익률 (상세 설계의 required_total_assets 와 같은 기준).
+매월 수익이 붙은 뒤 월말에 적립한다고 보고(projection.py 와 같은 순서) 연금 공식으로 계산합니다.
+
+    N 개월 뒤 자산 = PV (1+r)^N + PMT * S(N),   S(N) = sum_{k<N} (1+r)^(N-1-k) (1+g)^k
+
+적립액이 매월 g 씩 늘어나면 기간(N)은 닫힌 해가 없어 개월 단위 이분 탐색을 격자 전체에 한 번에 수행합니다.
+모든 계산은 (목표 수, 기간/적립액 수) 격자를 numpy 브로드캐스팅으로 처리합니다.
+"""
+from __future__ import annotations
+
+from typing import Dict
+import math
+
+try:
+    from backend.lazy_import import lazy_import
+except ImportError:  # backend 디렉터리에서 직접 실행하는 경우
+    from lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+# 기간 탐색 상한 (이보다 오래 걸리면 도달 불가로 봄)
+MAX_SOLVE_YEARS = 100
+_BISECT_STEPS = math.ceil(math.log2(MAX_SOLVE_YEARS * 12)) + 1
+
+
+def contribution_factor(months: np.ndarray, monthly_rate: float, monthly_growth: float = 0.0) -> np.ndarray:
+    """매월 1 (g 씩 증가) 을 적립했을 때 months 개월 뒤 적립분의 가치 S(N)"""
+    months = np.asarray(months, dtype=float)
+    r, g = monthly_rate, monthly_growth
+    if abs(r - g) < 1e-12:
+        # r == g 이면 각 항이 모두 (1+r)^(N-1)
+        return months * np.power(1 + r, np.maximum(months - 1, 0))
+    return (np.power(1 + r, months) - np.power(1 + g, months)) / (r - g)
+
+
+def future_value(present_value, contribution, months, monthly_rate: float, monthly_growth: float = 0.0) -> np.ndarray:
+    months = np.asarray(months, dtype=float)
+    return (np.asarray(present_value, dtype=float) * np.power(1 + monthly_rate, months)
+            + np.asarray(contribution, dtype=float) * contribution_factor(months, monthly_rate, monthly_growth))
+
+
+def required_contribution(target: np.ndarray, present_value: float, months: np.ndarray,
+                          monthly_rate: float, monthly_growth: float = 0.0) -> np.ndarray:
+    """target (목표 수,) x months (기간 수,) 격자의 첫 달 필요 적립액. 이미 도달했으면 0"""
+    target = np.asarray(target, dtype=float)[:, None]
+    months = np.asarray(months, dtype=float)[None, :]
+    gap = target - present_value * np.power(1 + monthly_rate, months)
+    factor = contribution_factor(months, monthly_rate, monthly_growth)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        required = np.where(factor > 0, gap / factor, np.inf)
+    return np.where(gap <= 0, 0.0, required)
+
+
+def months_to_goal(target: np.ndarray, present_value: float, contributions: np.ndarray,
+                   monthly_rate: float, monthly_growth: float = 0.0) -> np.ndarray:
+    """
+    target (목표 수,) x contributions (적립액 수,) 격자의 도달 개월 수 (소수, 도달 불가면 inf).
+    g == 0 이면 닫힌 해, 아니면 개월 단위 이분 탐색 후 마지막 달 안에서 선형 보간.
+    """
+    target = np.asarray(target, dtype=float)[:, None]
+    pmt = np.broadcast_to(np.asarray(contributions, dtype=float)[None, :], (target.shape[0], len(contributions)))
+    max_months = MAX_SOLVE_YEARS * 12
+    reached_now = target <= present_value
+
+    if monthly_growth == 0.0:
+        r = monthly_rate
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if r > 0:
+                # (1+r)^N = (target + PMT/r) / (PV + PMT/r)
+                ratio = (target + pmt / r) / (present_value + pmt / r)
+                months = np.log(ratio) / np.log1p(r)
+            else:
+                months = (target - present_value) / pmt
+        months = np.where(np.isfinite(months) & (months >= 0), months, np.inf)
+    else:
+        # 자산은 개월 수에 대해 증가 함수 (PV, PMT >= 0) -> [lo, hi] 에서 처음 목표 이상이 되는 달 탐색
+        lo = np.zeros(pmt.shape)
+        hi = np.full(pmt.shape, float(max_months))
+        for _ in range(_BISECT_STEPS):
+            mid = np.floor((lo + hi) / 2)
+            done = future_value(present_value, pmt, mid, monthly_rate, monthly_growth) >= target
+            hi = np.where(done, mid, hi)
+            lo = np.where(done, lo, mid)
+        before = future_value(present_value, pmt, hi - 1, monthly_rate, monthly_growth)
+        after = future_value(present_value, pmt, hi, monthly_rate, monthly_growth)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = np.clip((target - before) / (after - before), 0.0, 1.0)
+        months = np.where(after >= target, hi - 1 + np.nan_to_num(fraction, nan=1.0), np.inf)
+
+    months = np.where(months > max_months, np.inf, months)
+    return np.where(reached_now, 0.0, months)
+
+
+def solve_goal_grid(monthly_goals, current_assets: float, annual_return: float, years, contributions,
+                    contribution_growth: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    annual_return, contribution_growth 는 연 % (적립액 증가율은 월 복리로 환산).
+    반환: required_total_assets (목표 수,), required_monthly_contribution (목표 수, 기간 수),
+          months_to_goal (목표 수, 적립액 수)
+    """
+    monthly_rate = annual_return / 100 / 12
+    monthly_growth = (1 + contribution_growth / 100) ** (1 / 12) - 1 if contribution_growth else 0.0
+    goals = np.asarray(monthly_goals, dtype=float)
+    target = goals / monthly_rate if monthly_rate > 0 else np.full(goals.shape, np.inf)
+    months = np.asarray(years, dtype=float) * 12
+    return {
+        "required_total_assets": target,
+        "required_monthly_contribution": required_contribution(target, current_assets, months, monthly_rate,
+                                                               monthly_growth),
+        "months_to_goal": months_to_goal(target, current_assets, contributions, monthly_rate, monthly_growth),
+    }
@@ -0,0 +1,29 @@
+"""
+lazy_import.py - 무거운 모듈 지연 로딩
+
+numpy 처럼 import 가 오래 걸리는 모듈을 첫 속성 접근 때 실제로 로드합니다.
+서버는 시작 준비(warm-up)에서 로드하므로 요청 경로에서 로딩 비용이 생기지 않고,
+import 만 하는 경로(워커 프로세스 기동, CLI, 테스트 수집)는 로딩을 건너뜁니다.
+
+모듈 수준에서 속성을 쓰면 바로 로드되므로, 이 방식으로 import 한 모듈은
+타입 힌트를 `from __future__ import annotations` (또는 문자열)로 적습니다.
+"""
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """name 모듈을 지연 로딩으로 import (이미 로드됐거나 지연 등록된 모듈은 그대로 반환)"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,313 @@
+"""
+mailer.py - 리포트 이메일 비동기 발송 큐
+
+요청 처리 중에는 작업만 등록하고(job id 반환), 백그라운드 워커가
+로그인된 SMTP 연결을 재사용하며 여러 메일을 한 연결로 묶어 보냅니다.
+실패한 작업은 지수 백오프로 재시도합니다.
+
+smtplib / email 패키지는 첫 발송 때 워커 스레드에서 불러옵니다 (메일을 보내지 않는 워커의 시작 시간 단축).
+"""
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+import os
+import queue
+import threading
+import time
+import uuid
+
+try:
+    from backend.metrics import span
+except ImportError:  # backend 디렉터리에서 직접 실행하는 경우
+    from metrics import span
+
+if TYPE_CHECKING:
+    import smtplib
+    from email.message import EmailMessage
+
+
+@dataclass(frozen=True)
+class SmtpSettings:
+    host: str
+    port: int
+    user: Optional[str]
+    password: Optional[str]
+    sender: str
+    use_tls: bool
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.host and self.sender)
+
+
+def load_smtp_settings() -> SmtpSettings:
+    user = os.getenv("SMTP_USER")
+    return SmtpSettings(
+        host=os.getenv("SMTP_HOST", ""),
+        port=int(os.getenv("SMTP_PORT", "587")),
+        user=user,
+        password=os.getenv("SMTP_PASSWORD"),
+        sender=os.getenv("SMTP_FROM", user or ""),
+        use_tls=os.getenv("SMTP_USE_TLS", "true").lower() == "true",
+    )
+
+
+def build_report_message(sender: str, to_email: str, pdf_bytes: bytes) -> "EmailMessage":
+    from email.message import EmailMessage
+
+    message = EmailMessage()
+    message["Subject"] = "HolinFlow 상세 리포트"
+    message["From"] = sender
+    message["To"] = to_email
+    message.set_content("첨부된 PDF 파일에서 상세 리포트를 확인하세요.")
+    message.add_attachment(pdf_bytes, maintype="application", subtype="pdf", filename="HolinFlow_Report.pdf")
+    return message
+
+
+class SmtpConnectionPool:
+    """로그인까지 마친 SMTP 연결을 보관했다가 재사용"""
+
+    def __init__(self, settings_provider: Callable[[], SmtpSettings], max_size: int = 2,
+                 idle_check_seconds: float = 30.0, timeout: float = 30.0):
+        self._settings_provider = settings_provider
+        self.max_size = max_size
+        self.idle_check_seconds = idle_check_seconds
+        self.timeout = timeout
+        self._idle: List[tuple] = []  # (연결, 설정, 마지막 사용 시각)
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    def _connect(self, settings: SmtpSettings) -> "smtplib.SMTP":
+        import smtplib
+
+        server = smtplib.SMTP(settings.host, settings.port, timeout=self.timeout)
+        if settings.use_tls:
+            server.starttls()
+        if settings.user and settings.password:
+            server.login(settings.user, settings.password)
+        self.opened += 1
+        return server
+
+    def acquire(self) -> tuple:
+        import smtplib
+
+        settings = self._settings_provider()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                server, conn_settings, last_used = self._idle.pop()
+            # 설정이 바뀌었거나 오래 쉰 연결은 확인 후 재사용
+            if conn_settings != settings:
+                _close_quietly(server)
+                continue
+            if time.monotonic() - last_used > self.idle_check_seconds:
+                try:
+                    if server.noop()[0] != 250:
+                        raise smtplib.SMTPServerDisconnected("noop failed")
+                except (smtplib.SMTPException, OSError):
+                    _close_quietly(server)
+                    continue
+            return server, settings
+        return self._connect(settings), settings
+
+    def release(self, server: "smtplib.SMTP", settings: SmtpSettings) -> None:
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append((server, settings, time.monotonic()))
+                return
+        _close_quietly(server)
+
+    def discard(self, server: "smtplib.SMTP") -> None:
+        _close_quietly(server)
+
+    def close_all(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _, _ in idle:
+            _close_quietly(server)
+
+
+def _close_quietly(server: "smtplib.SMTP") -> None:
+    import smtplib
+
+    try:
+        server.quit()
+    except (smtplib.SMTPException, OSError):
+        try:
+            server.close()
+        except OSError:
+            pass
+
+
+@dataclass
+class EmailJob:
+    job_id: str
+    to_email: str
+    pdf_bytes: bytes = field(repr=False)
+    status: str = "queued"  # queued -> sending -> sent / retrying / failed
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.job_id,
+            "email": self.to_email,
+            "status": self.status,
+            "attempts": self.attempts,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class EmailQueue:
+    def __init__(self, pool: SmtpConnectionPool, workers: int = 1, batch_size: int = 20,
+                 max_attempts: int = 4, backoff_base: float = 2.0, max_jobs_kept: int = 1000):
+        self.pool = pool
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.max_jobs_kept = max_jobs_kept
+        self._queue: "queue.Queue[Optional[EmailJob]]" = queue.Queue()
+        self._jobs: Dict[str, EmailJob] = {}
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._timers: List[threading.Timer] = []
+        self.sent = 0
+        self.failed = 0
+
+    def submit(self, to_email: str, pdf_bytes: bytes) -> EmailJob:
+        self._ensure_started()
+        job = EmailJob(job_id=uuid.uuid4().hex, to_email=to_email, pdf_bytes=pdf_bytes)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune_finished()
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[EmailJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict:
+        return {
+            "queued": self._queue.qsize(),
+            "sent": self.sent,
+            "failed": self.failed,
+            "connections_opened": self.pool.opened,
+        }
+
+    def _ensure_started(self) -> None:
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"email-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _prune_finished(self) -> None:
+        if len(self._jobs) <= self.max_jobs_kept:
+            return
+        finished = [j for j in self._jobs.values() if j.status in ("sent", "failed")]
+        finished.sort(key=lambda j: j.updated_at)
+        for job in finished[: len(self._jobs) - self.max_jobs_kept]:
+            del self._jobs[job.job_id]
+
+    def _next_batch(self) -> List[EmailJob]:
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                self._queue.put(None)  # 종료 신호는 다른 워커를 위해 되돌려 놓음
+                break
+            batch.append(job)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            self._send_batch(batch)
+
+    def _send_batch(self, batch: List[EmailJob]) -> None:
+        import smtplib
+
+        try:
+            with span("email.connect"):
+                server, settings = self.pool.acquire()
+        except (smtplib.SMTPException, OSError) as exc:
+            for job in batch:
+                job.attempts += 1
+                self._handle_failure(job, exc)
+            return
+
+        # 한 연결로 여러 메일을 보내고, 연결이 끊기면 남은 작업은 재시도로 넘김
+        healthy = True
+        for job in batch:
+            if not healthy:
+                self._handle_failure(job, smtplib.SMTPServerDisconnected("connection lost"))
+                continue
+            self._mark(job, "sending")
+            job.attempts += 1
+            try:
+                with span("email.send"):
+                    server.send_message(build_report_message(settings.sender, job.to_email, job.pdf_bytes))
+            except (smtplib.SMTPServerDisconnected, OSError) as exc:
+                healthy = False
+                self._handle_failure(job, exc)
+            except smtplib.SMTPException as exc:
+                self._handle_failure(job, exc)
+            else:
+                job.pdf_bytes = b""
+                self._mark(job, "sent")
+                self.sent += 1
+
+        if healthy:
+            self.pool.release(server, settings)
+        else:
+            self.pool.discard(server)
+
+    def _handle_failure(self, job: EmailJob, exc: Exception) -> None:
+        import smtplib
+
+        # 재시도해도 결과가 같은 오류 (수신자 거부 등)
+        permanent = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPNotSupportedError)
+        job.error = f"{type(exc).__name__}: {exc}"
+        if isinstance(exc, permanent) or job.attempts >= self.max_attempts:
+            job.pdf_bytes = b""
+            self._mark(job, "failed")
+            self.failed += 1
+            return
+        self._mark(job, "retrying")
+        delay = self.backoff_base * (2 ** max(0, job.attempts - 1))
+        timer = threading.Timer(delay, self._queue.put, args=(job,))
+        timer.daemon = True
+        timer.start()
+        self._timers = [t for t in self._timers if t.is_alive()] + [timer]
+
+    def _mark(self, job: EmailJob, status: str) -> None:
+        job.status = status
+        job.updated_at = time.time()
+
+    def shutdown(self) -> None:
+        for timer in self._timers:
+            timer.cancel()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+        self.pool.close_all()
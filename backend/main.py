@@ -1,20 +1,83 @@
-from fastapi import FastAPI, HTTPException
+import time
+
+# 시작 시간 보고용 (아래 import 부터 측정)
+_IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
-from typing import Dict, List, Optional
-from email.message import EmailMessage
-import io
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+from functools import lru_cache
+import asyncio
+import hmac
+import logging
+import math
 import os
 import random
-import smtplib
+
+import anyio
 
 try:
-    from fpdf import FPDF
-except ImportError:  # Fallback for environments without the dependency yet
-    FPDF = None
+    from backend.allocation_solver import AllocationSolver, item_weights
+    from backend.cashflow_calendar import INCOME_KINDS, plan_holdings
+    from backend.catalog_file import CatalogFileError
+    from backend.fast_json import dumps, json_response
+    from backend.goal_solver import MAX_SOLVE_YEARS, solve_goal_grid
+    from backend.lazy_import import lazy_import
+    from backend.mailer import EmailQueue, SmtpConnectionPool, load_smtp_settings
+    from backend.metrics import MetricsMiddleware, gauge_lines, register_collector, render_prometheus, span
+    from backend.plan_store import PlanStore, plan_request_id
+    from backend.plan_templates import (
+        CATEGORY_LABELS, CATEGORY_ORDER, DEFAULT_RISK_LEVEL, PlanSnapshot, current_snapshot, get_template, reload_catalog,
+        start_catalog_watcher,
+    )
+    from backend.projection import MAX_PATHS, MAX_YEARS, MIN_YEARS, simulate_projection
+    from backend.rate_limit import RateLimiter, client_key
+    from backend.rebalancing import build_strategies, generate_returns, load_returns_csv, plan_weights, simulate_rebalancing
+    from backend.render_pool import RenderPool, RenderQueueFull
+    from backend.report_cache import ReportCache, SingleFlight, plan_fingerprint, seed_from_fingerprint
+    from backend.report_pdf import PDF_AVAILABLE, preload_report_fonts, render_report_pdf, report_font_path
+    from backend.zip_stream import ZipStream
+except ImportError:  # backend 디렉터리에서 `python main.py` 로 실행하는 경우
+    from allocation_solver import AllocationSolver, item_weights
+    from cashflow_calendar import INCOME_KINDS, plan_holdings
+    from catalog_file import CatalogFileError
+    from fast_json import dumps, json_response
+    from goal_solver import MAX_SOLVE_YEARS, solve_goal_grid
+    from lazy_import import lazy_import
+    from mailer import EmailQueue, SmtpConnectionPool, load_smtp_settings
+    from metrics import MetricsMiddleware, gauge_lines, register_collector, render_prometheus, span
+    from plan_store import PlanStore, plan_request_id
+    from plan_templates import (
+        CATEGORY_LABELS, CATEGORY_ORDER, DEFAULT_RISK_LEVEL, PlanSnapshot, current_snapshot, get_template, reload_catalog,
+        start_catalog_watcher,
+    )
+    from projection import MAX_PATHS, MAX_YEARS, MIN_YEARS, simulate_projection
+    from rate_limit import RateLimiter, client_key
+    from rebalancing import build_strategies, generate_returns, load_returns_csv, plan_weights, simulate_rebalancing
+    from render_pool import RenderPool, RenderQueueFull
+    from report_cache import ReportCache, SingleFlight, plan_fingerprint, seed_from_fingerprint
+    from report_pdf import PDF_AVAILABLE, preload_report_fonts, render_report_pdf, report_font_path
+    from zip_stream import ZipStream
 
-app = FastAPI()
+np = lazy_import("numpy")  # 시작 준비(warm-up) 단계에서 로드
+
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(),
+                    format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    await _startup()
+    try:
+        yield
+    finally:
+        _shutdown_workers()
+
+app = FastAPI(lifespan=_lifespan)
 
 # CORS 설정 (프론트엔드와 연동 가능)
 app.add_middleware(
@@ -23,6 +86,51 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Retry-After"],
+)
+
+# 요청 지표 수집 (/metrics). SLOW_REQUEST_PROFILE_MS 를 넘는 요청은 스택 샘플을 파일로 저장
+app.add_middleware(
+    MetricsMiddleware,
+    slow_request_ms=float(os.getenv("SLOW_REQUEST_PROFILE_MS", "0")),
+    profile_interval_ms=float(os.getenv("SLOW_REQUEST_PROFILE_INTERVAL_MS", "5")),
+    profile_dir=os.getenv("SLOW_REQUEST_PROFILE_DIR", "profiles"),
+)
+
+# PDF 리포트 캐시 (기본 32MB)
+report_cache = ReportCache(int(os.getenv("REPORT_CACHE_MAX_BYTES", str(32 * 1024 * 1024))))
+
+# 같은 플랜의 동시 렌더 요청은 한 번만 렌더링
+report_flights = SingleFlight()
+
+# 리포트 엔드포인트 클라이언트별 요청 제한 (분당 개수, 0 이면 제한 없음)
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+rate_limiters = {
+    "report-pdf": RateLimiter(float(os.getenv("REPORT_PDF_RATE_PER_MIN", "20")),
+                              int(os.getenv("REPORT_PDF_RATE_BURST", "5"))),
+    "report-bulk": RateLimiter(float(os.getenv("REPORT_BULK_RATE_PER_MIN", "2")),
+                               int(os.getenv("REPORT_BULK_RATE_BURST", "1"))),
+    "report-email": RateLimiter(float(os.getenv("REPORT_EMAIL_RATE_PER_MIN", "5")),
+                                int(os.getenv("REPORT_EMAIL_RATE_BURST", "3"))),
+}
+
+# PDF 렌더 프로세스 풀 (REPORT_RENDER_WORKERS=0 이면 스레드풀에서 렌더링)
+render_pool = RenderPool(
+    workers=int(os.getenv("REPORT_RENDER_WORKERS", str(min(2, os.cpu_count() or 1)))),
+    queue_size=int(os.getenv("REPORT_RENDER_QUEUE_SIZE", "8")),
+    retry_after=int(os.getenv("REPORT_RENDER_RETRY_AFTER", "2")),
+    initializer=preload_report_fonts,
+)
+
+# 최적화 배분 솔버 (가까운 목표 수익률의 활성 제약 조합을 캐시해 warm start)
+allocation_solver = AllocationSolver()
+
+# 이메일 발송 큐 (로그인된 SMTP 연결 재사용 + 재시도)
+email_queue = EmailQueue(
+    SmtpConnectionPool(load_smtp_settings, max_size=int(os.getenv("EMAIL_POOL_SIZE", "2"))),
+    workers=int(os.getenv("EMAIL_WORKERS", "1")),
+    batch_size=int(os.getenv("EMAIL_BATCH_SIZE", "20")),
+    max_attempts=int(os.getenv("EMAIL_MAX_ATTEMPTS", "4")),
 )
 
 # ===== 데이터 모델 =====
@@ -30,6 +138,7 @@ class PlanRequest(BaseModel):
     monthly_goal: float
     current_assets: float
     risk_level: str
+    allocation_strategy: str = "fixed"  # "fixed" (성향별 고정 비율) | "optimized" (평균-분산 최적화)
 
 class InvestmentDetail(BaseModel):
     name: str
@@ -57,53 +166,82 @@ class DetailedPlanResponse(BaseModel):
     total_allocation: float
     report: Dict
     assets: List[AssetCategory]
+    plan_id: Optional[str] = None  # 같은 요청 + 같은 카탈로그 버전이면 같은 id (리포트 API 에 plan 대신 전달)
 
-class ReportPdfRequest(BaseModel):
+class ProjectionRequest(BaseModel):
     plan: DetailedPlanResponse
+    years: int = Field(10, ge=MIN_YEARS, le=MAX_YEARS)
+    monthly_contribution: float = Field(0.0, ge=0)  # 만원
+    paths: int = Field(2000, ge=100, le=MAX_PATHS)
+    seed: int = 0
+    risk_level: Optional[str] = None
 
-class ReportEmailRequest(BaseModel):
-    email: str
+# 목표 역산 격자 한 축의 최대 길이
+GOAL_GRID_MAX = 200
+
+class GoalSolveRequest(BaseModel):
+    monthly_goal: float = Field(..., gt=0)  # 만원
+    current_assets: float = Field(0.0, ge=0)
+    risk_level: str = DEFAULT_RISK_LEVEL
+    monthly_goals: List[float] = Field(default_factory=list, max_length=GOAL_GRID_MAX)  # 비우면 monthly_goal 하나
+    years: List[float] = Field(default_factory=lambda: [5, 10, 15, 20], max_length=GOAL_GRID_MAX)
+    monthly_contributions: List[float] = Field(default_factory=lambda: [50, 100, 200, 300], max_length=GOAL_GRID_MAX)
+    contribution_growth: float = Field(0.0, ge=0, le=30)  # 적립액 연 증가율 %
+    annual_return: Optional[float] = Field(None, gt=0, le=50)  # 비우면 성향별 기대수익률
+
+class CashflowCalendarRequest(BaseModel):
     plan: DetailedPlanResponse
+    years: int = Field(1, ge=1, le=MAX_YEARS)
+    reinvest: bool = False  # 분배금을 같은 상품에 재투자
 
-# ===== 투자 상품 데이터베이스 =====
-INVESTMENTS = {
-    "low_risk": [
-        {"name": "KODEX 200", "code": "069500", "expected_return": 6.5, "risk_level": "저위험", "description": "200대 기업 KOSPI 추종 ETF"},
-        {"name": "미국 나스닥 100 ETF", "code": "QQQ", "expected_return": 9.2, "risk_level": "저위험", "description": "미국 기술주 중심 ETF"},
-        {"name": "S&P 500 ETF", "code": "VOO", "expected_return": 7.8, "risk_level": "저위험", "description": "미국 대형주 500사 포함"},
-    ],
-    "mid_risk": [
-        {"name": "KODEX 반도체", "code": "091160", "expected_return": 10.5, "risk_level": "중위험", "description": "반도체 업종 중심 ETF"},
-        {"name": "KODEX 금융", "code": "122630", "expected_return": 9.0, "risk_level": "중위험", "description": "금융업종 ETF"},
-        {"name": "이머징마켓 ETF", "code": "VWO", "expected_return": 11.2, "risk_level": "중위험", "description": "신흥국 주식 포트폴리오"},
-    ],
-    "high_risk": [
-        {"name": "KODEX 바이오", "code": "091170", "expected_return": 15.8, "risk_level": "고위험", "description": "바이오·의료 기업 ETF"},
-        {"name": "KODEX 에너지 화학", "code": "139290", "expected_return": 14.2, "risk_level": "고위험", "description": "에너지·화학 기업 중심"},
-        {"name": "크립토 관련 ETF", "code": "GBTC", "expected_return": 18.5, "risk_level": "고위험", "description": "암호화폐 관련 자산"},
-    ]
-}
+# 리밸런싱 백테스트 한 번에 받을 수 있는 포트폴리오 수
+REBALANCE_MAX_PORTFOLIOS = int(os.getenv("REBALANCE_MAX_PORTFOLIOS", "5000"))
 
-DIVIDEND_STOCKS = [
-    {"name": "SK텔레콤", "code": "017670", "dividend_rate": 4.8, "annual_dividend": 2.4, "payout_months": [3, 6, 9, 12], "description": "통신업. 안정적 배당주"},
-    {"name": "한국전력", "code": "015760", "dividend_rate": 5.2, "annual_dividend": 2.6, "payout_months": [6, 12], "description": "공기업. 높은 배당률"},
-    {"name": "삼성전자", "code": "005930", "dividend_rate": 2.8, "annual_dividend": 5.0, "payout_months": [3, 6, 9, 12], "description": "대형주. 배당 및 성장성"},
-    {"name": "NAVER", "code": "035420", "dividend_rate": 1.2, "annual_dividend": 3.2, "payout_months": [4, 8, 12], "description": "기술주. 배당+성장"},
-    {"name": "LG화학", "code": "051910", "dividend_rate": 3.5, "annual_dividend": 4.1, "payout_months": [4, 10], "description": "화학업. 안정적 배당"},
-    {"name": "현대차", "code": "005380", "dividend_rate": 3.9, "annual_dividend": 5.5, "payout_months": [5, 11], "description": "자동차주. 배당+배당락익"},
-]
-
-REAL_ESTATE_PRODUCTS = [
-    {"name": "신한 리츠", "code": "REITL", "expected_return": 7.2, "description": "부동산 투자신탁. 연 7-8% 배당"},
-    {"name": "호텔신라 리츠", "code": "REITH", "expected_return": 6.8, "description": "리조트·호텔 REIT"},
-    {"name": "부동산 펀드", "code": "REALPROP", "expected_return": 8.5, "description": "저평가 부동산 포트폴리오"},
-]
-
-CASH_PRODUCTS = [
-    {"name": "정기예금 (연 4.5%)", "code": "DEPOSIT", "expected_return": 4.5, "description": "은행 정기예금. 원금안전"},
-    {"name": "적금 (연 4.2%)", "code": "SAVINGS", "expected_return": 4.2, "description": "월 정액 납입식 적금"},
-    {"name": "단기채권 펀드", "code": "BONDFUND", "expected_return": 4.8, "description": "저금리 채권 중심 펀드"},
-]
+class RebalanceSimRequest(BaseModel):
+    plans: List[DetailedPlanResponse] = Field(default_factory=list, max_length=REBALANCE_MAX_PORTFOLIOS)
+    plan_ids: List[str] = Field(default_factory=list, max_length=REBALANCE_MAX_PORTFOLIOS)  # 저장된 플랜
+    years: int = Field(10, ge=1, le=MAX_YEARS)
+    calendar_months: List[int] = Field(default_factory=lambda: [3, 12], max_length=6)  # 분기 / 연 리밸런싱
+    threshold_bands: List[float] = Field(default_factory=lambda: [5.0], max_length=6)  # 목표 비중 이탈 허용폭 %p
+    fee_rate: float = Field(0.1, ge=0, le=5)      # 거래금액 대비 %
+    tax_rate: float = Field(15.4, ge=0, le=60)    # 실현 이익 대비 %
+    returns_source: str = "generated"             # "generated" | "csv" (REBALANCE_RETURNS_CSV)
+    risk_level: Optional[str] = None              # generated 수익률 분포 (기본 중립)
+    seed: int = 0
+    include_portfolios: bool = False              # 포트폴리오별 결과 포함
+
+class ReportPdfRequest(BaseModel):
+    plan: Optional[DetailedPlanResponse] = None
+    plan_id: Optional[str] = None  # plan 대신 /api/plan-detailed 응답의 plan_id
+
+# 대량 리포트 한 번에 받을 수 있는 플랜 수 (plans + plan_ids 합계)
+REPORT_BULK_MAX_PLANS = int(os.getenv("REPORT_BULK_MAX_PLANS", "1000"))
+# 렌더 대기열이 가득 찼을 때 한 건당 기다리는 최대 시간 (초과하면 그 항목은 오류 파일로 대체)
+REPORT_BULK_MAX_WAIT = float(os.getenv("REPORT_BULK_MAX_WAIT", "60"))
+
+class ReportBulkRequest(BaseModel):
+    plans: List[DetailedPlanResponse] = Field(default_factory=list, max_length=REPORT_BULK_MAX_PLANS)
+    plan_ids: List[str] = Field(default_factory=list, max_length=REPORT_BULK_MAX_PLANS)  # 저장된 플랜 (plans 뒤 순서)
+
+class ReportEmailRequest(BaseModel):
+    email: str
+    plan: Optional[DetailedPlanResponse] = None
+    plan_id: Optional[str] = None
+
+# 상세 설계 저장소 (PLAN_STORE_PATH 를 비우면 저장하지 않음).
+# 기본 위치는 실행 디렉터리와 무관하게 backend/data 아래
+PLAN_STORE_PATH = os.getenv(
+    "PLAN_STORE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "holinflow_plans.db")
+)
+plan_store = PlanStore(
+    PLAN_STORE_PATH,
+    encode=lambda plan: plan.model_dump_json(),
+    decode=DetailedPlanResponse.model_validate_json,
+    batch_size=int(os.getenv("PLAN_STORE_BATCH_SIZE", "100")),
+    flush_interval=float(os.getenv("PLAN_STORE_FLUSH_MS", "50")) / 1000,
+    cache_size=int(os.getenv("PLAN_STORE_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("PLAN_STORE_TTL_DAYS", "30")) * 86400,
+) if PLAN_STORE_PATH else None
 
 # ===== API 엔드포인트 =====
 @app.get("/")
@@ -111,48 +249,61 @@ def read_root():
     return {"message": "AI 개인 금융 자동 설계 API 서버 실행 중"}
 
 @app.post("/api/plan", response_model=Dict)
-def generate_plan(req: PlanRequest):
+async def generate_plan(req: PlanRequest):
     """기본 자산 배분 계획 반환"""
-    if req.risk_level == "공격적":
-        allocation = {"현금흐름": 0.1, "투자": 0.5, "부동산": 0.2, "배당": 0.2}
-    elif req.risk_level == "보수적":
-        allocation = {"현금흐름": 0.4, "투자": 0.2, "부동산": 0.2, "배당": 0.2}
-    else:
-        allocation = {"현금흐름": 0.25, "투자": 0.35, "부동산": 0.2, "배당": 0.2}
-    
+    allocation = get_template(req.risk_level).allocation
     plan = {k: round(req.monthly_goal * v, 2) for k, v in allocation.items()}
     return {"allocation": plan}
 
 @app.post("/api/plan-detailed", response_model=DetailedPlanResponse)
-def generate_detailed_plan(req: PlanRequest):
-    """상세 자산 배분 계획 + 종목 추천"""
-    
-    # 기본 배분 비율
-    if req.risk_level == "공격적":
-        allocation = {"현금흐름": 0.1, "투자": 0.5, "부동산": 0.2, "배당": 0.2}
-        risk_category = "high_risk"
-    elif req.risk_level == "보수적":
-        allocation = {"현금흐름": 0.4, "투자": 0.2, "부동산": 0.2, "배당": 0.2}
-        risk_category = "low_risk"
-    else:
-        allocation = {"현금흐름": 0.25, "투자": 0.35, "부동산": 0.2, "배당": 0.2}
-        risk_category = "mid_risk"
-    
+async def create_detailed_plan(req: PlanRequest, request: Request, compact: bool = False):
+    """
+    상세 자산 배분 계획 + 종목 추천.
+    compact=true 면 종목은 코드/배분액만 보내고 상품 정보는 /api/catalog/products (catalog_version) 로 조회
+    """
+    # 저장소 메모리에 있으면 바로 응답, 없으면 계산(최적화 배분 포함)은 스레드풀에서
+    plan = None
+    if plan_store is not None:
+        plan = plan_store.peek(plan_request_id(req.model_dump(), current_snapshot().catalog.version))
+    if plan is None:
+        plan = await run_in_threadpool(generate_detailed_plan, req)
+    return _plan_response(plan, request, compact)
+
+def generate_detailed_plan(req: PlanRequest, store: bool = True) -> DetailedPlanResponse:
+    """상세 자산 배분 계획 + 종목 추천 (같은 요청은 같은 plan_id / 같은 플랜). store=False 면 저장소를 거치지 않음"""
+    snapshot = current_snapshot()
+    plan_id = plan_request_id(req.model_dump(), snapshot.catalog.version)
+    # 메모리에 없으면 DB 를 보지 않고 다시 계산 (같은 plan_id 면 같은 플랜이고, DB 조회 + 파싱보다 빠름)
+    if store and plan_store is not None:
+        stored = plan_store.peek(plan_id)
+        if stored is not None:
+            return stored
+
+    # 기본 배분 비율 (투자 성향별 템플릿)
+    template = snapshot.get_template(req.risk_level)
+    allocation = template.allocation
+    category_rates = template.category_rates
+    weighted_annual_return = template.weighted_annual_return
+    monthly_return_rate = template.monthly_return_rate
+    optimized = req.allocation_strategy == "optimized"
+    solution = None
+    if optimized:
+        with span("plan.allocation"):
+            solution = _solve_allocation(template, req.monthly_goal, req.current_assets)
+        allocation = dict(zip(CATEGORY_ORDER, solution.weights))
+        weighted_annual_return = solution.expected_return
+        monthly_return_rate = weighted_annual_return / 100 / 12
+
+    # 추천 종목은 plan_id 로 시드를 고정해 같은 요청이면 항상 같은 종목
+    rng = random.Random(seed_from_fingerprint(plan_id))
+    with span("plan.sample_items"):
+        cash_items = rng.sample(template.cash_products, min(2, len(template.cash_products)))
+        investment_items = rng.sample(template.investment_products, min(3, len(template.investment_products)))
+        dividend_items = rng.sample(template.dividend_products, min(3, len(template.dividend_products)))
+        real_estate_items = rng.sample(template.real_estate_products, min(2, len(template.real_estate_products)))
+
     assets = []
     total_assets = req.current_assets
-    category_rates = {
-        "현금흐름": 4.5,
-        "투자": 10.0,
-        "배당": 3.8,
-        "부동산": 7.5,
-    }
-    weighted_annual_return = (
-        allocation["현금흐름"] * category_rates["현금흐름"]
-        + allocation["투자"] * category_rates["투자"]
-        + allocation["배당"] * category_rates["배당"]
-        + allocation["부동산"] * category_rates["부동산"]
-    )
-    monthly_return_rate = weighted_annual_return / 100 / 12
     expected_monthly_income_raw = total_assets * monthly_return_rate if monthly_return_rate > 0 else 0.0
     required_total_assets_raw = req.monthly_goal / monthly_return_rate if monthly_return_rate > 0 else 0.0
     required_additional_assets_raw = max(0.0, required_total_assets_raw - total_assets)
@@ -168,16 +319,16 @@ def generate_detailed_plan(req: PlanRequest):
     
     # 1. 현금흐름 (정기예금/적금 등)
     cash_amount = total_assets * allocation["현금흐름"]
-    cash_items = random.sample(CASH_PRODUCTS, min(2, len(CASH_PRODUCTS)))
+    cash_shares = _item_shares(cash_amount, [item.expected_return for item in cash_items], optimized)
     cash_items = [
         {
-            "name": item["name"],
-            "code": item["code"],
-            "expected_return": item["expected_return"],
-            "description": item["description"],
-            "allocation": round(cash_amount / len(cash_items), 0)
+            "name": item.name,
+            "code": item.code,
+            "expected_return": item.expected_return,
+            "description": item.description,
+            "allocation": round(share, 0)
         }
-        for item in cash_items
+        for item, share in zip(cash_items, cash_shares)
     ]
     assets.append(AssetCategory(
         category="현금흐름",
@@ -189,16 +340,18 @@ def generate_detailed_plan(req: PlanRequest):
     
     # 2. 투자 (ETF 등)
     investment_amount = total_assets * allocation["투자"]
-    investment_items = random.sample(INVESTMENTS[risk_category], min(3, len(INVESTMENTS[risk_category])))
+    investment_shares = _item_shares(
+        investment_amount, [item.expected_return for item in investment_items], optimized
+    )
     investment_items = [
         {
-            "name": item["name"],
-            "code": item["code"],
-            "expected_return": item["expected_return"],
-            "description": item["description"],
-            "allocation": round(investment_amount / len(investment_items), 0)
+            "name": item.name,
+            "code": item.code,
+            "expected_return": item.expected_return,
+            "description": item.description,
+            "allocation": round(share, 0)
         }
-        for item in investment_items
+        for item, share in zip(investment_items, investment_shares)
     ]
     assets.append(AssetCategory(
         category="투자 (ETF)",
@@ -210,23 +363,19 @@ def generate_detailed_plan(req: PlanRequest):
     
     # 3. 배당 (배당주)
     dividend_amount = total_assets * allocation["배당"]
-    dividend_items = random.sample(DIVIDEND_STOCKS, min(3, len(DIVIDEND_STOCKS)))
+    dividend_shares = _item_shares(dividend_amount, [item.dividend_rate for item in dividend_items], optimized)
     dividend_items = [
         {
-            "name": item["name"],
-            "code": item["code"],
-            "dividend_rate": item["dividend_rate"],
-            "description": item["description"],
-            "allocation": round(dividend_amount / len(dividend_items), 0),
-            "expected_annual_dividend": round(
-                (dividend_amount / len(dividend_items)) * item["dividend_rate"] / 100, 2
-            ),
-            "expected_quarterly_dividend": round(
-                (dividend_amount / len(dividend_items)) * item["dividend_rate"] / 100 / 4, 2
-            ),
-            "payout_months": item["payout_months"],
+            "name": item.name,
+            "code": item.code,
+            "dividend_rate": item.dividend_rate,
+            "description": item.description,
+            "allocation": round(share, 0),
+            "expected_annual_dividend": round(share * item.dividend_rate / 100, 2),
+            "expected_quarterly_dividend": round(share * item.dividend_rate / 100 / 4, 2),
+            "payout_months": list(item.payout_months),
         }
-        for item in dividend_items
+        for item, share in zip(dividend_items, dividend_shares)
     ]
     assets.append(AssetCategory(
         category="배당주",
@@ -238,16 +387,18 @@ def generate_detailed_plan(req: PlanRequest):
     
     # 4. 부동산 (REITs)
     real_estate_amount = total_assets * allocation["부동산"]
-    real_estate_items = random.sample(REAL_ESTATE_PRODUCTS, min(2, len(REAL_ESTATE_PRODUCTS)))
+    real_estate_shares = _item_shares(
+        real_estate_amount, [item.expected_return for item in real_estate_items], optimized
+    )
     real_estate_items = [
         {
-            "name": item["name"],
-            "code": item["code"],
-            "expected_return": item["expected_return"],
-            "description": item["description"],
-            "allocation": round(real_estate_amount / len(real_estate_items), 0)
+            "name": item.name,
+            "code": item.code,
+            "expected_return": item.expected_return,
+            "description": item.description,
+            "allocation": round(share, 0)
         }
-        for item in real_estate_items
+        for item, share in zip(real_estate_items, real_estate_shares)
     ]
     assets.append(AssetCategory(
         category="부동산 (REITs)",
@@ -257,56 +408,437 @@ def generate_detailed_plan(req: PlanRequest):
         expected_income=round(real_estate_amount * category_rates["부동산"] / 100 / 12, 1)
     ))
     
-    return DetailedPlanResponse(
+    report = {
+        "current_assets": total_assets,
+        "expected_monthly_income": expected_monthly_income,
+        "monthly_goal_gap": monthly_goal_gap,
+        "required_total_assets": required_total_assets,
+        "required_additional_assets": required_additional_assets,
+        "weighted_annual_return": round(weighted_annual_return, 2),
+        "risk_level": template.risk_level,
+        "catalog_version": snapshot.catalog.version,
+    }
+    if solution is not None:
+        report.update(_optimized_report_fields(solution, total_assets))
+
+    plan = DetailedPlanResponse(
         monthly_goal=req.monthly_goal,
         total_allocation=sum(a.amount for a in assets),
-        report={
-            "current_assets": total_assets,
-            "expected_monthly_income": expected_monthly_income,
-            "monthly_goal_gap": monthly_goal_gap,
-            "required_total_assets": required_total_assets,
-            "required_additional_assets": required_additional_assets,
-            "weighted_annual_return": round(weighted_annual_return, 2),
-        },
-        assets=assets
+        report=report,
+        assets=assets,
+        plan_id=plan_id,
+    )
+    if store and plan_store is not None:
+        plan_store.put(plan_id, plan)
+    return plan
+
+@app.get("/api/plans/{plan_id}", response_model=DetailedPlanResponse)
+async def get_stored_plan(plan_id: str, request: Request, compact: bool = False):
+    """저장된 상세 설계 조회 (메모리에 없으면 DB 조회는 스레드풀에서)"""
+    plan = plan_store.peek(plan_id) if plan_store is not None else None
+    if plan is None:
+        plan = await run_in_threadpool(_stored_plan, plan_id)
+    return _plan_response(plan, request, compact)
+
+# 카탈로그에서 다시 얻을 수 있는 종목 필드 (compact 응답에서 제외)
+_CATALOG_ITEM_FIELDS = frozenset(("name", "description", "expected_return", "dividend_rate", "payout_months"))
+
+def _compact_plan(plan: DetailedPlanResponse) -> Dict:
+    """종목 상세를 코드 + 배분액(+ 배당 계산값)으로 줄인 응답"""
+    return {
+        "compact": True,
+        "catalog_version": plan.report.get("catalog_version"),
+        "plan_id": plan.plan_id,
+        "monthly_goal": plan.monthly_goal,
+        "total_allocation": plan.total_allocation,
+        "report": plan.report,
+        "assets": [
+            {
+                "category": asset.category,
+                "amount": asset.amount,
+                "allocation_percent": asset.allocation_percent,
+                "expected_income": asset.expected_income,
+                "items": [{k: v for k, v in item.items() if k not in _CATALOG_ITEM_FIELDS} for item in asset.items],
+            }
+            for asset in plan.assets
+        ],
+    }
+
+def _plan_response(plan: DetailedPlanResponse, request: Request, compact: bool) -> Response:
+    # 서버가 만든 모델이라 response_model 재검증 없이 바로 직렬화
+    return json_response(_compact_plan(plan) if compact else plan, request.headers.get("accept-encoding"))
+
+def _stored_plan(plan_id: str) -> DetailedPlanResponse:
+    plan = plan_store.get(plan_id) if plan_store is not None else None
+    if plan is None:
+        raise HTTPException(status_code=404, detail="저장된 플랜을 찾을 수 없습니다. 설계를 다시 요청하세요.")
+    return plan
+
+async def _load_stored_plans(plan_ids: List[str]) -> List[DetailedPlanResponse]:
+    """plan_id 목록 -> 플랜 (메모리에 없는 것만 모아 스레드풀에서 DB 조회, 없는 id 가 있으면 404)"""
+    plans = [plan_store.peek(plan_id) if plan_store is not None else None for plan_id in plan_ids]
+    missing = [plan_id for plan_id, plan in zip(plan_ids, plans) if plan is None]
+    if missing:
+        loaded = iter(await run_in_threadpool(lambda: [_stored_plan(plan_id) for plan_id in missing]))
+        plans = [plan if plan is not None else next(loaded) for plan in plans]
+    return plans
+
+async def _resolve_report_plan(plan: Optional[DetailedPlanResponse], plan_id: Optional[str]) -> tuple:
+    """리포트 요청의 plan 또는 plan_id -> (플랜, 리포트 캐시 키). 메모리에 없는 plan_id 는 스레드풀에서 DB 조회"""
+    if plan is not None:
+        return plan, plan_fingerprint(plan)
+    if not plan_id:
+        raise HTTPException(status_code=422, detail="plan 또는 plan_id 가 필요합니다.")
+    stored = plan_store.peek(plan_id) if plan_store is not None else None
+    if stored is None:
+        return await run_in_threadpool(lambda: (_stored_plan(plan_id), _stored_plan_fingerprint(plan_id)))
+    return stored, _stored_plan_fingerprint(plan_id)
+
+@lru_cache(maxsize=4096)
+def _stored_plan_fingerprint(plan_id: str) -> str:
+    # plan_id 의 플랜 내용은 바뀌지 않으므로 해시를 한 번만 계산 (없는 id 는 예외라 캐시되지 않음)
+    return plan_fingerprint(_stored_plan(plan_id))
+
+def _target_return(monthly_goal: float, current_assets: float) -> float:
+    """월 목표 현금흐름에 필요한 연수익률 (%)"""
+    return monthly_goal * 12 / current_assets * 100 if current_assets > 0 else float("inf")
+
+def _solve_allocation(template, monthly_goal: float, current_assets: float):
+    """월 목표 현금흐름에 필요한 연수익률을 목표로 최소 분산 카테고리 비중 계산"""
+    return allocation_solver.solve(
+        template.risk_level,
+        [template.category_rates[k] for k in CATEGORY_ORDER],
+        [template.category_volatility[k] for k in CATEGORY_ORDER],
+        [template.allocation_bounds[k] for k in CATEGORY_ORDER],
+        _target_return(monthly_goal, current_assets),
+    )
+
+def _optimized_report_fields(solution, current_assets: float) -> Dict:
+    return {
+        "allocation_strategy": "optimized",
+        "target_annual_return": round(solution.target_return, 2) if current_assets > 0 else None,
+        "target_reachable": solution.target_reachable,
+        "portfolio_volatility": round(solution.volatility, 2),
+    }
+
+def _item_shares(amount: float, returns: List[float], optimized: bool) -> List[float]:
+    """카테고리 금액을 종목별로 분배 (고정: 균등, 최적화: 기대수익 LP)"""
+    if not optimized:
+        return [amount / len(returns)] * len(returns)
+    return [amount * w for w in item_weights(returns)]
+
+# ===== 배치 설계 (벡터 연산) =====
+BATCH_CHUNK_SIZE = 1000
+
+@lru_cache(maxsize=4)
+def _batch_tables(snapshot: PlanSnapshot) -> Dict:
+    """스냅샷(카탈로그 버전)별 배분 비율/수익률 표. 열 순서는 CATEGORY_ORDER (assets 순서와 동일)"""
+    risk_levels = tuple(snapshot.templates)
+    templates = [snapshot.templates[r] for r in risk_levels]
+    risk_index = {risk_level: i for i, risk_level in enumerate(risk_levels)}
+    return {
+        "risk_levels": risk_levels,
+        "risk_index": risk_index,
+        "default_index": risk_index[DEFAULT_RISK_LEVEL],
+        "category_rates": np.array([snapshot.get_template(DEFAULT_RISK_LEVEL).category_rates[k] for k in CATEGORY_ORDER]),
+        "allocation": np.array([[t.allocation[k] for k in CATEGORY_ORDER] for t in templates]),
+        "weighted_returns": np.array([t.weighted_annual_return for t in templates]),
+    }
+
+def _compute_batch_figures(reqs: List[PlanRequest], snapshot: PlanSnapshot) -> Dict[str, Any]:
+    """여러 고객의 배분/수익률/필요자산/부족분을 한 번의 벡터 연산으로 계산"""
+    tables = _batch_tables(snapshot)
+    risk_index = np.fromiter(
+        (tables["risk_index"].get(r.risk_level, tables["default_index"]) for r in reqs), dtype=np.intp, count=len(reqs)
+    )
+    monthly_goal = np.fromiter((r.monthly_goal for r in reqs), dtype=float, count=len(reqs))
+    current_assets = np.fromiter((r.current_assets for r in reqs), dtype=float, count=len(reqs))
+
+    allocation = tables["allocation"][risk_index]
+    weighted_annual_return = tables["weighted_returns"][risk_index]
+    solutions = _batch_solutions(reqs, snapshot)
+    if solutions:
+        # 최적화 요청 행만 풀이 결과로 덮어씀 (팬시 인덱싱 결과는 복사본이라 표는 그대로)
+        rows = list(solutions)
+        allocation[rows] = [solutions[i].weights for i in rows]
+        weighted_annual_return[rows] = [solutions[i].expected_return for i in rows]
+    monthly_return_rate = weighted_annual_return / 100 / 12
+    positive = monthly_return_rate > 0
+    safe_rate = np.where(positive, monthly_return_rate, 1.0)
+
+    expected_monthly_income = np.where(positive, current_assets * monthly_return_rate, 0.0)
+    required_total_assets = np.where(positive, monthly_goal / safe_rate, 0.0)
+    required_additional_assets = np.maximum(0.0, required_total_assets - current_assets)
+    monthly_goal_gap = np.maximum(0.0, monthly_goal - expected_monthly_income)
+    reached = monthly_goal_gap < 0.01
+    monthly_goal_gap[reached] = 0.0
+    required_additional_assets[reached] = 0.0
+
+    amounts = current_assets[:, None] * allocation
+    return {
+        "risk_index": risk_index,
+        "monthly_goal": monthly_goal,
+        "current_assets": current_assets,
+        "allocation": allocation,
+        "amounts": amounts,
+        "category_income": amounts * tables["category_rates"] / 100 / 12,
+        "weighted_annual_return": weighted_annual_return,
+        "expected_monthly_income": expected_monthly_income,
+        "monthly_goal_gap": monthly_goal_gap,
+        "required_total_assets": required_total_assets,
+        "required_additional_assets": required_additional_assets,
+        "solutions": solutions,
+    }
+
+def _batch_solutions(reqs: List[PlanRequest], snapshot: PlanSnapshot) -> Dict[int, Any]:
+    """allocation_strategy == "optimized" 인 요청 -> 풀이 결과. (성향, 목표 수익률) 조합마다 한 번만 풂"""
+    solved: Dict[Tuple[str, float], Any] = {}
+    solutions = {}
+    for i, req in enumerate(reqs):
+        if req.allocation_strategy != "optimized":
+            continue
+        template = snapshot.get_template(req.risk_level)
+        key = (template.risk_level, _target_return(req.monthly_goal, req.current_assets))
+        if key not in solved:
+            with span("plan.allocation"):
+                solved[key] = _solve_allocation(template, req.monthly_goal, req.current_assets)
+        solutions[i] = solved[key]
+    return solutions
+
+def _iter_batch_ndjson(reqs: List[PlanRequest], snapshot: PlanSnapshot) -> Iterator[bytes]:
+    """배치 결과를 BATCH_CHUNK_SIZE 단위로 계산해 NDJSON 으로 흘려보냄"""
+    risk_levels = _batch_tables(snapshot)["risk_levels"]
+    for start in range(0, len(reqs), BATCH_CHUNK_SIZE):
+        chunk = reqs[start:start + BATCH_CHUNK_SIZE]
+        with span("plan.batch_chunk"):
+            figures = _compute_batch_figures(chunk, snapshot)
+            solutions = figures.pop("solutions")
+            figures = {k: v.tolist() for k, v in figures.items()}
+        lines = []
+        for i, req in enumerate(chunk):
+            amounts = figures["amounts"][i]
+            row = {
+                "index": start + i,
+                "monthly_goal": figures["monthly_goal"][i],
+                "risk_level": req.risk_level,
+                "total_allocation": sum(amounts),
+                "report": {
+                    "current_assets": figures["current_assets"][i],
+                    "expected_monthly_income": round(figures["expected_monthly_income"][i], 2),
+                    "monthly_goal_gap": round(figures["monthly_goal_gap"][i], 2),
+                    "required_total_assets": round(figures["required_total_assets"][i], 2),
+                    "required_additional_assets": round(figures["required_additional_assets"][i], 2),
+                    "weighted_annual_return": round(figures["weighted_annual_return"][i], 2),
+                    "risk_level": risk_levels[figures["risk_index"][i]],
+                },
+                "assets": [
+                    {
+                        "category": label,
+                        "amount": amounts[j],
+                        "allocation_percent": figures["allocation"][i][j] * 100,
+                        "expected_income": round(figures["category_income"][i][j], 1),
+                    }
+                    for j, label in enumerate(CATEGORY_LABELS)
+                ],
+            }
+            if i in solutions:
+                row["report"].update(_optimized_report_fields(solutions[i], figures["current_assets"][i]))
+            lines.append(dumps(row))
+        yield b"\n".join(lines) + b"\n"
+
+@app.post("/api/plan-detailed/batch")
+async def generate_detailed_plan_batch(reqs: List[PlanRequest]):
+    """여러 고객 프로필의 상세 배분 수치를 한 번에 계산 (NDJSON 스트리밍, 종목 추천 제외)"""
+    # 배치 전체가 같은 카탈로그 버전으로 계산되도록 스냅샷을 고정 (동기 제너레이터라 청크 계산은 스레드풀에서)
+    return StreamingResponse(_iter_batch_ndjson(reqs, current_snapshot()), media_type="application/x-ndjson")
+
+# ===== 자산 성장 예측 (몬테카를로) =====
+@app.post("/api/projection")
+async def project_growth(req: ProjectionRequest):
+    """카테고리별 수익률 경로를 시뮬레이션해 p10/p50/p90 자산 구간과 목표 달성 확률 반환"""
+    return await run_in_threadpool(_project_growth, req)
+
+def _project_growth(req: ProjectionRequest) -> Dict:
+    template = get_template(req.risk_level or str(req.plan.report.get("risk_level", DEFAULT_RISK_LEVEL)))
+    amounts_by_label = {asset.category: asset.amount for asset in req.plan.assets}
+    amounts = tuple(float(amounts_by_label.get(label, 0.0)) for label in CATEGORY_LABELS)
+    if sum(amounts) <= 0:
+        raise HTTPException(status_code=400, detail="배분 금액이 있는 플랜이 필요합니다.")
+
+    required_total_assets = float(req.plan.report.get("required_total_assets") or 0.0)
+    if required_total_assets <= 0 and template.monthly_return_rate > 0:
+        required_total_assets = req.plan.monthly_goal / template.monthly_return_rate
+
+    with span("projection.simulate"):
+        return simulate_projection(
+            amounts=amounts,
+            annual_returns=tuple(template.category_rates[k] for k in CATEGORY_ORDER),
+            annual_volatility=tuple(template.category_volatility[k] for k in CATEGORY_ORDER),
+            years=req.years,
+            monthly_contribution=req.monthly_contribution,
+            required_total_assets=required_total_assets,
+            paths=req.paths,
+            seed=req.seed,
+        )
+
+# ===== 목표 역산 (필요 적립액 / 기간) =====
+def _finite_rounded(values: "np.ndarray", digits: int) -> list:
+    """inf (도달 불가) -> None"""
+    return [[round(float(v), digits) if np.isfinite(v) else None for v in row] for row in values.tolist()]
+
+@app.post("/api/goal-solve")
+async def solve_goal(req: GoalSolveRequest):
+    """
+    목표 시점(years)별 필요 월 적립액과 월 적립액(monthly_contributions)별 목표 도달 기간을
+    목표 금액 x 시나리오 격자로 한 번에 계산 (만원, 년)
+    """
+    return await run_in_threadpool(_solve_goal, req)
+
+def _solve_goal(req: GoalSolveRequest) -> Dict:
+    goals = req.monthly_goals or [req.monthly_goal]
+    if any(g <= 0 for g in goals):
+        raise HTTPException(status_code=400, detail="월 목표는 0보다 커야 합니다.")
+    if any(not 0 < y <= MAX_SOLVE_YEARS for y in req.years):
+        raise HTTPException(status_code=400, detail=f"years 는 0 초과 {MAX_SOLVE_YEARS} 이하여야 합니다.")
+    if any(c < 0 for c in req.monthly_contributions):
+        raise HTTPException(status_code=400, detail="월 적립액은 0 이상이어야 합니다.")
+
+    template = get_template(req.risk_level)
+    annual_return = req.annual_return if req.annual_return is not None else template.weighted_annual_return
+    with span("plan.goal_solve"):
+        result = solve_goal_grid(goals, req.current_assets, annual_return, req.years, req.monthly_contributions,
+                                 req.contribution_growth)
+    return {
+        "risk_level": template.risk_level,
+        "annual_return": round(annual_return, 2),
+        "contribution_growth": req.contribution_growth,
+        "current_assets": req.current_assets,
+        "monthly_goals": goals,
+        "required_total_assets": [round(float(v), 2) for v in result["required_total_assets"]],
+        "years": req.years,
+        "required_monthly_contribution": _finite_rounded(result["required_monthly_contribution"], 2),
+        "monthly_contributions": req.monthly_contributions,
+        "years_to_goal": _finite_rounded(result["months_to_goal"] / 12, 2),
+    }
+
+# ===== 리밸런싱 백테스트 =====
+# 포트폴리오 평균 외에 분포를 함께 보여줄 지표
+_REBALANCE_PERCENTILE_METRICS = ("annualized_return", "max_drawdown", "annual_cost_drag")
+
+def _rebalance_returns(req: RebalanceSimRequest) -> "np.ndarray":
+    months = req.years * 12
+    if req.returns_source == "csv":
+        path = os.getenv("REBALANCE_RETURNS_CSV")
+        if not path:
+            raise HTTPException(status_code=400, detail="REBALANCE_RETURNS_CSV 가 설정되지 않았습니다.")
+        try:
+            returns = load_returns_csv(path)
+        except (OSError, ValueError) as exc:
+            raise HTTPException(status_code=500, detail=f"수익률 CSV 를 읽지 못했습니다: {exc}")
+        return returns[:months]  # CSV 가 짧으면 있는 기간만
+    if req.returns_source != "generated":
+        raise HTTPException(status_code=400, detail="returns_source 는 generated 또는 csv 입니다.")
+    template = get_template(req.risk_level or DEFAULT_RISK_LEVEL)
+    return generate_returns(
+        [template.category_rates[k] for k in CATEGORY_ORDER],
+        [template.category_volatility[k] for k in CATEGORY_ORDER],
+        months,
+        req.seed,
     )
 
-def _pick_extra_recommendations(existing_codes: set, count: int = 3) -> List[Dict]:
-    pool: List[Dict] = []
-    for items in INVESTMENTS.values():
-        for item in items:
-            pool.append({
-                "name": item["name"],
-                "code": item["code"],
-                "type": "ETF",
-                "description": item["description"],
-            })
-    for item in DIVIDEND_STOCKS:
-        pool.append({
-            "name": item["name"],
-            "code": item["code"],
-            "type": "배당주",
-            "description": item["description"],
-        })
-    for item in REAL_ESTATE_PRODUCTS:
-        pool.append({
-            "name": item["name"],
-            "code": item["code"],
-            "type": "REITs",
-            "description": item["description"],
-        })
-    for item in CASH_PRODUCTS:
-        pool.append({
-            "name": item["name"],
-            "code": item["code"],
-            "type": "현금성",
-            "description": item["description"],
-        })
-
-    candidates = [item for item in pool if item["code"] not in existing_codes]
-    if len(candidates) <= count:
-        return candidates
-    return random.sample(candidates, count)
+@app.post("/api/rebalance-sim")
+async def simulate_rebalance(req: RebalanceSimRequest):
+    """
+    고객 플랜들의 카테고리 배분을 기준으로 리밸런싱 없음 / 주기형 / 허용범위형 전략을 같은 수익률 시계열로 비교
+    (비중 이탈, 회전율, 수수료/세금 비용)
+    """
+    # 저장된 플랜 조회(DB), CSV 읽기, 시뮬레이션 모두 스레드풀에서
+    return await run_in_threadpool(_simulate_rebalance, req)
+
+def _simulate_rebalance(req: RebalanceSimRequest) -> Dict:
+    plans = list(req.plans) + [_stored_plan(plan_id) for plan_id in req.plan_ids]
+    if not plans or len(plans) > REBALANCE_MAX_PORTFOLIOS:
+        raise HTTPException(status_code=400, detail=f"플랜은 1~{REBALANCE_MAX_PORTFOLIOS}개가 필요합니다.")
+    if any(m <= 0 for m in req.calendar_months) or any(b <= 0 for b in req.threshold_bands):
+        raise HTTPException(status_code=400, detail="리밸런싱 주기와 허용폭은 0보다 커야 합니다.")
+
+    amounts = []
+    for plan in plans:
+        by_label = {asset.category: asset.amount for asset in plan.assets}
+        amounts.append([float(by_label.get(label, 0.0)) for label in CATEGORY_LABELS])
+    weights, initial_values = plan_weights(amounts)
+    if (initial_values <= 0).any():
+        empty = [i for i, v in enumerate(initial_values.tolist()) if v <= 0]
+        raise HTTPException(status_code=400, detail=f"배분 금액이 없는 플랜이 있습니다: {empty[:10]}")
+
+    returns = _rebalance_returns(req)
+    strategies = build_strategies(req.calendar_months, req.threshold_bands)
+    with span("rebalance.simulate"):
+        result = simulate_rebalancing(weights, initial_values, returns, strategies,
+                                      fee_rate=req.fee_rate / 100, tax_rate=req.tax_rate / 100)
+
+    summary = []
+    for i, strategy in enumerate(strategies):
+        row = {"strategy": strategy.name, "period_months": strategy.period_months, "band_pp": strategy.band * 100}
+        for name, values in result.items():
+            row[f"{name}_avg"] = round(float(values[i].mean()), 6)
+        for name in _REBALANCE_PERCENTILE_METRICS:
+            p10, p50, p90 = np.percentile(result[name][i], [10, 50, 90])
+            row.update({f"{name}_p10": round(float(p10), 6), f"{name}_p50": round(float(p50), 6),
+                        f"{name}_p90": round(float(p90), 6)})
+        summary.append(row)
+
+    response = {
+        "months": len(returns),
+        "returns_source": req.returns_source,
+        "portfolios": len(plans),
+        "total_initial_value": round(float(initial_values.sum()), 2),
+        "strategies": summary,
+    }
+    if req.include_portfolios:
+        response["per_portfolio"] = {
+            strategy.name: {name: np.round(values[i], 6).tolist() for name, values in result.items()}
+            for i, strategy in enumerate(strategies)
+        }
+    return response
+
+# ===== 월별 현금흐름 달력 =====
+def _plan_cashflow(plan: DetailedPlanResponse, years: int = 1, reinvest: bool = False) -> tuple:
+    """(종류별 (years, 12) 배열 dict, 카탈로그에 없는 코드 목록)"""
+    payouts = current_snapshot().payouts
+    holdings, unmatched = payouts.holdings_vector(plan_holdings(plan.assets))
+    with span("plan.cashflow_calendar"):
+        return payouts.calendar(holdings, years, reinvest), unmatched
+
+@app.post("/api/cashflow-calendar")
+async def get_cashflow_calendar(req: CashflowCalendarRequest):
+    """배당/이자/리츠 분배금의 월별 수입 달력 (years 년, 만원, 행렬 곱 한 번이라 이벤트 루프에서 바로 계산)"""
+    calendar, unmatched = _plan_cashflow(req.plan, req.years, req.reinvest)
+    total = calendar["total"]
+    return {
+        "years": req.years,
+        "reinvest": req.reinvest,
+        "months": list(range(1, 13)),
+        "total": np.round(total, 2).tolist(),
+        **{name: np.round(calendar[name], 2).tolist() for name, _ in INCOME_KINDS},
+        "annual_total": np.round(total.sum(axis=1), 2).tolist(),
+        "monthly_average": round(float(total[0].mean()), 2),
+        "unmatched_codes": unmatched,
+    }
+
+def _pick_extra_recommendations(
+    existing_codes: set, count: int = 3, rng: Optional[random.Random] = None
+) -> List[Dict]:
+    picked = current_snapshot().catalog.sample(count, rng=rng, exclude_codes=existing_codes)
+    return [
+        {
+            "name": product.name,
+            "code": product.code,
+            "type": product.type_label,
+            "description": product.description,
+        }
+        for product in picked
+    ]
 
 def _build_ai_opinion(risk_level: str) -> str:
     if risk_level == "공격적":
@@ -318,117 +850,341 @@ def _build_ai_opinion(risk_level: str) -> str:
 def _build_market_opinion() -> str:
     return "현재 시장은 금리 민감도가 높아 변동성이 반복될 수 있습니다. 배당/현금흐름 비중을 유지하며 분산 투자가 유효합니다."
 
-def _get_pdf_font(pdf: "FPDF") -> str:
-    font_path = "C:/Windows/Fonts/malgun.ttf"
-    if os.path.exists(font_path):
-        pdf.add_font("Malgun", "", font_path, uni=True)
-        return "Malgun"
-    return "Helvetica"
-
-def _build_report_pdf(plan: DetailedPlanResponse) -> bytes:
-    if FPDF is None:
-        raise HTTPException(status_code=500, detail="PDF 생성 라이브러리가 설치되지 않았습니다.")
-
+def _prepare_report_inputs(plan: DetailedPlanResponse, fingerprint: Optional[str] = None) -> tuple:
+    """렌더러(별도 프로세스)에 넘길 pickle 가능한 입력 준비"""
     existing_codes = {
         item.get("code")
         for asset in plan.assets
         for item in asset.items
         if isinstance(item, dict)
     }
-    extra_items = _pick_extra_recommendations(existing_codes, count=3)
+    # 같은 플랜은 항상 같은 추가 추천이 나오도록 플랜 해시로 시드 고정
+    fingerprint = fingerprint or plan_fingerprint(plan)
+    rng = random.Random(seed_from_fingerprint(fingerprint))
+    extra_items = _pick_extra_recommendations(existing_codes, count=3, rng=rng)
     ai_opinion = _build_ai_opinion(str(plan.report.get("risk_level", "중립")))
     market_opinion = _build_market_opinion()
+    monthly_cashflow = [round(v, 2) for v in _plan_cashflow(plan)[0]["total"][0].tolist()]
+    return plan.model_dump(), extra_items, ai_opinion, market_opinion, monthly_cashflow
 
-    pdf = FPDF()
-    pdf.add_page()
-    font_name = _get_pdf_font(pdf)
-    pdf.set_font(font_name, size=12)
-
-    pdf.cell(0, 10, "HolinFlow Detailed Report", ln=True)
-    pdf.set_font(font_name, size=10)
-    pdf.cell(0, 8, f"Monthly Goal: {plan.monthly_goal} 만원", ln=True)
-    pdf.cell(0, 8, f"Current Assets: {plan.report.get('current_assets', 0)} 만원", ln=True)
-    pdf.cell(0, 8, f"Expected Monthly Income: {plan.report.get('expected_monthly_income', 0)} 만원", ln=True)
-    pdf.cell(0, 8, f"Required Additional Assets: {plan.report.get('required_additional_assets', 0)} 만원", ln=True)
-
-    pdf.ln(4)
-    pdf.set_font(font_name, size=11)
-    pdf.cell(0, 8, "Allocation Details", ln=True)
-    pdf.set_font(font_name, size=9)
-    for asset in plan.assets:
-        pdf.cell(0, 7, f"- {asset.category} ({round(asset.amount, 1)} 만원)", ln=True)
-        for item in asset.items:
-            name = item.get("name", "")
-            code = item.get("code", "")
-            allocation = item.get("allocation", 0)
-            pdf.cell(0, 6, f"  * {name} ({code}) / {allocation} 만원", ln=True)
-            payout_months = item.get("payout_months")
-            if payout_months:
-                count = len(payout_months)
-                months_text = ", ".join(str(month) for month in payout_months)
-                pdf.cell(0, 6, f"    - Dividend: {count}x / {months_text}월", ln=True)
-
-    pdf.ln(3)
-    pdf.set_font(font_name, size=11)
-    pdf.cell(0, 8, "Additional Recommendations (3)", ln=True)
-    pdf.set_font(font_name, size=9)
-    for item in extra_items:
-        pdf.multi_cell(0, 6, f"- {item['name']} ({item['code']}) [{item['type']}] {item['description']}")
-
-    pdf.ln(2)
-    pdf.set_font(font_name, size=11)
-    pdf.cell(0, 8, "AI Opinion", ln=True)
-    pdf.set_font(font_name, size=9)
-    pdf.multi_cell(0, 6, ai_opinion)
-
-    pdf.set_font(font_name, size=11)
-    pdf.cell(0, 8, "Market Opinion", ln=True)
-    pdf.set_font(font_name, size=9)
-    pdf.multi_cell(0, 6, market_opinion)
-
-    return bytes(pdf.output())
-
-def _send_email_with_pdf(to_email: str, pdf_bytes: bytes) -> None:
-    smtp_host = os.getenv("SMTP_HOST")
-    smtp_port = int(os.getenv("SMTP_PORT", "587"))
-    smtp_user = os.getenv("SMTP_USER")
-    smtp_password = os.getenv("SMTP_PASSWORD")
-    smtp_from = os.getenv("SMTP_FROM", smtp_user or "")
-    use_tls = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
-
-    if not smtp_host or not smtp_from:
-        raise HTTPException(status_code=500, detail="SMTP 설정이 필요합니다.")
+def _ensure_pdf_available() -> None:
+    if not PDF_AVAILABLE:
+        raise HTTPException(status_code=500, detail="PDF 생성 라이브러리가 설치되지 않았습니다.")
+    if report_font_path() is None:
+        raise HTTPException(status_code=500, detail="PDF 용 한글 폰트를 찾을 수 없습니다. PDF_FONT_PATH 를 설정하세요.")
+
+def _build_report_pdf(plan: DetailedPlanResponse, fingerprint: Optional[str] = None) -> bytes:
+    _ensure_pdf_available()
+    inputs = _prepare_report_inputs(plan, fingerprint)
+    with span("report.render"):
+        return render_report_pdf(*inputs)
+
+def _check_rate_limit(request: Request, endpoint: str) -> None:
+    wait = rate_limiters[endpoint].acquire(client_key(request, RATE_LIMIT_TRUST_FORWARDED))
+    if wait is not None:
+        raise HTTPException(
+            status_code=429,
+            detail="요청이 너무 많습니다. 잠시 후 다시 시도하세요.",
+            headers={"Retry-After": str(max(1, math.ceil(wait)))},
+        )
+
+async def _get_report_pdf(plan: DetailedPlanResponse, fingerprint: str,
+                          before_render: Optional[Callable[[], None]] = None) -> bytes:
+    """
+    캐시된 PDF 반환, 없으면 렌더 풀에서 생성 후 캐시에 저장 (같은 플랜 동시 요청은 렌더 한 번을 공유).
+    before_render 는 이 요청이 새 렌더를 시작할 때만 호출 (캐시 적중, 진행 중인 렌더 공유는 호출하지 않음)
+    """
+    pdf_bytes = report_cache.get(fingerprint)
+    if pdf_bytes is None:
+        _ensure_pdf_available()
+        # is_running 확인과 run 의 작업 등록 사이에 await 가 없으므로 새 렌더 여부가 바뀌지 않음
+        if before_render is not None and not report_flights.is_running(fingerprint):
+            before_render()
+        pdf_bytes = await report_flights.run(fingerprint, lambda: _render_and_cache(plan, fingerprint))
+    return pdf_bytes
 
-    message = EmailMessage()
-    message["Subject"] = "HolinFlow 상세 리포트"
-    message["From"] = smtp_from
-    message["To"] = to_email
-    message.set_content("첨부된 PDF 파일에서 상세 리포트를 확인하세요.")
-    message.add_attachment(pdf_bytes, maintype="application", subtype="pdf", filename="HolinFlow_Report.pdf")
+async def _render_and_cache(plan: DetailedPlanResponse, fingerprint: str) -> bytes:
+    with span("report.prepare"):
+        inputs = _prepare_report_inputs(plan, fingerprint)
+    try:
+        # 렌더 시간 자체는 render_pool 이 report.render 로 기록 (여기는 대기 포함)
+        with span("report.render_wait"):
+            pdf_bytes = await render_pool.submit(render_report_pdf, *inputs)
+    except RenderQueueFull as exc:
+        raise HTTPException(
+            status_code=503,
+            detail="리포트 생성 요청이 많습니다. 잠시 후 다시 시도하세요.",
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+    report_cache.put(fingerprint, pdf_bytes)
+    return pdf_bytes
 
-    with smtplib.SMTP(smtp_host, smtp_port) as server:
-        if use_tls:
-            server.starttls()
-        if smtp_user and smtp_password:
-            server.login(smtp_user, smtp_password)
-        server.send_message(message)
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
 
 @app.post("/api/report-pdf")
-def create_report_pdf(payload: ReportPdfRequest):
-    pdf_bytes = _build_report_pdf(payload.plan)
-    return StreamingResponse(
-        io.BytesIO(pdf_bytes),
+async def create_report_pdf(payload: ReportPdfRequest, request: Request):
+    plan, fingerprint = await _resolve_report_plan(payload.plan, payload.plan_id)
+    etag = f'"{fingerprint}"'
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    # 요청 제한 토큰은 실제로 렌더할 때만 차감
+    pdf_bytes = await _get_report_pdf(plan, fingerprint,
+                                      before_render=lambda: _check_rate_limit(request, "report-pdf"))
+    return Response(
+        pdf_bytes,
         media_type="application/pdf",
-        headers={"Content-Disposition": "attachment; filename=HolinFlow_Report.pdf"},
+        headers={
+            "Content-Disposition": "attachment; filename=HolinFlow_Report.pdf",
+            "ETag": etag,
+            "Cache-Control": "private, no-cache",
+        },
+    )
+
+async def _render_for_bulk(plan: DetailedPlanResponse) -> bytes:
+    """
+    대량 리포트용 렌더 (개별 리포트 캐시를 밀어내지 않도록 캐시를 거치지 않음).
+    대기열이 차면 REPORT_BULK_MAX_WAIT 초까지만 기다렸다가 RenderQueueFull 을 그대로 올림
+    """
+    inputs = _prepare_report_inputs(plan)
+    deadline = time.monotonic() + REPORT_BULK_MAX_WAIT
+    while True:
+        try:
+            return await render_pool.submit(render_report_pdf, *inputs)
+        except RenderQueueFull as exc:
+            if time.monotonic() + exc.retry_after > deadline:
+                raise
+            await asyncio.sleep(exc.retry_after)
+
+async def _iter_bulk_zip(plans: List[DetailedPlanResponse]) -> AsyncIterator[bytes]:
+    """
+    PDF 를 렌더 워커 수만큼만 미리 렌더하면서 순서대로 ZIP 항목으로 흘려보냄.
+    메모리에는 진행 중인 몇 개의 PDF 만 남습니다.
+    """
+    zip_stream = ZipStream()
+    window = max(1, render_pool.workers)
+    pending: List[asyncio.Task] = []
+    next_index = 0
+    try:
+        for index in range(len(plans)):
+            while next_index < len(plans) and len(pending) < window:
+                pending.append(asyncio.ensure_future(_render_for_bulk(plans[next_index])))
+                next_index += 1
+            task = pending.pop(0)
+            name = f"HolinFlow_Report_{index + 1:04d}"
+            try:
+                pdf_bytes = await task
+            except Exception as exc:  # 한 건 실패로 전체 아카이브를 끊지 않음
+                yield zip_stream.add(f"{name}.error.txt", f"{type(exc).__name__}: {exc}".encode("utf-8"))
+                continue
+            yield zip_stream.add(f"{name}.pdf", pdf_bytes)
+        yield zip_stream.close()
+    finally:
+        for task in pending:  # 클라이언트가 중간에 끊은 경우
+            task.cancel()
+
+@app.post("/api/report-bulk")
+async def create_report_bulk(payload: ReportBulkRequest, request: Request):
+    """여러 고객 플랜의 PDF 리포트를 ZIP 으로 스트리밍 (고객 수와 무관하게 메모리 사용량 일정)"""
+    count = len(payload.plans) + len(payload.plan_ids)
+    if not 1 <= count <= REPORT_BULK_MAX_PLANS:
+        raise HTTPException(status_code=422, detail=f"plans 와 plan_ids 는 합쳐서 1~{REPORT_BULK_MAX_PLANS}개여야 합니다.")
+    _ensure_pdf_available()
+    _check_rate_limit(request, "report-bulk")
+    plans = list(payload.plans) + await _load_stored_plans(payload.plan_ids)
+    return StreamingResponse(
+        _iter_bulk_zip(plans),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=HolinFlow_Reports.zip"},
     )
 
-@app.post("/api/report-email")
-def send_report_email(payload: ReportEmailRequest):
+@app.post("/api/report-email", status_code=202)
+async def send_report_email(payload: ReportEmailRequest, request: Request):
+    """PDF 생성 후 발송 큐에 등록 (상태는 /api/report-email/{job_id} 로 확인)"""
     if "@" not in payload.email:
         raise HTTPException(status_code=400, detail="이메일 형식을 확인하세요.")
-    pdf_bytes = _build_report_pdf(payload.plan)
-    _send_email_with_pdf(payload.email, pdf_bytes)
-    return {"status": "sent"}
+    if not load_smtp_settings().configured:
+        raise HTTPException(status_code=500, detail="SMTP 설정이 필요합니다.")
+    _check_rate_limit(request, "report-email")
+    pdf_bytes = await _get_report_pdf(*await _resolve_report_plan(payload.plan, payload.plan_id))
+    job = email_queue.submit(payload.email, pdf_bytes)
+    return {"status": job.status, "job_id": job.job_id}
+
+@app.get("/api/report-email/{job_id}")
+def get_report_email_status(job_id: str):
+    job = email_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="발송 작업을 찾을 수 없습니다.")
+    return job.to_dict()
+
+@app.get("/api/report-render/stats")
+def get_report_render_stats():
+    """PDF 렌더 풀 상태 (대기열 깊이, 렌더 시간 등)"""
+    return render_pool.stats()
+
+# ===== 성능 지표 =====
+def _collect_worker_metrics() -> List[str]:
+    render = render_pool.stats()
+    return [
+        *gauge_lines("holinflow_render_pool", "PDF render pool state", {
+            k: render[k] for k in ("in_flight", "queue_depth", "completed", "failed", "rejected")
+        }, label="field"),
+        *gauge_lines("holinflow_email_queue", "Report email queue state", email_queue.stats(), label="field"),
+        *gauge_lines("holinflow_report_cache", "PDF report cache state", {
+            "hits": report_cache.hits, "misses": report_cache.misses, "size_bytes": report_cache.size_bytes,
+        }, label="field"),
+        *gauge_lines("holinflow_report_coalesce", "Concurrent identical report renders (started vs shared)",
+                     report_flights.stats(), label="field"),
+        *gauge_lines("holinflow_rate_limited", "Requests rejected by per-client rate limit",
+                     {name: limiter.limited for name, limiter in rate_limiters.items()}, label="endpoint"),
+        *gauge_lines("holinflow_plan_store", "Plan store state",
+                     plan_store.stats() if plan_store is not None else {}, label="field"),
+        *gauge_lines("holinflow_startup_seconds", "Worker startup phase durations", startup_report, label="phase"),
+        *gauge_lines("holinflow_allocation_solver_cached_active_sets", "Allocation solver warm-start cache entries", {
+            "": allocation_solver.stats()["cached_active_sets"],
+        }),
+    ]
+
+register_collector(_collect_worker_metrics)
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus 텍스트 형식 지표"""
+    return Response(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# ===== 상품 카탈로그 관리 =====
+def _check_admin_token(token: Optional[str]) -> None:
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected or not token or not hmac.compare_digest(token, expected):
+        raise HTTPException(status_code=403, detail="관리자 권한이 필요합니다.")
+
+@app.get("/api/catalog/version")
+def get_catalog_version():
+    snapshot = current_snapshot()
+    return {
+        "version": snapshot.catalog.version,
+        "products": len(snapshot.catalog),
+        "source": snapshot.source_path,
+    }
+
+@app.get("/api/catalog/products")
+def get_catalog_products(request: Request):
+    """compact 설계 응답의 종목 코드를 풀기 위한 상품 정보 (버전이 같으면 304)"""
+    catalog = current_snapshot().catalog
+    etag = f'"{catalog.version}"'
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return json_response(
+        _catalog_products_body(catalog),
+        request.headers.get("accept-encoding"),
+        headers={"ETag": etag, "Cache-Control": "public, max-age=300"},
+    )
+
+@lru_cache(maxsize=4)
+def _catalog_products_body(catalog) -> bytes:
+    # 카탈로그 객체는 버전마다 새로 만들어지므로 객체 단위로 캐시
+    return dumps({
+        "version": catalog.version,
+        "products": {
+            product.code: {
+                "name": product.name,
+                "type": product.type_label,
+                "description": product.description,
+                "expected_return": product.expected_return,
+                "dividend_rate": product.dividend_rate,
+                "payout_months": list(product.payout_months),
+            }
+            for product in catalog.products
+        },
+    })
+
+@app.post("/api/admin/catalog/reload")
+def reload_product_catalog(x_admin_token: Optional[str] = Header(None)):
+    """CATALOG_PATH 파일을 다시 읽어 카탈로그/템플릿 교체 (처리 중인 요청은 이전 버전으로 완료)"""
+    _check_admin_token(x_admin_token)
+    try:
+        snapshot = reload_catalog()
+    except (OSError, CatalogFileError) as exc:
+        raise HTTPException(status_code=500, detail=f"카탈로그 파일을 읽지 못했습니다: {exc}")
+    return {"version": snapshot.catalog.version, "products": len(snapshot.catalog)}
+
+_catalog_watcher_stop = None
+
+def _start_catalog_watcher() -> None:
+    global _catalog_watcher_stop
+    interval = float(os.getenv("CATALOG_WATCH_INTERVAL", "0"))
+    if interval > 0 and current_snapshot().source_path:
+        _catalog_watcher_stop = start_catalog_watcher(interval)
+
+# ===== 시작 준비 (warm-up) =====
+# 단계별 소요 시간 (초, import 는 이 모듈의 import 시작부터). GET /api/startup, /metrics 로 확인
+startup_report: Dict[str, float] = {"import": round(time.perf_counter() - _IMPORT_STARTED, 4)}
+_render_warm_up: Optional[asyncio.Future] = None
+
+def _warm_up_engines() -> None:
+    """설계/현금흐름/예측/역산/리밸런싱을 작은 샘플로 한 번씩 실행 (numpy 하위 모듈 지연 로딩, 솔버/직렬화 준비)"""
+    for strategy in ("fixed", "optimized"):
+        plan = generate_detailed_plan(PlanRequest(monthly_goal=300, current_assets=50000, risk_level=DEFAULT_RISK_LEVEL,
+                                                  allocation_strategy=strategy), store=False)
+    dumps(plan)
+    dumps(_compact_plan(plan))
+    _plan_cashflow(plan)
+    _project_growth(ProjectionRequest(plan=plan, years=MIN_YEARS, paths=100))
+    _solve_goal(GoalSolveRequest(monthly_goal=300, contribution_growth=3))
+    _simulate_rebalance(RebalanceSimRequest(plans=[plan], years=1))
+
+def _timed_step(name: str, fn) -> None:
+    start = time.perf_counter()
+    try:
+        fn()
+    except Exception as exc:  # 준비 실패로 서버 시작을 막지 않음 (해당 경로는 첫 요청에서 다시 준비됨)
+        logger.warning("%s warm-up failed: %s: %s", name, type(exc).__name__, exc)
+    startup_report[name] = round(time.perf_counter() - start, 4)
+
+async def _warm_up_render_pool() -> None:
+    start = time.perf_counter()
+    try:
+        await render_pool.warm_up()
+    except Exception as exc:
+        logger.warning("render pool warm-up failed: %s: %s", type(exc).__name__, exc)
+        return
+    startup_report["render_pool"] = round(time.perf_counter() - start, 4)
+    logger.info("render pool ready: %d workers in %.3fs", render_pool.workers, startup_report["render_pool"])
+
+async def _startup() -> None:
+    """앱 lifespan 시작: 스레드풀 크기, 엔진/폰트 준비 후 카탈로그 감시 시작 (렌더 워커는 백그라운드)"""
+    global _render_warm_up
+    tokens = int(os.getenv("THREADPOOL_TOKENS", "0"))
+    if tokens > 0:
+        anyio.to_thread.current_default_thread_limiter().total_tokens = tokens
+    _timed_step("numpy", lambda: np.ndarray)  # 지연 import 된 numpy 를 요청 전에 로드
+    _timed_step("engines", _warm_up_engines)
+    if PDF_AVAILABLE:
+        # 스레드풀 렌더(REPORT_RENDER_WORKERS=0)는 이 프로세스에서 폰트를 파싱해 두고,
+        # 렌더 워커는 각자 initializer 로 준비하므로 여기서는 폰트 경로만 확인
+        _timed_step("fonts", preload_report_fonts if render_pool.workers <= 0 else report_font_path)
+    startup_report["ready"] = round(time.perf_counter() - _IMPORT_STARTED, 4)
+    logger.info("startup: %s", ", ".join(f"{name} {seconds:.3f}s" for name, seconds in startup_report.items()))
+    _start_catalog_watcher()
+    # 렌더 워커 기동(프로세스 + 폰트 준비)은 요청 처리를 막지 않도록 백그라운드에서
+    if PDF_AVAILABLE and render_pool.workers > 0:
+        _render_warm_up = asyncio.ensure_future(_warm_up_render_pool())
+
+@app.get("/api/startup")
+def get_startup_report():
+    """워커 시작 단계별 소요 시간 (초)"""
+    return startup_report
+
+def _shutdown_workers() -> None:
+    if _catalog_watcher_stop is not None:
+        _catalog_watcher_stop.set()
+    render_pool.shutdown()
+    email_queue.shutdown()
+    if plan_store is not None:
+        plan_store.close()
 
 if __name__ == "__main__":
     import uvicorn
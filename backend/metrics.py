@@ -0,0 +1,305 @@
+"""
+metrics.py - 요청/구간 성능 지표 (Prometheus 텍스트 형식) + 느린 요청 샘플링 프로파일러
+
+- MetricsMiddleware: 라우트별 요청 수/지연 히스토그램/처리 중 요청 수
+- span("이름"): 배분 계산, 종목 샘플링, PDF 렌더, 메일 발송 같은 핫패스 구간 시간 측정
+- render_prometheus(): /metrics 응답 본문 생성
+
+SLOW_REQUEST_PROFILE_MS 를 설정하면 요청이 처리되는 동안 모든 스레드의 스택을
+SLOW_REQUEST_PROFILE_INTERVAL_MS 간격으로 샘플링하고, 기준보다 느린 요청은
+flamegraph.pl / speedscope 에서 바로 열 수 있는 folded stack 파일로 저장합니다.
+"""
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+import math
+import os
+import re
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# 초 단위 히스토그램 버킷 (Prometheus 기본값 + PDF 렌더용 긴 구간)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, *labels: str, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def collect(self) -> List[str]:
+        lines = super().collect()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        # 라벨별 버킷 개수(누적 전, 마지막 칸은 +Inf)와 합계
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, *labels: str, value: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            counts = self._counts.get(labels)
+            if counts is None:
+                counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+                self._sums[labels] = 0.0
+            counts[index] += 1
+            self._sums[labels] += value
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, list(counts), self._sums[labels]) for labels, counts in self._counts.items())
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+REQUESTS_TOTAL = Counter(
+    "holinflow_http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+)
+REQUEST_SECONDS = Histogram(
+    "holinflow_http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+)
+REQUESTS_IN_FLIGHT = Gauge("holinflow_http_requests_in_flight", "HTTP requests currently being handled")
+SPAN_SECONDS = Histogram("holinflow_span_duration_seconds", "Hot path span latency", ("span",))
+SPAN_ERRORS = Counter("holinflow_span_errors_total", "Hot path spans that raised", ("span",))
+SLOW_PROFILES = Counter("holinflow_slow_request_profiles_total", "Slow request stack profiles written", ("route",))
+
+_METRICS = [REQUESTS_TOTAL, REQUEST_SECONDS, REQUESTS_IN_FLIGHT, SPAN_SECONDS, SPAN_ERRORS, SLOW_PROFILES]
+_collectors: List[Callable[[], Iterable[str]]] = []
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """with span("plan.allocation"): ... 구간 시간을 히스토그램에 기록"""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        SPAN_ERRORS.inc(name)
+        raise
+    finally:
+        SPAN_SECONDS.observe(name, value=time.perf_counter() - start)
+
+
+def observe_span(name: str, seconds: float) -> None:
+    """다른 프로세스/스레드에서 잰 구간 시간 기록 (예: 렌더 워커가 돌려준 시간)"""
+    SPAN_SECONDS.observe(name, value=seconds)
+
+
+def register_collector(collector: Callable[[], Iterable[str]]) -> None:
+    """/metrics 를 만들 때마다 호출되어 추가 줄을 돌려주는 함수 등록 (풀/큐 상태 등)"""
+    _collectors.append(collector)
+
+
+def gauge_lines(name: str, help_text: str, values: Dict[str, float], label: str = "") -> List[str]:
+    """dict -> gauge 줄. label 이 있으면 키를 라벨 값으로, 없으면 값 하나만 사용"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    for key, value in values.items():
+        label_text = _format_labels((label,), (key,)) if label else ""
+        lines.append(f"{name}{label_text} {_format_value(value)}")
+    return lines
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for metric in _METRICS:
+        lines.extend(metric.collect())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+# ===== 느린 요청 샘플링 프로파일러 =====
+class StackSampler:
+    """처리 중인 요청이 있는 동안만 모든 스레드의 스택을 주기적으로 기록"""
+
+    def __init__(self, interval: float, max_samples: int = 20000):
+        self.interval = interval
+        self._samples: Deque[Tuple[float, str]] = deque(maxlen=max_samples)
+        self._active = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def request_started(self) -> None:
+        with self._cond:
+            self._active += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def request_finished(self) -> None:
+        with self._cond:
+            self._active -= 1
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while True:
+            with self._cond:
+                while self._active <= 0:
+                    self._cond.wait()
+            now = time.perf_counter()
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = _fold(frame)
+                if stack:
+                    self._samples.append((now, stack))
+            time.sleep(self.interval)
+
+    def folded_between(self, start: float, end: float) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for ts, stack in list(self._samples):
+            if start <= ts <= end:
+                counts[stack] = counts.get(stack, 0) + 1
+        return counts
+
+
+# 대기 중인 스레드(이벤트 루프 select, 큐/조건 변수 대기, 빈 스레드풀 워커)는 프로파일에서 제외
+_IDLE_LEAVES = {"select", "poll", "wait", "_wait_for_tstate_lock", "_worker"}
+
+
+def _fold(frame) -> str:
+    if frame.f_code.co_name in _IDLE_LEAVES:
+        return ""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _route_label(scope: Dict) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    # 라우트가 없는 요청(404 등)은 경로 그대로 쓰면 라벨이 무한히 늘어나므로 묶음
+    return path or "unmatched"
+
+
+class MetricsMiddleware:
+    """순수 ASGI 미들웨어 (StreamingResponse 도 응답 완료 시점까지 측정)"""
+
+    def __init__(self, app, slow_request_ms: float = 0.0, profile_interval_ms: float = 5.0,
+                 profile_dir: str = "profiles"):
+        self.app = app
+        self.slow_request_seconds = slow_request_ms / 1000
+        self.profile_dir = profile_dir
+        self.sampler = StackSampler(profile_interval_ms / 1000) if slow_request_ms > 0 else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc(amount=1)
+        if self.sampler is not None:
+            self.sampler.request_started()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end = time.perf_counter()
+            elapsed = end - start
+            REQUESTS_IN_FLIGHT.inc(amount=-1)
+            method = scope["method"]
+            route = _route_label(scope)
+            REQUESTS_TOTAL.inc(method, route, str(status["code"]))
+            REQUEST_SECONDS.observe(method, route, value=elapsed)
+            if self.sampler is not None:
+                self.sampler.request_finished()
+                if elapsed >= self.slow_request_seconds:
+                    # 스택 집계와 파일 쓰기는 이벤트 루프를 막지 않도록 별도 스레드에서
+                    threading.Thread(target=self._dump_profile, args=(method, route, start, end, elapsed),
+                                     name="profile-writer", daemon=True).start()
+
+    def _dump_profile(self, method: str, route: str, start: float, end: float, elapsed: float) -> None:
+        counts = self.sampler.folded_between(start, end)
+        if not counts:
+            return
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        path = os.path.join(
+            self.profile_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{method}-{slug}-{int(elapsed * 1000)}ms.folded"
+        )
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in sorted(counts.items()):
+                    f.write(f"{stack} {count}\n")
+        except OSError as exc:
+            logger.warning("profile write failed: %s", exc)
+            return
+        SLOW_PROFILES.inc(route)
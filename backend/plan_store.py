@@ -0,0 +1,241 @@
+"""
+plan_store.py - 상세 설계 결과 저장소 (SQLite, plan_id 기준)
+
+plan_id 는 설계 요청 + 카탈로그 버전의 해시라서 같은 입력은 항상 같은 id(같은 플랜)가 됩니다.
+저장은 백그라운드 쓰기 스레드가 모아서 한 트랜잭션으로 기록하고(WAL 모드),
+기록 전이거나 최근에 쓴 플랜은 메모리에서 바로 돌려주므로 검증/파싱 없이 재사용됩니다.
+ttl 이 지난 플랜은 조회되지 않고, 쓰기 스레드가 sweep_interval 마다 한 번씩 지웁니다.
+같은 플랜이 다시 저장되면(메모리에서 밀려난 뒤 같은 요청이 오면) 저장 시각이 갱신됩니다.
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    plan_id TEXT PRIMARY KEY,
+    plan_json TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS plans_created_at ON plans (created_at);
+"""
+
+
+def plan_request_id(request: Dict, catalog_version: str) -> str:
+    """설계 요청(정규화 JSON) + 카탈로그 버전 해시 -> plan_id (32자리 hex)"""
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(f"{catalog_version}:{canonical}".encode("utf-8")).hexdigest()[:32]
+
+
+class PlanStore:
+    """
+    put 은 큐에 넣고 바로 반환, 쓰기 스레드가 batch_size 개 또는 flush_interval 초마다 묶어서 기록.
+    encode/decode 는 플랜 객체 <-> JSON 문자열 변환 (저장소는 플랜 모델을 모름)
+    ttl <= 0 이면 만료 없음 (초 단위)
+    """
+
+    def __init__(self, path: str, encode: Callable[[Any], str], decode: Callable[[str], Any],
+                 batch_size: int = 100, flush_interval: float = 0.05, cache_size: int = 1024,
+                 ttl: float = 0.0, sweep_interval: float = 3600.0):
+        self.path = path
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._last_sweep = 0.0
+        self._encode = encode
+        self._decode = decode
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.cache_size = cache_size
+        self._queue: "queue.Queue[Optional[Tuple[str, Any]]]" = queue.Queue()
+        self._pending: Dict[str, Any] = {}  # 큐에 있고 아직 기록되지 않은 플랜
+        self._recent: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._reader: Optional[sqlite3.Connection] = None
+        self._read_lock = threading.Lock()
+        self.written = 0
+        self.batches = 0
+        self.write_errors = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10.0, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # WAL 에서는 체크포인트 때만 fsync
+        return conn
+
+    def put(self, plan_id: str, plan: Any) -> None:
+        """이미 있는 plan_id 면 아무것도 하지 않음 (같은 id = 같은 플랜)"""
+        with self._lock:
+            if plan_id in self._pending or plan_id in self._recent:
+                return
+            self._pending[plan_id] = plan
+            self._remember(plan_id, plan)
+        self._ensure_started()
+        self._queue.put((plan_id, plan))
+
+    def peek(self, plan_id: str) -> Optional[Any]:
+        """메모리(기록 대기 + 최근 플랜)에서만 조회. 없으면 None (DB 는 보지 않음)"""
+        with self._lock:
+            plan = self._pending.get(plan_id)
+            if plan is None:
+                plan = self._recent.get(plan_id)
+                if plan is not None:
+                    self._recent.move_to_end(plan_id)
+            if plan is not None:
+                self.hits += 1
+            return plan
+
+    def get(self, plan_id: str) -> Optional[Any]:
+        plan = self.peek(plan_id)
+        if plan is not None:
+            return plan
+        with self._read_lock:
+            if self._reader is None:
+                self._reader = self._connect()
+            row = self._reader.execute("SELECT plan_json FROM plans WHERE plan_id = ? AND created_at >= ?",
+                                       (plan_id, self._expires_before())).fetchone()
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        plan = self._decode(row[0])
+        with self._lock:
+            self.misses += 1
+            self._remember(plan_id, plan)
+        return plan
+
+    def _remember(self, plan_id: str, plan: Any) -> None:
+        self._recent[plan_id] = plan
+        self._recent.move_to_end(plan_id)
+        while len(self._recent) > self.cache_size:
+            self._recent.popitem(last=False)
+
+    def _expires_before(self) -> float:
+        """이 시각보다 먼저 저장된 플랜은 만료"""
+        return time.time() - self.ttl if self.ttl > 0 else float("-inf")
+
+    def flush(self) -> None:
+        """큐에 있는 플랜이 모두 기록될 때까지 대기"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=10.0)
+            self._thread = None
+        with self._read_lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+    def stats(self) -> Dict:
+        return {
+            "pending": len(self._pending),
+            "cached": len(self._recent),
+            "written": self.written,
+            "batches": self.batches,
+            "write_errors": self.write_errors,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+        }
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="plan-store-writer", daemon=True)
+            self._thread.start()
+
+    def _next_batch(self) -> Tuple[List[Tuple[str, Any]], bool]:
+        """(묶음, 종료 신호 여부). 첫 항목이 온 뒤 flush_interval 동안 더 모음"""
+        first = self._queue.get()
+        if first is None:
+            self._queue.task_done()
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.task_done()
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        conn = self._connect()
+        try:
+            while True:
+                batch, stop = self._next_batch()
+                if batch:
+                    self._write_batch(conn, batch)
+                    self._sweep_if_due(conn)
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[Tuple[str, Any]]) -> None:
+        now = time.time()
+        try:
+            rows = [(plan_id, self._encode(plan), now) for plan_id, plan in batch]
+            with conn:  # 묶음 전체를 한 트랜잭션으로 (이미 있는 플랜은 내용이 같으므로 저장 시각만 갱신)
+                conn.executemany(
+                    "INSERT INTO plans (plan_id, plan_json, created_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (plan_id) DO UPDATE SET created_at = excluded.created_at",
+                    rows,
+                )
+            self.written += len(rows)
+            self.batches += 1
+        except (sqlite3.Error, ValueError, TypeError) as exc:
+            # 기록 실패한 플랜도 메모리 캐시에 남아 있는 동안은 조회 가능
+            self.write_errors += len(batch)
+            logger.warning("write failed (%d plans): %s", len(batch), exc)
+        finally:
+            with self._lock:
+                for plan_id, _ in batch:
+                    self._pending.pop(plan_id, None)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _sweep_if_due(self, conn: sqlite3.Connection) -> None:
+        """만료된 플랜 삭제 (쓰기 스레드에서 sweep_interval 마다 한 번, created_at 인덱스 사용)"""
+        now = time.monotonic()
+        if self.ttl <= 0 or now - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = now
+        try:
+            with conn:
+                deleted = conn.execute("DELETE FROM plans WHERE created_at < ?", (self._expires_before(),)).rowcount
+            self.expired += deleted
+        except sqlite3.Error as exc:
+            logger.warning("expired plan sweep failed: %s", exc)
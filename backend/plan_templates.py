@@ -0,0 +1,197 @@
+"""
+plan_templates.py - 투자 성향별 자산 배분 템플릿
+
+서버(또는 CLI) 시작 시 한 번 생성되는 불변 템플릿입니다.
+API(`backend/main.py`)와 CLI(`planner.py`)가 같은 배분 비율을 공유합니다.
+
+카탈로그 파일(CATALOG_PATH)을 다시 읽으면 카탈로그와 템플릿을 묶은 스냅샷을
+통째로 교체합니다. 이미 스냅샷을 받아 간 요청은 끝까지 이전 스냅샷을 사용합니다.
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional, Sequence, Tuple
+import logging
+import os
+import threading
+
+try:
+    from backend.cashflow_calendar import PayoutMatrix
+    from backend.catalog import Product, ProductCatalog, build_builtin_catalog
+    from backend.catalog_file import load_catalog_file
+except ImportError:  # backend 디렉터리에서 직접 실행하는 경우
+    from cashflow_calendar import PayoutMatrix
+    from catalog import Product, ProductCatalog, build_builtin_catalog
+    from catalog_file import load_catalog_file
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RISK_LEVEL = "중립"
+
+# 카테고리별 기대 연수익률 (%)
+CATEGORY_RATES: Mapping[str, float] = MappingProxyType({
+    "현금흐름": 4.5,
+    "투자": 10.0,
+    "배당": 3.8,
+    "부동산": 7.5,
+})
+
+# 투자 성향별 카테고리 연 변동성 (%, 몬테카를로 예측용)
+_CATEGORY_VOLATILITY = {
+    "공격적": {"현금흐름": 0.5, "투자": 22.0, "배당": 18.0, "부동산": 15.0},
+    "보수적": {"현금흐름": 0.5, "투자": 14.0, "배당": 12.0, "부동산": 10.0},
+    "중립": {"현금흐름": 0.5, "투자": 18.0, "배당": 15.0, "부동산": 12.0},
+}
+
+# 투자 성향별 카테고리 비중 (하한, 상한) - 최적화 배분(allocation_solver)의 제약
+_ALLOCATION_BOUNDS = {
+    "공격적": {"현금흐름": (0.05, 0.3), "투자": (0.3, 0.7), "배당": (0.1, 0.4), "부동산": (0.1, 0.4)},
+    "보수적": {"현금흐름": (0.3, 0.6), "투자": (0.1, 0.3), "배당": (0.1, 0.3), "부동산": (0.1, 0.3)},
+    "중립": {"현금흐름": (0.15, 0.45), "투자": (0.2, 0.5), "배당": (0.1, 0.35), "부동산": (0.1, 0.35)},
+}
+
+# 상세 설계 응답(assets)의 카테고리 순서와 표시 이름
+CATEGORY_ORDER = ("현금흐름", "투자", "배당", "부동산")
+CATEGORY_LABELS = ("현금흐름", "투자 (ETF)", "배당주", "부동산 (REITs)")
+
+# 투자 성향 -> (배분 비율, 투자 상품 위험 등급)
+_RISK_PROFILES = {
+    "공격적": ({"현금흐름": 0.1, "투자": 0.5, "부동산": 0.2, "배당": 0.2}, "high_risk"),
+    "보수적": ({"현금흐름": 0.4, "투자": 0.2, "부동산": 0.2, "배당": 0.2}, "low_risk"),
+    "중립": ({"현금흐름": 0.25, "투자": 0.35, "부동산": 0.2, "배당": 0.2}, "mid_risk"),
+}
+
+
+@dataclass(frozen=True)
+class PlanTemplate:
+    risk_level: str
+    risk_category: str
+    allocation: Mapping[str, float]
+    category_rates: Mapping[str, float]
+    category_volatility: Mapping[str, float]
+    allocation_bounds: Mapping[str, Tuple[float, float]]
+    weighted_annual_return: float  # %
+    monthly_return_rate: float
+    cash_products: Sequence[Product]
+    investment_products: Sequence[Product]
+    dividend_products: Sequence[Product]
+    real_estate_products: Sequence[Product]
+
+
+def _build_template(catalog: ProductCatalog, risk_level: str, allocation: dict, risk_category: str) -> PlanTemplate:
+    category_rates = MappingProxyType({**CATEGORY_RATES, **(catalog.category_rates or {})})
+    weighted_annual_return = (
+        allocation["현금흐름"] * category_rates["현금흐름"]
+        + allocation["투자"] * category_rates["투자"]
+        + allocation["배당"] * category_rates["배당"]
+        + allocation["부동산"] * category_rates["부동산"]
+    )
+    return PlanTemplate(
+        risk_level=risk_level,
+        risk_category=risk_category,
+        allocation=MappingProxyType(dict(allocation)),
+        category_rates=category_rates,
+        category_volatility=MappingProxyType(dict(_CATEGORY_VOLATILITY[risk_level])),
+        allocation_bounds=MappingProxyType(dict(_ALLOCATION_BOUNDS[risk_level])),
+        weighted_annual_return=weighted_annual_return,
+        monthly_return_rate=weighted_annual_return / 100 / 12,
+        cash_products=catalog.pool("cash"),
+        investment_products=catalog.pool("etf", risk_category),
+        dividend_products=catalog.pool("dividend"),
+        real_estate_products=catalog.pool("reit"),
+    )
+
+
+def build_templates(catalog: ProductCatalog) -> Mapping[str, PlanTemplate]:
+    return MappingProxyType({
+        risk_level: _build_template(catalog, risk_level, allocation, risk_category)
+        for risk_level, (allocation, risk_category) in _RISK_PROFILES.items()
+    })
+
+
+class PlanSnapshot:
+    """카탈로그 + 템플릿 + 월 지급 행렬 묶음. 교체는 참조 하나를 바꾸는 것이라 원자적입니다."""
+
+    __slots__ = ("catalog", "templates", "_payouts", "source_path", "source_mtime")
+
+    def __init__(self, catalog: ProductCatalog, source_path: Optional[str] = None, source_mtime: float = 0.0):
+        self.catalog = catalog
+        self.templates = build_templates(catalog)
+        self._payouts: Optional[PayoutMatrix] = None
+        self.source_path = source_path
+        self.source_mtime = source_mtime
+
+    @property
+    def payouts(self) -> PayoutMatrix:
+        """월 지급 행렬 (numpy 를 쓰므로 import 시점이 아니라 처음 쓸 때 생성, 동시에 만들어도 결과는 같음)"""
+        if self._payouts is None:
+            self._payouts = PayoutMatrix(self.catalog)
+        return self._payouts
+
+    def get_template(self, risk_level: str) -> PlanTemplate:
+        return self.templates.get(risk_level, self.templates[DEFAULT_RISK_LEVEL])
+
+
+def _load_snapshot(path: Optional[str]) -> PlanSnapshot:
+    if path and os.path.exists(path):
+        mtime = os.stat(path).st_mtime
+        return PlanSnapshot(load_catalog_file(path), source_path=path, source_mtime=mtime)
+    return PlanSnapshot(build_builtin_catalog(CATEGORY_RATES), source_path=path)
+
+
+_snapshot = _load_snapshot(os.getenv("CATALOG_PATH"))
+_reload_lock = threading.Lock()
+
+
+def current_snapshot() -> PlanSnapshot:
+    return _snapshot
+
+
+def reload_catalog(path: Optional[str] = None) -> PlanSnapshot:
+    """카탈로그 파일을 다시 읽어 스냅샷 교체 (path 가 없으면 기존 경로)"""
+    global _snapshot
+    with _reload_lock:
+        snapshot = _load_snapshot(path or _snapshot.source_path)
+        snapshot.payouts  # 요청이 행렬을 만들지 않도록 교체 전에 생성
+        _snapshot = snapshot
+    return snapshot
+
+
+def _source_mtime() -> Optional[float]:
+    path = _snapshot.source_path
+    if not path or not os.path.exists(path):
+        return None
+    return os.stat(path).st_mtime
+
+
+def reload_if_changed() -> bool:
+    """파일 수정 시각이 바뀌었을 때만 교체 (파일 감시 스레드용)"""
+    mtime = _source_mtime()
+    if mtime is None or mtime == _snapshot.source_mtime:
+        return False
+    reload_catalog(_snapshot.source_path)
+    return True
+
+
+def start_catalog_watcher(interval: float) -> threading.Event:
+    """interval 초마다 카탈로그 파일 변경을 확인하는 데몬 스레드 시작. 반환된 Event 를 set 하면 종료"""
+    stop = threading.Event()
+
+    def watch() -> None:
+        failed_mtime = None  # 읽지 못한 파일의 수정 시각 (파일이 다시 바뀔 때까지 다시 읽지 않음)
+        while not stop.wait(interval):
+            mtime = _source_mtime()
+            if mtime is None or mtime == failed_mtime:
+                continue
+            try:
+                reload_if_changed()
+            except Exception as exc:  # 잘못된 파일이면 기존 스냅샷을 유지
+                failed_mtime = mtime
+                logger.warning("catalog reload failed: %s", exc)
+
+    threading.Thread(target=watch, name="catalog-watcher", daemon=True).start()
+    return stop
+
+
+def get_template(risk_level: str) -> PlanTemplate:
+    """투자 성향에 맞는 템플릿 반환 (알 수 없는 값은 중립)"""
+    return _snapshot.get_template(risk_level)
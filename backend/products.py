@@ -0,0 +1,42 @@
+"""
+products.py - 투자 상품 데이터베이스
+"""
+
+INVESTMENTS = {
+    "low_risk": [
+        {"name": "KODEX 200", "code": "069500", "expected_return": 6.5, "risk_level": "저위험", "description": "200대 기업 KOSPI 추종 ETF"},
+        {"name": "미국 나스닥 100 ETF", "code": "QQQ", "expected_return": 9.2, "risk_level": "저위험", "description": "미국 기술주 중심 ETF"},
+        {"name": "S&P 500 ETF", "code": "VOO", "expected_return": 7.8, "risk_level": "저위험", "description": "미국 대형주 500사 포함"},
+    ],
+    "mid_risk": [
+        {"name": "KODEX 반도체", "code": "091160", "expected_return": 10.5, "risk_level": "중위험", "description": "반도체 업종 중심 ETF"},
+        {"name": "KODEX 금융", "code": "122630", "expected_return": 9.0, "risk_level": "중위험", "description": "금융업종 ETF"},
+        {"name": "이머징마켓 ETF", "code": "VWO", "expected_return": 11.2, "risk_level": "중위험", "description": "신흥국 주식 포트폴리오"},
+    ],
+    "high_risk": [
+        {"name": "KODEX 바이오", "code": "091170", "expected_return": 15.8, "risk_level": "고위험", "description": "바이오·의료 기업 ETF"},
+        {"name": "KODEX 에너지 화학", "code": "139290", "expected_return": 14.2, "risk_level": "고위험", "description": "에너지·화학 기업 중심"},
+        {"name": "크립토 관련 ETF", "code": "GBTC", "expected_return": 18.5, "risk_level": "고위험", "description": "암호화폐 관련 자산"},
+    ]
+}
+
+DIVIDEND_STOCKS = [
+    {"name": "SK텔레콤", "code": "017670", "dividend_rate": 4.8, "annual_dividend": 2.4, "payout_months": [3, 6, 9, 12], "description": "통신업. 안정적 배당주"},
+    {"name": "한국전력", "code": "015760", "dividend_rate": 5.2, "annual_dividend": 2.6, "payout_months": [6, 12], "description": "공기업. 높은 배당률"},
+    {"name": "삼성전자", "code": "005930", "dividend_rate": 2.8, "annual_dividend": 5.0, "payout_months": [3, 6, 9, 12], "description": "대형주. 배당 및 성장성"},
+    {"name": "NAVER", "code": "035420", "dividend_rate": 1.2, "annual_dividend": 3.2, "payout_months": [4, 8, 12], "description": "기술주. 배당+성장"},
+    {"name": "LG화학", "code": "051910", "dividend_rate": 3.5, "annual_dividend": 4.1, "payout_months": [4, 10], "description": "화학업. 안정적 배당"},
+    {"name": "현대차", "code": "005380", "dividend_rate": 3.9, "annual_dividend": 5.5, "payout_months": [5, 11], "description": "자동차주. 배당+배당락익"},
+]
+
+REAL_ESTATE_PRODUCTS = [
+    {"name": "신한 리츠", "code": "REITL", "expected_return": 7.2, "description": "부동산 투자신탁. 연 7-8% 배당"},
+    {"name": "호텔신라 리츠", "code": "REITH", "expected_return": 6.8, "description": "리조트·호텔 REIT"},
+    {"name": "부동산 펀드", "code": "REALPROP", "expected_return": 8.5, "description": "저평가 부동산 포트폴리오"},
+]
+
+CASH_PRODUCTS = [
+    {"name": "정기예금 (연 4.5%)", "code": "DEPOSIT", "expected_return": 4.5, "description": "은행 정기예금. 원금안전"},
+    {"name": "적금 (연 4.2%)", "code": "SAVINGS", "expected_return": 4.2, "description": "월 정액 납입식 적금"},
+    {"name": "단기채권 펀드", "code": "BONDFUND", "expected_return": 4.8, "description": "저금리 채권 중심 펀드"},
+]
@@ -0,0 +1,113 @@
+"""
+projection.py - 자산 성장 몬테카를로 예측
+
+카테고리별 월 수익률을 로그정규 분포로 뽑아 수천 개 경로를 한 번에(벡터 연산) 진행합니다.
+요청한 기간만큼만 시뮬레이션하고, 경로 배열 대신 요약(백분위/달성 확률)만 캐시합니다.
+같은 시드면 기간이 달라도 앞 구간 경로는 동일합니다 (월별 난수 순서가 같음).
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, Tuple
+
+try:
+    from backend.lazy_import import lazy_import
+except ImportError:  # backend 디렉터리에서 직접 실행하는 경우
+    from lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+MIN_YEARS = 3
+MAX_YEARS = 30
+MAX_PATHS = 20000
+
+
+def _simulate_yearly_values(
+    amounts: Tuple[float, ...],
+    annual_returns: Tuple[float, ...],
+    annual_volatility: Tuple[float, ...],
+    monthly_contribution: float,
+    years: int,
+    paths: int,
+    seed: int,
+) -> np.ndarray:
+    """(paths, years + 1) 배열: 각 경로의 연말 총자산 (0년차 = 현재 자산)"""
+    rng = np.random.default_rng(seed)
+    amounts_arr = np.asarray(amounts, dtype=float)
+    total = amounts_arr.sum()
+    weights = amounts_arr / total if total > 0 else np.full(len(amounts), 1 / len(amounts))
+
+    sigma = np.asarray(annual_volatility) / 100 / np.sqrt(12)
+    mu = np.log1p(np.asarray(annual_returns) / 100) / 12 - sigma ** 2 / 2
+    contribution = monthly_contribution * weights
+
+    values = np.tile(amounts_arr, (paths, 1))
+    yearly = np.empty((paths, years + 1))
+    yearly[:, 0] = total
+    for month in range(1, years * 12 + 1):
+        growth = np.exp(mu + sigma * rng.standard_normal(values.shape))
+        values *= growth
+        values += contribution
+        if month % 12 == 0:
+            yearly[:, month // 12] = values.sum(axis=1)
+    return yearly
+
+
+# 결과는 연도별 백분위 몇 개뿐이라 항목당 수 KB (경로 배열은 캐시하지 않음)
+@lru_cache(maxsize=256)
+def _simulate_summary(
+    amounts: Tuple[float, ...],
+    annual_returns: Tuple[float, ...],
+    annual_volatility: Tuple[float, ...],
+    monthly_contribution: float,
+    required_total_assets: float,
+    years: int,
+    paths: int,
+    seed: int,
+) -> Tuple[Tuple[float, ...], Tuple[float, ...], Tuple[float, ...], float]:
+    """(p10, p50, p90, 목표 달성 확률)"""
+    yearly = _simulate_yearly_values(
+        amounts, annual_returns, annual_volatility, monthly_contribution, years, paths, seed
+    )
+    p10, p50, p90 = np.percentile(yearly, [10, 50, 90], axis=0)
+    final = yearly[:, -1]
+    probability = float((final >= required_total_assets).mean()) if required_total_assets > 0 else 1.0
+    return tuple(p10.tolist()), tuple(p50.tolist()), tuple(p90.tolist()), probability
+
+
+def simulate_projection(
+    amounts: Tuple[float, ...],
+    annual_returns: Tuple[float, ...],
+    annual_volatility: Tuple[float, ...],
+    years: int,
+    monthly_contribution: float,
+    required_total_assets: float,
+    paths: int,
+    seed: int,
+) -> Dict:
+    p10, p50, p90, probability = _simulate_summary(
+        amounts, annual_returns, annual_volatility, monthly_contribution, required_total_assets, years, paths, seed
+    )
+
+    # 참고용 결정적 경로 (변동성 없이 기대수익률로 복리)
+    monthly_rates = np.asarray(annual_returns) / 100 / 12
+    total = sum(amounts)
+    weights = np.asarray(amounts) / total if total > 0 else np.full(len(amounts), 1 / len(amounts))
+    values = np.asarray(amounts, dtype=float)
+    expected = [total]
+    for month in range(1, years * 12 + 1):
+        values = values * (1 + monthly_rates) + monthly_contribution * weights
+        if month % 12 == 0:
+            expected.append(float(values.sum()))
+
+    return {
+        "years": list(range(years + 1)),
+        "p10": [round(v, 0) for v in p10],
+        "p50": [round(v, 0) for v in p50],
+        "p90": [round(v, 0) for v in p90],
+        "expected": [round(v, 0) for v in expected],
+        "required_total_assets": round(required_total_assets, 2),
+        "probability_reaching_goal": round(probability, 4),
+        "paths": paths,
+        "seed": seed,
+    }
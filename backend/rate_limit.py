@@ -0,0 +1,69 @@
+"""
+rate_limit.py - 클라이언트별 토큰 버킷 요청 제한 (프로세스 내)
+
+버킷은 분당 rate 개씩 채워지고 최대 burst 개까지 쌓입니다. 요청마다 토큰 하나를 쓰고,
+토큰이 없으면 다음 토큰이 생길 때까지의 시간(초)을 돌려줘 429 + Retry-After 로 응답합니다.
+상태는 워커 프로세스마다 따로 가지므로 실제 허용량은 (워커 수 x rate) 입니다.
+"""
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Tuple
+import time
+
+from starlette.requests import Request
+
+
+def client_key(request: Request, trust_forwarded: bool = False) -> str:
+    """
+    요청한 클라이언트 식별값 (IP).
+    trust_forwarded 면 X-Forwarded-For 의 마지막 값(앞단 프록시가 붙인 접속 IP)을 사용합니다.
+    앞 값들은 클라이언트가 임의로 넣을 수 있으므로 쓰지 않습니다.
+    """
+    if trust_forwarded:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.rsplit(",", 1)[-1].strip()
+    return request.client.host if request.client is not None else "unknown"
+
+
+class RateLimiter:
+    """
+    rate_per_minute <= 0 이면 제한하지 않음.
+    추적하는 클라이언트 수는 max_clients 로 제한 (가장 오래 요청이 없던 버킷부터 버림 = 가득 찬 버킷과 같음)
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int, max_clients: int = 10000):
+        self.rate = rate_per_minute / 60
+        self.burst = max(1, burst)
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()  # key -> (토큰 수, 갱신 시각)
+        self._lock = Lock()
+        self.allowed = 0
+        self.limited = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def acquire(self, key: str) -> Optional[float]:
+        """허용되면 None, 아니면 다음 토큰까지 남은 초"""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+            if tokens >= 1.0:
+                tokens -= 1.0
+                wait = None
+                self.allowed += 1
+            else:
+                wait = (1.0 - tokens) / self.rate
+                self.limited += 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def stats(self) -> Dict:
+        return {"allowed": self.allowed, "limited": self.limited, "clients": len(self._buckets)}
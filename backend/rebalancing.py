@@ -0,0 +1,189 @@
+"""
+rebalancing.py - 리밸런싱 백테스트 (주기형 vs 허용범위형, 여러 포트폴리오 동시)
+
+카테고리별 월 수익률 시계열(로컬 생성 또는 CSV)에 따라 매월 비중이 목표에서 벗어나는 것을 추적하고,
+월말에 규칙에 해당하면 목표 비중으로 되돌립니다. 거래 수수료(거래금액 대비)와
+실현 이익에 대한 세금(카테고리별 취득원가 추적)을 포트폴리오에서 차감합니다.
+
+상태 배열은 (전략 수, 포트폴리오 수, 카테고리 수) 라서 고객 전체와 모든 전략을 월 단위 루프 하나로 계산합니다.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+import csv
+import os
+
+try:
+    from backend.allocation_solver import build_covariance
+    from backend.lazy_import import lazy_import
+    from backend.plan_templates import CATEGORY_LABELS, CATEGORY_ORDER
+except ImportError:  # backend 디렉터리에서 직접 실행하는 경우
+    from allocation_solver import build_covariance
+    from lazy_import import lazy_import
+    from plan_templates import CATEGORY_LABELS, CATEGORY_ORDER
+
+np = lazy_import("numpy")
+
+BUY_AND_HOLD = "buy_and_hold"
+
+
+@dataclass(frozen=True)
+class Strategy:
+    name: str
+    period_months: int = 0  # > 0 이면 이 주기마다 리밸런싱
+    band: float = 0.0       # > 0 이면 목표 비중과 차이가 band(비율)를 넘는 달에 리밸런싱
+
+
+def build_strategies(calendar_months: Sequence[int], threshold_bands: Sequence[float]) -> List[Strategy]:
+    """리밸런싱 없음(기준) + 주기형 + 허용범위형. threshold_bands 는 %p"""
+    strategies = [Strategy(BUY_AND_HOLD)]
+    strategies += [Strategy(f"calendar_{m}m", period_months=m) for m in sorted(set(calendar_months))]
+    strategies += [Strategy(f"threshold_{b:g}pp", band=b / 100) for b in sorted(set(threshold_bands))]
+    return strategies
+
+
+# ===== 수익률 시계열 =====
+def generate_returns(annual_returns: Sequence[float], annual_volatility: Sequence[float], months: int,
+                     seed: int = 0) -> np.ndarray:
+    """(months, 카테고리) 월 단순수익률. 로그정규 + 배분 솔버와 같은 상관 구조"""
+    rng = np.random.default_rng(seed)
+    cov = build_covariance(annual_volatility) / 12
+    sigma = np.sqrt(np.diag(cov))
+    mu = np.log1p(np.asarray(annual_returns, dtype=float) / 100) / 12 - sigma ** 2 / 2
+    # 변동성 0 인 카테고리가 있어도 분해되도록 대각에 아주 작은 값을 더함
+    shocks = rng.standard_normal((months, len(sigma))) @ np.linalg.cholesky(cov + np.eye(len(sigma)) * 1e-12).T
+    return np.expm1(mu + shocks)
+
+
+def load_returns_csv(path: str) -> np.ndarray:
+    """
+    월별 수익률 CSV (%) -> (months, 카테고리) 단순수익률.
+    헤더에 카테고리 키(현금흐름, 투자, ...) 또는 표시 이름(투자 (ETF), ...) 이 모두 있어야 하며 다른 열은 무시
+    """
+    return _load_returns_csv(path, os.stat(path).st_mtime_ns)
+
+
+@lru_cache(maxsize=4)
+def _load_returns_csv(path: str, mtime_ns: int) -> np.ndarray:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader, [])]
+        columns = []
+        for key, label in zip(CATEGORY_ORDER, CATEGORY_LABELS):
+            for name in (key, label):
+                if name in header:
+                    columns.append(header.index(name))
+                    break
+            else:
+                raise ValueError(f"returns CSV has no column for {key}")
+        rows = [[float(row[i]) for i in columns] for row in reader if row and any(cell.strip() for cell in row)]
+    if len(rows) < 12:
+        raise ValueError("returns CSV needs at least 12 monthly rows")
+    returns = np.asarray(rows) / 100
+    if (returns <= -1).any():
+        raise ValueError("returns CSV has a monthly return of -100% or less")
+    returns.flags.writeable = False
+    return returns
+
+
+# ===== 시뮬레이션 =====
+def simulate_rebalancing(weights: np.ndarray, initial_values: np.ndarray, returns: np.ndarray,
+                         strategies: Sequence[Strategy], fee_rate: float = 0.0,
+                         tax_rate: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    weights: (포트폴리오, 카테고리) 목표 비중 (행 합 1), initial_values: (포트폴리오,)
+    returns: (months, 카테고리) 월 단순수익률, fee_rate/tax_rate: 비율 (0.001 = 0.1%)
+    반환 값은 모두 (전략, 포트폴리오) 배열
+    """
+    # 내부 배열은 (카테고리, 전략, 포트폴리오) 순서: 카테고리 합/최대가 길이 4 축의 reduce 대신
+    # 연속 메모리 배열끼리의 덧셈이 되어 훨씬 빠름
+    target = np.asarray(weights, dtype=float).T[:, None, :]
+    months = len(returns)
+    period = np.array([s.period_months for s in strategies])
+    band = np.array([s.band for s in strategies])[:, None]
+    shape = (target.shape[0], len(strategies), target.shape[2])
+
+    values = np.broadcast_to(target * np.asarray(initial_values, dtype=float), shape).copy()
+    basis = values.copy()
+    start_total = values.sum(axis=0)
+    prev_total = start_total.copy()
+    peak = start_total.copy()
+    zeros = np.zeros(shape[1:])
+    traded, fees, taxes, value_sum = zeros.copy(), zeros.copy(), zeros.copy(), zeros.copy()
+    drift_max, drift_sum, max_drawdown = zeros.copy(), zeros.copy(), zeros.copy()
+    return_sum, return_sq = zeros.copy(), zeros.copy()
+    rebalances = np.zeros(shape[1:], dtype=int)
+    growth = (1 + np.asarray(returns, dtype=float))[:, :, None, None]
+
+    for t in range(months):
+        values *= growth[t]
+        total = values.sum(axis=0)
+        safe_total = np.where(total > 0, total, 1.0)
+        drift = np.abs(values / safe_total - target).max(axis=0)
+        np.maximum(drift_max, drift, out=drift_max)
+        drift_sum += drift
+
+        due = ((period > 0) & ((t + 1) % np.maximum(period, 1) == 0))[:, None]
+        act = due | ((band > 0) & (drift > band))
+        if act.any():
+            trade = np.where(act, total * target - values, 0.0)
+            sells = np.clip(-trade, 0.0, None)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                sold_fraction = np.where(values > 0, sells / values, 0.0)
+            realized = sells - basis * sold_fraction
+            tax = tax_rate * np.clip(realized, 0.0, None).sum(axis=0)
+            gross = np.abs(trade).sum(axis=0)
+            fee = fee_rate * gross
+            basis = basis * (1 - sold_fraction) + np.clip(trade, 0.0, None)
+            values += trade
+            # 수수료/세금은 목표 비중대로 비례 차감 (원가도 같은 비율로 줄임)
+            keep = np.where(total > 0, 1 - (tax + fee) / safe_total, 1.0)
+            values *= keep
+            basis *= keep
+            traded += gross / 2  # 편도 거래금액
+            fees += fee
+            taxes += tax
+            rebalances += act
+
+        total = values.sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            monthly = np.where(prev_total > 0, total / prev_total - 1, 0.0)
+        return_sum += monthly
+        return_sq += monthly ** 2
+        np.maximum(peak, total, out=peak)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.maximum(max_drawdown, np.where(peak > 0, 1 - total / peak, 0.0), out=max_drawdown)
+        value_sum += total
+        prev_total = total
+
+    years = months / 12
+    final = values.sum(axis=0)
+    avg_value = np.where(value_sum > 0, value_sum / months, 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annualized = np.where(start_total > 0, np.power(final / start_total, 1 / years) - 1, 0.0)
+    mean_monthly = return_sum / months
+    variance = np.clip(return_sq / months - mean_monthly ** 2, 0.0, None)
+    return {
+        "final_value": final,
+        "annualized_return": annualized,
+        "annual_volatility": np.sqrt(variance * 12),
+        "max_drawdown": max_drawdown,
+        "rebalances": rebalances,
+        "annual_turnover": traded / avg_value / years,
+        "fees": fees,
+        "taxes": taxes,
+        "annual_cost_drag": (fees + taxes) / avg_value / years,
+        "drift_max": drift_max,
+        "drift_avg": drift_sum / months,
+    }
+
+
+def plan_weights(amounts: Sequence[Sequence[float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """(포트폴리오, 카테고리) 금액 -> (목표 비중, 초기 금액)"""
+    amounts = np.asarray(amounts, dtype=float)
+    totals = amounts.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weights = np.where(totals[:, None] > 0, amounts / totals[:, None], 0.0)
+    return weights, totals
@@ -0,0 +1,161 @@
+"""
+render_pool.py - PDF 렌더링 전용 프로세스 풀 (대기열 제한 + 과부하 시 거절)
+
+FPDF 렌더링은 CPU 작업이라 이벤트 루프/스레드풀에서 실행하면
+플랜 API 지연이 함께 늘어납니다. 별도 프로세스에서 렌더링하고,
+대기열이 가득 차면 바로 거절해 요청이 쌓이지 않도록 합니다.
+"""
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import multiprocessing
+import os
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+try:
+    from backend.metrics import observe_span
+except ImportError:  # backend 디렉터리에서 직접 실행하는 경우
+    from metrics import observe_span
+
+
+class RenderQueueFull(Exception):
+    """렌더 대기열이 가득 참 (HTTP 503 으로 변환)"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("render queue is full")
+        self.retry_after = retry_after
+
+
+class RenderPool:
+    """
+    workers > 0 이면 프로세스 풀에서, 0 이면 스레드풀에서 렌더링합니다.
+    동시에 받을 수 있는 작업 수는 workers(실행 중) + queue_size(대기) 입니다.
+    """
+
+    def __init__(self, workers: int, queue_size: int, retry_after: int = 2,
+                 initializer: Optional[Callable[[], Any]] = None):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.retry_after = retry_after
+        # 워커 프로세스 시작 시 한 번 실행 (폰트 파싱 등 렌더 준비 작업)
+        self.initializer = initializer
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.render_seconds_total = 0.0
+        self.render_seconds_max = 0.0
+        self.last_render_seconds = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return max(1, self.workers) + self.queue_size
+
+    @property
+    def queue_depth(self) -> int:
+        # 실행 슬롯(workers)을 넘는 만큼을 대기 중으로 봅니다.
+        return max(0, self._pending - max(1, self.workers))
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            # fork 는 스레드가 있는 서버 프로세스에서 안전하지 않으므로 spawn 사용
+            context = multiprocessing.get_context("spawn")
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                                 initializer=self.initializer)
+        return self._executor
+
+    async def submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.capacity:
+            self.rejected += 1
+            raise RenderQueueFull(self.retry_after)
+
+        self._pending += 1
+        if self.workers <= 0:
+            # 스레드풀 작업은 요청이 취소돼도 스레드가 끝난 뒤에 돌아오므로 여기서 슬롯을 반환해도 정확
+            elapsed, failed = None, False
+            try:
+                result, elapsed = await run_in_threadpool(_timed_call, fn, *args)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                self._finish(elapsed, failed)
+            return result
+
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._get_executor().submit(_timed_call, fn, *args)
+        except BaseException:
+            self._finish(failed=True)
+            raise
+        # 요청이 취소돼도(클라이언트 연결 끊김) 워커는 렌더를 계속하므로 슬롯은 렌더가 끝났을 때 반환.
+        # wrap_future 보다 먼저 등록하므로 submit 이 돌아올 때는 통계가 이미 반영되어 있음
+        future.add_done_callback(lambda done: _call_soon(loop, self._render_done, done))
+        result, _ = await asyncio.wrap_future(future)
+        return result
+
+    def _render_done(self, future: Future) -> None:
+        if future.cancelled():  # 워커가 잡기 전에 요청이 취소됨
+            self._finish()
+        elif future.exception() is not None:
+            self._finish(failed=True)
+        else:
+            self._finish(future.result()[1])
+
+    def _finish(self, elapsed: Optional[float] = None, failed: bool = False) -> None:
+        """슬롯 반환 + 통계 (elapsed 가 없으면 렌더 결과 없음)"""
+        self._pending -= 1
+        if failed:
+            self.failed += 1
+        if elapsed is None:
+            return
+        self.completed += 1
+        self.last_render_seconds = elapsed
+        self.render_seconds_total += elapsed
+        self.render_seconds_max = max(self.render_seconds_max, elapsed)
+        observe_span("report.render", elapsed)
+
+    async def warm_up(self) -> None:
+        """워커 프로세스를 모두 미리 띄움 (initializer 포함). 스레드풀 모드면 할 일 없음"""
+        if self.workers <= 0:
+            return
+        executor = self._get_executor()
+        # 쉬는 워커가 없을 때 제출할 때마다 프로세스가 하나씩 생기므로 워커 수만큼 한 번에 제출
+        await asyncio.gather(*(asyncio.wrap_future(executor.submit(os.getpid)) for _ in range(self.workers)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "in_flight": self._pending,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "render_seconds_total": round(self.render_seconds_total, 4),
+            "render_seconds_max": round(self.render_seconds_max, 4),
+            "render_seconds_last": round(self.last_render_seconds, 4),
+            "render_seconds_avg": round(self.render_seconds_total / self.completed, 4) if self.completed else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _call_soon(loop: asyncio.AbstractEventLoop, callback: Callable[..., Any], *args: Any) -> None:
+    """다른 스레드(executor 관리 스레드)에서 이벤트 루프로 콜백 전달"""
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:  # 이벤트 루프가 이미 닫힘 (종료 중)
+        pass
+
+
+def _timed_call(fn: Callable[..., Any], *args: Any):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
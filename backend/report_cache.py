@@ -0,0 +1,110 @@
+"""
+report_cache.py - PDF 리포트 캐시 (플랜 내용 해시 기반, 용량 제한 LRU)
+"""
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import hashlib
+import json
+
+from pydantic import BaseModel
+
+
+def plan_fingerprint(plan: BaseModel) -> str:
+    """플랜 내용을 정규화(JSON, 키 정렬)한 뒤 SHA-256 해시 반환"""
+    canonical = json.dumps(
+        plan.model_dump(mode="json"),
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def seed_from_fingerprint(fingerprint: str) -> int:
+    """해시 앞 16자리를 난수 시드로 사용 (같은 플랜 -> 같은 추천)"""
+    return int(fingerprint[:16], 16)
+
+
+class ReportCache:
+    """총 바이트 수 기준으로 가장 오래 사용되지 않은 항목부터 제거하는 캐시"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SingleFlight:
+    """
+    같은 키의 작업이 진행 중이면 새로 시작하지 않고 그 결과를 함께 기다림 (캐시 miss 동시 요청 합치기).
+    작업은 별도 태스크로 실행되므로 먼저 요청한 클라이언트가 끊어도 나머지는 결과를 받습니다.
+    이벤트 루프 안에서만 사용 (잠금 없음)
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, "asyncio.Future[Any]"] = {}
+        self.started = 0
+        self.shared = 0
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.started += 1
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def is_running(self, key: str) -> bool:
+        return key in self._in_flight
+
+    def _finish(self, key: str, task: "asyncio.Future[Any]") -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception()  # 기다리던 요청이 모두 끊겼을 때의 미확인 예외 경고 방지
+
+    def stats(self) -> Dict:
+        return {"in_flight": len(self._in_flight), "started": self.started, "shared": self.shared}
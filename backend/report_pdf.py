@@ -0,0 +1,316 @@
+"""
+report_pdf.py - PDF 리포트 렌더링
+
+렌더 프로세스 풀에서 실행되므로 입력/출력은 모두 pickle 가능한 기본 타입만 사용합니다.
+
+한글 폰트는 프로세스마다 한 번만 읽습니다 (`preload_report_fonts`, 렌더 워커 시작 시 호출).
+- 폰트 파일 -> 리포트에 쓰이는 글자(ASCII + KS X 1001 한글/기호)만 남긴 부분 폰트를 미리 만들어 둠
+- fpdf2 의 폰트 메트릭(글자 폭, glyph id) 파싱 결과를 보관했다가 문서마다 복사해 사용
+리포트에 부분 폰트에 없는 글자가 있으면 전체 폰트(역시 한 번만 파싱)로 렌더링합니다.
+
+첫 페이지 머리(제목, 요약 표 이름/값 칸, 배분 섹션 제목)는 위치가 고정이라 fpdf2 FlexTemplate 골격 정의를
+폰트별로 한 번만 만들어 두고, 요청마다 값 칸을 채워 골격을 그립니다. 고정 문구를 그린 결과(콘텐츠 스트림)는
+재사용하지 않습니다. fpdf2 가 부분 폰트의 글자 코드를 문서마다 처음 쓰는 순서대로 배정해서 다른 문서에 그대로
+붙일 수 없기 때문입니다. 종목 수에 따라 길이가 바뀌는 아래 섹션은 흐름대로 그립니다.
+
+fpdf2 (+ fontTools) 는 import 에만 0.2초 이상 걸리므로 실제로 렌더링하는 프로세스에서 처음 쓸 때 불러옵니다.
+렌더 워커를 쓰는 웹 프로세스는 fpdf 를 불러오지 않습니다.
+"""
+from functools import lru_cache
+from importlib.util import find_spec
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+import copy
+import glob
+import io
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+# fpdf2 가 폰트 서브셋을 만들 때마다 남기는 INFO 로그는 숨김
+logging.getLogger("fontTools.subset").setLevel(logging.WARNING)
+
+# 설치 여부만 확인 (import 는 렌더링할 때)
+PDF_AVAILABLE = find_spec("fpdf") is not None
+
+FONT_FAMILY = "ReportSans"
+
+# PDF_FONT_PATH 가 없을 때 찾아보는 한글 폰트 (앞에 있을수록 우선)
+_FONT_CANDIDATES = (
+    "C:/Windows/Fonts/malgun.ttf",
+    "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
+    "/usr/share/fonts/nanum/NanumGothic.ttf",
+    "/usr/share/fonts/truetype/noto/NotoSansKR-Regular.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc",
+    "/System/Library/Fonts/Supplemental/AppleGothic.ttf",
+    "/Library/Fonts/NanumGothic.ttf",
+)
+_FONT_GLOBS = (
+    "/usr/share/fonts/**/NanumGothic*.ttf",
+    "/usr/share/fonts/**/NotoSans*KR*-Regular.[ot]tf",
+    "/usr/share/fonts/**/NotoSansCJK*-Regular.tt[cf]",
+    os.path.expanduser("~/.local/share/fonts/**/*Gothic*.ttf"),
+)
+
+# ===== 리포트 골격 (정적 문구/레이아웃) =====
+_TITLE = "HolinFlow Detailed Report"
+_SUMMARY_ROWS = (
+    ("Monthly Goal:", "monthly_goal"),
+    ("Current Assets:", "current_assets"),
+    ("Expected Monthly Income:", "expected_monthly_income"),
+    ("Required Additional Assets:", "required_additional_assets"),
+)
+_SECTION_ALLOCATION = "Allocation Details"
+_SECTION_CASHFLOW = "Monthly Cash Flow (연 {} 만원)"
+_SECTION_EXTRA = "Additional Recommendations (3)"
+_SECTION_AI = "AI Opinion"
+_SECTION_MARKET = "Market Opinion"
+_SKELETON_TEXT = "".join([
+    _TITLE, _SECTION_ALLOCATION, _SECTION_CASHFLOW, _SECTION_EXTRA, _SECTION_AI, _SECTION_MARKET,
+    *(label for label, _ in _SUMMARY_ROWS), "- () 만원 * / Dividend: x 월 [] ,",
+])
+
+# 골격 좌표 (mm, A4 기본 여백 10mm). 값 칸 이름 = _SUMMARY_ROWS 의 키
+_MARGIN = 10.0
+_LABEL_WIDTH = 55.0
+_TITLE_HEIGHT = 10.0
+_ROW_HEIGHT = 8.0
+_SKELETON_BOTTOM = _MARGIN + _TITLE_HEIGHT + _ROW_HEIGHT * len(_SUMMARY_ROWS) + 4 + _ROW_HEIGHT
+
+
+@lru_cache(maxsize=2)
+def _skeleton_elements(font_name: str) -> Tuple[Dict, ...]:
+    """첫 페이지 머리 FlexTemplate 요소 정의 (폰트별로 한 번만 생성, 요청마다 값 칸을 채워 그림)"""
+    def text(name, x1, y1, width, height, size, value=""):
+        return {"name": name, "type": "T", "x1": x1, "y1": y1, "x2": x1 + width, "y2": y1 + height,
+                "font": font_name, "size": size, "text": value, "priority": 0}
+
+    body_width = 210 - 2 * _MARGIN
+    elements = [text("title", _MARGIN, _MARGIN, body_width, _TITLE_HEIGHT, 12, _TITLE)]
+    y = _MARGIN + _TITLE_HEIGHT
+    for label, key in _SUMMARY_ROWS:
+        elements.append(text(f"{key}_label", _MARGIN, y, _LABEL_WIDTH, _ROW_HEIGHT, 10, label))
+        elements.append(text(key, _MARGIN + _LABEL_WIDTH, y, body_width - _LABEL_WIDTH, _ROW_HEIGHT, 10))
+        y += _ROW_HEIGHT
+    elements.append(text("section_allocation", _MARGIN, y + 4, body_width, _ROW_HEIGHT, 11, _SECTION_ALLOCATION))
+    return tuple(elements)
+
+
+def _report_charset() -> FrozenSet[int]:
+    """부분 폰트에 넣을 글자: ASCII, KS X 1001 기호/자모/한글 2350자, 리포트 골격 문구"""
+    chars = set(range(0x20, 0x7F))
+    for lead in list(range(0xA1, 0xAD)) + list(range(0xB0, 0xC9)):
+        for trail in range(0xA1, 0xFF):
+            try:
+                chars.update(ord(c) for c in bytes((lead, trail)).decode("euc-kr"))
+            except UnicodeDecodeError:
+                continue
+    chars.update(ord(c) for c in _SKELETON_TEXT)
+    return frozenset(chars)
+
+
+def find_font_path() -> Optional[str]:
+    """PDF_FONT_PATH -> 알려진 경로 -> 폰트 디렉터리 검색 순서로 한글 폰트 찾기"""
+    configured = os.getenv("PDF_FONT_PATH")
+    if configured:
+        if os.path.exists(configured):
+            return configured
+        logger.warning("PDF_FONT_PATH not found: %s", configured)
+    for path in _FONT_CANDIDATES:
+        if os.path.exists(path):
+            return path
+    for pattern in _FONT_GLOBS:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if matches:
+            return matches[0]
+    return None
+
+
+class _ParsedFont:
+    """fpdf2 TTFFont 를 한 번 파싱해 두고 문서마다 얕은 복사본을 붙임"""
+
+    def __init__(self, data: bytes, charset: Optional[FrozenSet[int]] = None):
+        from fontTools import ttLib
+        from fpdf import FPDF
+        from fpdf.fonts import TTFFont
+
+        self._ttLib = ttLib
+        self.data = data
+        prototype = TTFFont(FPDF(), io.BytesIO(data), FONT_FAMILY.lower(), "")
+        self.prototype = prototype
+        self.identities = list(prototype.subset._reserved)
+        # 이 폰트로 그릴 수 있는 글자 (부분 폰트면 charset 과 폰트 cmap 의 교집합)
+        self.charset = frozenset(prototype.cmap) if charset is None else charset & frozenset(prototype.cmap)
+
+    def attach(self, pdf: "FPDF") -> None:
+        from fpdf.fonts import SubsetMap
+
+        font = copy.copy(self.prototype)
+        font.i = len(pdf.fonts) + 1
+        # 출력 시 fpdf2 가 ttfont 를 제자리에서 서브셋하므로 문서마다 새로 엽니다 (lazy 라 비용이 작음)
+        font.ttfont = self._ttLib.TTFont(io.BytesIO(self.data), recalcTimestamp=False, fontNumber=0, lazy=True)
+        font.missing_glyphs = []
+        font.subset = SubsetMap(font, list(self.identities))
+        pdf.fonts[font.fontkey] = font
+
+
+class _FontCache:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._full_data = f.read()
+        self._full: Optional[_ParsedFont] = None
+        charset = _report_charset()
+        self.subset = _ParsedFont(_subset_font(self._full_data, charset), charset)
+
+    @property
+    def full(self) -> _ParsedFont:
+        if self._full is None:
+            self._full = _ParsedFont(self._full_data)
+        return self._full
+
+    def for_text(self, chars: Iterable[int]) -> _ParsedFont:
+        return self.subset if self.subset.charset.issuperset(chars) else self.full
+
+
+def _subset_font(data: bytes, charset: FrozenSet[int]) -> bytes:
+    from fontTools import subset as ftsubset
+    from fontTools import ttLib
+
+    font = ttLib.TTFont(io.BytesIO(data), recalcTimestamp=False, fontNumber=0)
+    options = ftsubset.Options(notdef_outline=True, recommended_glyphs=True)
+    options.drop_tables += ["GSUB", "GPOS", "GDEF", "MATH", "hdmx", "meta", "FFTM", "DSIG"]
+    subsetter = ftsubset.Subsetter(options)
+    subsetter.populate(unicodes=charset)
+    subsetter.subset(font)
+    output = io.BytesIO()
+    font.save(output)
+    return output.getvalue()
+
+
+@lru_cache(maxsize=1)
+def report_font_path() -> Optional[str]:
+    """이 프로세스에서 사용할 한글 폰트 경로 (한 번만 탐색)"""
+    path = find_font_path()
+    if path is None:
+        logger.warning("no Korean font found; set PDF_FONT_PATH (Korean text will fail to render)")
+    return path
+
+
+@lru_cache(maxsize=1)
+def _font_cache() -> Optional[_FontCache]:
+    path = report_font_path()
+    return _FontCache(path) if path else None
+
+
+def preload_report_fonts() -> Optional[str]:
+    """폰트 탐색/파싱을 미리 수행 (서버 시작, 렌더 워커 시작 시). 사용할 폰트 경로 반환"""
+    if not PDF_AVAILABLE:
+        return None
+    cache = _font_cache()
+    return cache.path if cache else None
+
+
+def _text_chars(*values) -> set:
+    chars = set()
+    stack = list(values)
+    while stack:
+        value = stack.pop()
+        if isinstance(value, str):
+            chars.update(map(ord, value))
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif value is not None:
+            chars.update(map(ord, str(value)))
+    return chars
+
+
+# 미리 파싱한 폰트 붙이기가 한 번 실패하면 이 프로세스에서는 add_font 만 사용
+_attach_failed = False
+
+
+def _get_pdf_font(pdf: "FPDF", chars: Iterable[int] = ()) -> str:
+    global _attach_failed
+    cache = _font_cache()
+    if cache is None:
+        return "Helvetica"
+    if not _attach_failed:
+        try:
+            cache.for_text(chars).attach(pdf)
+            return FONT_FAMILY
+        except Exception:  # fpdf2 내부 구조가 바뀐 경우 (requirements 의 fpdf2 버전 고정을 벗어남)
+            _attach_failed = True
+            logger.warning("cached font attach failed; falling back to add_font", exc_info=True)
+    pdf.add_font(FONT_FAMILY, "", cache.path)
+    return FONT_FAMILY
+
+
+def render_report_pdf(plan: Dict, extra_items: List[Dict], ai_opinion: str, market_opinion: str,
+                      monthly_cashflow: Optional[List[float]] = None) -> bytes:
+    """
+    `DetailedPlanResponse.model_dump()` 형태의 플랜을 PDF 바이트로 렌더링.
+    monthly_cashflow 는 1~12월 현금 수입 (cashflow_calendar 결과, 만원)
+    """
+    from fpdf import FPDF
+    from fpdf.template import FlexTemplate
+
+    report = plan.get("report", {})
+
+    pdf = FPDF()
+    pdf.set_margins(_MARGIN, _MARGIN)
+    pdf.add_page()
+    chars = _text_chars(plan, extra_items, ai_opinion, market_opinion, monthly_cashflow)
+    font_name = _get_pdf_font(pdf, chars | set(map(ord, _SKELETON_TEXT)))
+
+    skeleton = FlexTemplate(pdf, list(_skeleton_elements(font_name)))
+    summary = {**report, "monthly_goal": plan["monthly_goal"]}
+    for _, key in _SUMMARY_ROWS:
+        skeleton[key] = f"{summary.get(key, 0)} 만원"
+    skeleton.render()
+    pdf.set_xy(_MARGIN, _SKELETON_BOTTOM)
+    pdf.set_font(font_name, size=9)
+    for asset in plan["assets"]:
+        pdf.cell(0, 7, f"- {asset['category']} ({round(asset['amount'], 1)} 만원)", ln=True)
+        for item in asset["items"]:
+            name = item.get("name", "")
+            code = item.get("code", "")
+            allocation = item.get("allocation", 0)
+            pdf.cell(0, 6, f"  * {name} ({code}) / {allocation} 만원", ln=True)
+            payout_months = item.get("payout_months")
+            if payout_months:
+                count = len(payout_months)
+                months_text = ", ".join(str(month) for month in payout_months)
+                pdf.cell(0, 6, f"    - Dividend: {count}x / {months_text}월", ln=True)
+
+    if monthly_cashflow:
+        pdf.ln(3)
+        pdf.set_font(font_name, size=11)
+        pdf.cell(0, 8, _SECTION_CASHFLOW.format(round(sum(monthly_cashflow), 1)), ln=True)
+        pdf.set_font(font_name, size=9)
+        for start in (0, 6):
+            for month in range(start, start + 6):
+                pdf.cell(31, 6, f"{month + 1}월 {monthly_cashflow[month]:.1f}")
+            pdf.ln(6)
+
+    pdf.ln(3)
+    pdf.set_font(font_name, size=11)
+    pdf.cell(0, 8, _SECTION_EXTRA, ln=True)
+    pdf.set_font(font_name, size=9)
+    for item in extra_items:
+        pdf.multi_cell(0, 6, f"- {item['name']} ({item['code']}) [{item['type']}] {item['description']}", new_x="LMARGIN")
+
+    pdf.ln(2)
+    pdf.set_font(font_name, size=11)
+    pdf.cell(0, 8, _SECTION_AI, ln=True)
+    pdf.set_font(font_name, size=9)
+    pdf.multi_cell(0, 6, ai_opinion, new_x="LMARGIN")
+
+    pdf.set_font(font_name, size=11)
+    pdf.cell(0, 8, _SECTION_MARKET, ln=True)
+    pdf.set_font(font_name, size=9)
+    pdf.multi_cell(0, 6, market_opinion, new_x="LMARGIN")
+
+    return bytes(pdf.output())
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# 저장소 루트에서 `pytest backend/tests` 로 실행해도 backend 패키지를 import 할 수 있도록
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# 테스트에서 main 을 import 해도 작업 디렉터리에 플랜 DB 를 만들지 않도록 (필요한 테스트는 tmp_path 저장소를 씀)
+os.environ.setdefault("PLAN_STORE_PATH", "")
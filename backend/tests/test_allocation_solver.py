@@ -0,0 +1,64 @@
+from itertools import product
+
+import numpy as np
+import pytest
+
+from backend.allocation_solver import AllocationSolver, build_covariance, item_weights
+
+RETURNS = (3.0, 7.0, 5.0, 6.0)
+VOLATILITY = (1.0, 18.0, 12.0, 15.0)
+BOUNDS = ((0.1, 0.5), (0.1, 0.5), (0.1, 0.5), (0.05, 0.4))
+
+
+def _grid_minimum_variance(target_return, step=0.01):
+    """격자 탐색으로 구한 (목표 수익률 이상, 상하한 만족) 최소 분산"""
+    mu = np.asarray(RETURNS) / 100
+    cov = build_covariance(VOLATILITY)
+    ticks = np.arange(0, 1 + step / 2, step)
+    w = np.array(np.meshgrid(ticks, ticks, ticks, indexing="ij")).reshape(3, -1).T
+    w = np.column_stack([w, 1 - w.sum(axis=1)])
+    lo, hi = np.array(BOUNDS).T
+    feasible = np.all((w >= lo - 1e-9) & (w <= hi + 1e-9), axis=1) & (w @ mu >= target_return / 100 - 1e-9)
+    w = w[feasible]
+    return float(np.einsum("ij,jk,ik->i", w, cov, w).min())
+
+
+@pytest.mark.parametrize("target_return", [3.5, 4.5, 5.5])
+def test_solution_is_feasible_and_not_worse_than_grid(target_return):
+    solution = AllocationSolver().solve("test", RETURNS, VOLATILITY, BOUNDS, target_return)
+    w = np.asarray(solution.weights)
+    assert w.sum() == pytest.approx(1.0)
+    assert all(lo - 1e-7 <= x <= hi + 1e-7 for x, (lo, hi) in zip(w, BOUNDS))
+    assert solution.target_reachable
+    assert solution.expected_return >= target_return - 1e-6
+    variance = (solution.volatility / 100) ** 2
+    assert variance <= _grid_minimum_variance(target_return) + 1e-12
+
+
+def test_unreachable_target_uses_max_feasible_return():
+    solution = AllocationSolver().solve("test", RETURNS, VOLATILITY, BOUNDS, 50.0)
+    assert not solution.target_reachable
+    # 하한(0.1, 0.1, 0.1, 0.05)을 먼저 배정하고 남은 0.65 를 7% -> 6% 순으로 상한까지 채운 해
+    assert solution.expected_return == pytest.approx(0.1 * 3 + 0.5 * 7 + 0.1 * 5 + 0.3 * 6, abs=1e-4)
+
+
+def test_warm_start_matches_cold_solve():
+    solver = AllocationSolver()
+    cold = solver.solve("test", RETURNS, VOLATILITY, BOUNDS, 5.0)
+    warm = solver.solve("test", RETURNS, VOLATILITY, BOUNDS, 5.05)
+    fresh = AllocationSolver().solve("test", RETURNS, VOLATILITY, BOUNDS, 5.05)
+    assert not cold.warm_started and warm.warm_started
+    np.testing.assert_allclose(warm.weights, fresh.weights, atol=1e-9)
+
+
+def test_item_weights_is_exact_lp_optimum():
+    returns = [4.0, 6.5, 5.0]
+    weights = item_weights(returns)
+    assert weights == pytest.approx((0.1, 0.6, 0.3))
+    # 격자 위 어떤 실행 가능 해도 기대수익이 더 높지 않음
+    best = max(
+        sum(w * r for w, r in zip((a, b, 1 - a - b), returns))
+        for a, b in product(np.arange(0.1, 0.61, 0.05), repeat=2)
+        if 0.1 - 1e-9 <= 1 - a - b <= 0.6 + 1e-9
+    )
+    assert sum(w * r for w, r in zip(weights, returns)) >= best - 1e-9
@@ -0,0 +1,44 @@
+import asyncio
+import json
+
+from backend import bench
+
+
+def _status_app(statuses):
+    """요청마다 statuses 를 차례로 돌려주는 ASGI 앱"""
+    sequence = iter(statuses)
+
+    async def app(scope, receive, send):
+        await receive()
+        await send({"type": "http.response.start", "status": next(sequence), "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    return app
+
+
+def test_load_endpoint_counts_only_ok_responses_as_samples():
+    result = asyncio.run(bench._load_endpoint(_status_app([200, 304, 500, 200]), "/api/plan", 4, 1, 1))
+    assert result["n"] == 3
+    assert result["statuses"] == {"200": 2, "304": 1, "500": 1}
+    assert result["failed"] == "1/4 responses were not 2xx/304"
+
+
+def test_load_endpoint_with_only_errors_has_no_latency_figures():
+    result = asyncio.run(bench._load_endpoint(_status_app([500] * 3), "/api/plan", 3, 2, 1))
+    assert "p50_ms" not in result and "rps" not in result
+    assert result["failed"] == "3/3 responses were not 2xx/304"
+
+
+def test_compare_reports_failed_endpoint_as_regression():
+    baseline = {"load": {"/api/report-pdf": {"p50_ms": 40.0, "p99_ms": 90.0, "rps": 100.0}}}
+    current = {"load": {"/api/report-pdf": {"p50_ms": 0.5, "p99_ms": 1.0, "rps": 1600.0,
+                                            "statuses": {"500": 10}, "failed": "10/10 responses were not 2xx/304"}}}
+    assert bench.compare(baseline, current, threshold=0.2) == ["load:/api/report-pdf:failed"]
+    assert bench.compare(current, baseline, threshold=0.2) == []  # 실패한 기준값과는 비교하지 않음
+
+
+def test_plan_bodies_are_unique_across_calls():
+    first = bench._load_bodies("/api/plan-detailed", 50, 1)
+    second = bench._load_bodies("/api/plan-detailed", 50, 1)
+    goals = [json.loads(body)["monthly_goal"] for body in first + second]
+    assert len(set(goals)) == 100
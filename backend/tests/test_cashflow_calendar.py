@@ -0,0 +1,43 @@
+import numpy as np
+
+from backend.plan_templates import current_snapshot
+
+
+def _held_codes(payouts, count=4):
+    # 지급이 있는 상품만 골라 보유 (월별 값이 0 이 아니어야 비교 의미가 있음)
+    paying = np.flatnonzero(payouts.matrix.sum(axis=1) > 0)[:count]
+    codes = {i: code for code, i in payouts.index_by_code.items()}
+    return {codes[int(i)]: 1000.0 * (n + 1) for n, i in enumerate(paying)}
+
+
+def test_reinvest_matches_month_by_month_loop():
+    payouts = current_snapshot().payouts
+    holdings, unmatched = payouts.holdings_vector({**_held_codes(payouts), "NOPE": 5.0})
+    assert unmatched == ["NOPE"]
+    calendar = payouts.calendar(holdings, years=3, reinvest=True)
+
+    principal = holdings.copy()
+    expected = np.zeros((3, 12))
+    for year in range(3):
+        for month in range(12):
+            paid = principal * payouts.matrix[:, month]
+            expected[year, month] = paid.sum()
+            principal = principal + paid
+    np.testing.assert_allclose(calendar["total"], expected, rtol=1e-12)
+
+
+def test_without_reinvest_every_year_is_the_same():
+    payouts = current_snapshot().payouts
+    holdings, _ = payouts.holdings_vector(_held_codes(payouts))
+    calendar = payouts.calendar(holdings, years=2)
+    np.testing.assert_allclose(calendar["total"][0], calendar["total"][1])
+    np.testing.assert_allclose(calendar["total"][0], holdings @ payouts.matrix)
+    by_kind = sum(calendar[name] for name in ("dividend", "interest", "reit"))
+    np.testing.assert_allclose(by_kind, calendar["total"])
+
+
+def test_empty_holdings_give_zero_calendar():
+    payouts = current_snapshot().payouts
+    holdings, _ = payouts.holdings_vector({})
+    for reinvest in (False, True):
+        assert not payouts.calendar(holdings, years=2, reinvest=reinvest)["total"].any()
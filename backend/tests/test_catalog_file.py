@@ -0,0 +1,123 @@
+import logging
+import os
+import time
+
+import pytest
+
+from backend import plan_templates
+from backend.catalog import Product, build_builtin_catalog
+from backend.catalog_file import MAGIC, CatalogFileError, load_catalog_file, write_catalog_file
+from backend.plan_templates import CATEGORY_RATES, PlanSnapshot
+
+RATES = {**CATEGORY_RATES, "투자": 11.5}
+
+
+def _mapped(path):
+    """이 프로세스에 mmap 된 파일인지 (/proc 가 있는 환경에서만 확인)"""
+    with open("/proc/self/maps", encoding="utf-8", errors="replace") as f:
+        return any(line.rstrip("\n").endswith(str(path)) for line in f)
+
+
+def test_round_trip_preserves_every_field(tmp_path):
+    path = tmp_path / "catalog.bin"
+    source = build_builtin_catalog()
+    write_catalog_file(str(path), source, RATES, "2024-06")
+    loaded = load_catalog_file(str(path))
+
+    assert len(loaded) == len(source)
+    assert loaded.category_rates == RATES
+    for original, product in zip(source.products, loaded.products):
+        for field in Product.__slots__:
+            assert getattr(product, field) == getattr(original, field), (original.code, field)
+    assert list(loaded.expected_returns) == list(source.expected_returns)
+    assert list(loaded.dividend_rates) == list(source.dividend_rates)
+    # 인덱스도 원래 카탈로그와 같게 만들어짐
+    high_risk = [p.code for p in source.pool("etf", "high_risk")]
+    assert high_risk and [p.code for p in loaded.pool("etf", "high_risk")] == high_risk
+    assert any(p.payout_months for p in loaded.products)
+    assert any(p.risk_tier is None for p in loaded.products)
+
+
+def test_version_is_label_plus_content_hash(tmp_path):
+    path = tmp_path / "catalog.bin"
+    write_catalog_file(str(path), build_builtin_catalog(), CATEGORY_RATES, "2024-06")
+    first = load_catalog_file(str(path)).version
+    write_catalog_file(str(path), build_builtin_catalog(), CATEGORY_RATES, "2024-06")
+    assert load_catalog_file(str(path)).version == first
+    assert first.startswith("2024-06+")
+
+    # 같은 라벨이라도 금리가 바뀌면 다른 버전
+    write_catalog_file(str(path), build_builtin_catalog(), RATES, "2024-06")
+    assert load_catalog_file(str(path)).version != first
+    # 기본 라벨로 내보내도 내장 카탈로그와 겹치지 않음
+    write_catalog_file(str(path), build_builtin_catalog(), CATEGORY_RATES, "builtin")
+    assert load_catalog_file(str(path)).version != build_builtin_catalog(CATEGORY_RATES).version
+
+
+def test_builtin_version_follows_category_rates():
+    assert build_builtin_catalog(CATEGORY_RATES).version == build_builtin_catalog(CATEGORY_RATES).version
+    assert build_builtin_catalog(CATEGORY_RATES).version != build_builtin_catalog(RATES).version
+
+
+@pytest.mark.parametrize("content", [b"", b"HFCAT", b"NOTACAT!" + b"\0" * 24, None])
+def test_invalid_file_raises_and_unmaps(tmp_path, content):
+    path = tmp_path / "catalog.bin"
+    if content is None:  # 헤더는 맞지만 뒤가 잘린 파일
+        write_catalog_file(str(path), build_builtin_catalog(), CATEGORY_RATES, "v1")
+        data = path.read_bytes()
+        assert data.startswith(MAGIC)
+        content = data[:len(data) // 2]
+    path.write_bytes(content)
+    with pytest.raises(CatalogFileError):
+        load_catalog_file(str(path))
+    if os.path.exists("/proc/self/maps"):
+        assert not _mapped(path)
+
+
+@pytest.fixture
+def file_snapshot(tmp_path, monkeypatch):
+    """카탈로그 파일을 읽은 스냅샷을 현재 스냅샷으로 (테스트가 끝나면 원래 스냅샷으로 복원)"""
+    path = tmp_path / "catalog.bin"
+    write_catalog_file(str(path), build_builtin_catalog(), CATEGORY_RATES, "v1")
+    snapshot = PlanSnapshot(load_catalog_file(str(path)), source_path=str(path), source_mtime=os.stat(path).st_mtime)
+    monkeypatch.setattr(plan_templates, "_snapshot", snapshot)
+    return path
+
+
+def _touch_later(path):
+    # 같은 시각 안에 다시 쓰면 mtime 이 같을 수 있으므로 확실히 다른 값으로
+    mtime = os.stat(path).st_mtime + 10
+    os.utime(path, (mtime, mtime))
+
+
+def test_reload_if_changed_swaps_snapshot(file_snapshot):
+    before = plan_templates.current_snapshot()
+    assert plan_templates.reload_if_changed() is False
+
+    write_catalog_file(str(file_snapshot), build_builtin_catalog(), RATES, "v1")
+    _touch_later(file_snapshot)
+    assert plan_templates.reload_if_changed() is True
+    after = plan_templates.current_snapshot()
+    assert after is not before and after.catalog.version != before.catalog.version
+    assert plan_templates.get_template("중립").category_rates["투자"] == 11.5
+    assert before.get_template("중립").category_rates["투자"] == CATEGORY_RATES["투자"]
+    assert plan_templates.reload_if_changed() is False
+
+
+def test_watcher_logs_a_bad_file_once_until_it_changes(file_snapshot, caplog):
+    file_snapshot.write_bytes(b"broken")
+    _touch_later(file_snapshot)
+    caplog.set_level(logging.WARNING, logger=plan_templates.logger.name)
+    stop = plan_templates.start_catalog_watcher(0.01)
+    try:
+        time.sleep(0.2)
+        assert len([r for r in caplog.records if "catalog reload failed" in r.getMessage()]) == 1
+
+        write_catalog_file(str(file_snapshot), build_builtin_catalog(), RATES, "v2")
+        _touch_later(file_snapshot)
+        deadline = time.monotonic() + 2
+        while not plan_templates.current_snapshot().catalog.version.startswith("v2+"):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    finally:
+        stop.set()
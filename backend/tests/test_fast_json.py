@@ -0,0 +1,114 @@
+import gzip
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import fast_json, main
+from backend.fast_json import COMPRESS_MIN_BYTES, json_response, negotiate_encoding
+
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    """brotli 가 설치된 것처럼 (압축 결과는 표시만 붙임)"""
+    monkeypatch.setattr(fast_json, "brotli", SimpleNamespace(compress=lambda body, quality: b"br:" + body))
+
+
+@pytest.fixture
+def without_brotli(monkeypatch):
+    monkeypatch.setattr(fast_json, "brotli", None)
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("br, gzip", "br"),
+    ("gzip, br", "br"),  # q 가 같으면 br 우선
+    ("br;q=0.5, gzip", "gzip"),
+    ("BR;q=0.9, gzip;q=0.8", "br"),
+    ("br;q=0, gzip;q=0.1", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("*", "br"),
+    ("*;q=0.5, br;q=0", "gzip"),  # 명시한 q=0 이 * 보다 우선
+    ("gzip;q=abc", None),  # 잘못된 q 는 0 으로
+])
+def test_negotiate_encoding_with_brotli(with_brotli, header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("br", None),
+    ("br, gzip;q=0.1", "gzip"),
+    ("*", "gzip"),
+])
+def test_negotiate_encoding_without_brotli(without_brotli, header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def test_small_body_is_not_compressed(with_brotli):
+    body = b"x" * (COMPRESS_MIN_BYTES - 1)
+    response = json_response(body, "br, gzip")
+    assert response.body == body
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_large_body_is_compressed_with_negotiated_encoding(with_brotli):
+    body = b"x" * COMPRESS_MIN_BYTES
+    response = json_response(body, "br, gzip", headers={"ETag": '"v1"'}, status_code=201)
+    assert (response.status_code, response.body) == (201, b"br:" + body)
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == '"v1"'
+
+    response = json_response(body, "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(response.body) == body
+    assert int(response.headers["content-length"]) == len(response.body)
+
+
+def test_uncompressed_response_still_varies_on_accept_encoding():
+    response = json_response({"a": [1, 2]})
+    assert json.loads(response.body) == {"a": [1, 2]}
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.media_type == "application/json"
+
+
+def _plan():
+    return main.generate_detailed_plan(main.PlanRequest(monthly_goal=300, current_assets=50000, risk_level="중립"),
+                                       store=False)
+
+
+def test_compact_plan_keeps_figures_and_drops_catalog_fields():
+    plan = _plan()
+    compact = main._compact_plan(plan)
+    assert set(compact) == {"compact", "catalog_version", "plan_id", "monthly_goal", "total_allocation", "report",
+                            "assets"}
+    assert compact["compact"] is True
+    assert compact["catalog_version"] == plan.report["catalog_version"]
+    assert (compact["monthly_goal"], compact["total_allocation"]) == (plan.monthly_goal, plan.total_allocation)
+
+    products = json.loads(main._catalog_products_body(main.current_snapshot().catalog))["products"]
+    assert len(compact["assets"]) == len(plan.assets)
+    for asset, full in zip(compact["assets"], plan.assets):
+        assert set(asset) == {"category", "amount", "allocation_percent", "expected_income", "items"}
+        assert asset["amount"] == full.amount
+        assert len(asset["items"]) == len(full.items)
+        for item, full_item in zip(asset["items"], full.items):
+            assert set(item) == set(full_item) - main._CATALOG_ITEM_FIELDS
+            assert item["allocation"] == full_item["allocation"]
+            # 빠진 필드는 카탈로그 상품 정보로 복원할 수 있어야 함
+            assert products[item["code"]]["name"] == full_item["name"]
+
+
+def test_compact_query_returns_compact_payload():
+    client = TestClient(main.app)
+    body = {"monthly_goal": 300, "current_assets": 50000, "risk_level": "중립"}
+    full = client.post("/api/plan-detailed", json=body)
+    compact = client.post("/api/plan-detailed?compact=true", json=body, headers={"Accept-Encoding": "gzip"})
+    assert compact.headers["vary"] == "Accept-Encoding"
+    assert compact.json()["compact"] is True
+    assert len(compact.content) < len(full.content)
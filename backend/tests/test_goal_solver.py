@@ -0,0 +1,67 @@
+import math
+
+import numpy as np
+import pytest
+
+from backend.goal_solver import MAX_SOLVE_YEARS, future_value, months_to_goal, required_contribution, solve_goal_grid
+
+TARGETS = np.array([10000.0, 50000.0, 120000.0])
+CONTRIBUTIONS = np.array([0.0, 50.0, 200.0, 1000.0])
+RATE = 0.05 / 12
+
+
+def _loop_months(target, present_value, contribution, rate, growth):
+    """월별 반복: 수익이 붙은 뒤 월말 적립 (처음 목표 이상이 되는 달)"""
+    value, payment = present_value, contribution
+    for month in range(1, MAX_SOLVE_YEARS * 12 + 1):
+        value = value * (1 + rate) + payment
+        payment *= 1 + growth
+        if value >= target:
+            return month
+    return math.inf
+
+
+def test_closed_form_matches_bisection():
+    closed = months_to_goal(TARGETS, 5000.0, CONTRIBUTIONS, RATE)
+    # 증가율이 0 이 아니면 이분 탐색 경로 (무시할 만큼 작은 증가율로 같은 문제를 풂)
+    bisected = months_to_goal(TARGETS, 5000.0, CONTRIBUTIONS, RATE, 1e-12)
+    finite = np.isfinite(closed)
+    assert finite.sum() >= 8
+    np.testing.assert_array_equal(finite, np.isfinite(bisected))
+    np.testing.assert_allclose(closed[finite], bisected[finite], atol=0.01)
+
+
+@pytest.mark.parametrize("growth", [0.0, 0.003])
+def test_months_agree_with_monthly_loop(growth):
+    months = months_to_goal(TARGETS, 5000.0, CONTRIBUTIONS, RATE, growth)
+    for i, target in enumerate(TARGETS):
+        for j, contribution in enumerate(CONTRIBUTIONS):
+            expected = _loop_months(target, 5000.0, contribution, RATE, growth)
+            assert math.ceil(months[i, j] - 1e-9) == expected
+
+
+def test_required_contribution_reaches_target_exactly():
+    months = np.array([12.0, 120.0, 360.0])
+    for growth in (0.0, 0.002, RATE):  # r == g 특수 경우 포함
+        required = required_contribution(TARGETS, 5000.0, months, RATE, growth)
+        reached = future_value(5000.0, required, months[None, :], RATE, growth)
+        target = np.broadcast_to(TARGETS[:, None], reached.shape)
+        paying = required > 0  # 0 이면 적립 없이도 이미 목표 이상
+        assert paying.sum() >= 7
+        np.testing.assert_allclose(reached[paying], target[paying], rtol=1e-9)
+        assert (reached[~paying] >= target[~paying]).all()
+
+
+def test_edge_cases():
+    # 이미 도달 -> 0, 적립/수익 없이 도달 불가 -> inf
+    assert months_to_goal([1000.0], 2000.0, [0.0], RATE)[0, 0] == 0.0
+    assert months_to_goal([3000.0], 2000.0, [0.0], 0.0)[0, 0] == math.inf
+    assert months_to_goal([3000.0], 2000.0, [100.0], 0.0)[0, 0] == pytest.approx(10.0)
+    assert required_contribution([1000.0], 2000.0, [12.0], RATE)[0, 0] == 0.0
+
+
+def test_solve_goal_grid_shapes():
+    result = solve_goal_grid([100, 300], 10000, 6.0, [5, 10, 20], [50, 100], contribution_growth=3.0)
+    assert result["required_total_assets"] == pytest.approx([20000.0, 60000.0])
+    assert result["required_monthly_contribution"].shape == (2, 3)
+    assert result["months_to_goal"].shape == (2, 2)
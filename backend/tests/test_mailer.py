@@ -0,0 +1,146 @@
+import email
+import email.policy
+import socketserver
+import threading
+import time
+
+import pytest
+
+from backend.mailer import EmailQueue, SmtpConnectionPool, SmtpSettings
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    """테스트용 최소 SMTP 서버 (EHLO/MAIL/RCPT/DATA/NOOP/RSET/QUIT, TLS/AUTH 없음)"""
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self._reply("220 localhost test SMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("ascii", "replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self._reply("250-localhost", "250 8BITMIME")
+            elif verb == "RCPT":
+                address = command.split(":", 1)[1].strip().strip("<>")
+                self._reply("550 rejected" if address in server.rejected else "250 OK")
+            elif verb == "DATA":
+                self._reply("354 end with .")
+                chunks = []
+                while True:
+                    data = self.rfile.readline()
+                    if data in (b".\r\n", b""):
+                        break
+                    chunks.append(data[1:] if data.startswith(b"..") else data)
+                with server.lock:
+                    server.messages.append(email.message_from_bytes(b"".join(chunks), policy=email.policy.default))
+                self._reply("250 queued")
+            elif verb == "QUIT":
+                self._reply("221 bye")
+                return
+            else:  # MAIL, NOOP, RSET
+                self._reply("250 OK")
+
+    def _reply(self, *lines):
+        self.wfile.write("".join(f"{line}\r\n" for line in lines).encode("ascii"))
+
+
+class _SmtpServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SmtpHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = []
+        self.rejected = set()
+
+
+@pytest.fixture
+def smtp_server():
+    server = _SmtpServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _settings(port):
+    return SmtpSettings(host="127.0.0.1", port=port, user=None, password=None, sender="noreply@holinflow.test",
+                        use_tls=False)
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_pool_reuses_logged_in_connection(smtp_server):
+    pool = SmtpConnectionPool(lambda: _settings(smtp_server.server_address[1]))
+    server, settings = pool.acquire()
+    pool.release(server, settings)
+    again, _ = pool.acquire()
+    assert again is server
+    assert pool.opened == 1
+    pool.release(again, settings)
+    pool.close_all()
+
+
+def test_queue_sends_all_jobs_over_one_connection(smtp_server):
+    pool = SmtpConnectionPool(lambda: _settings(smtp_server.server_address[1]))
+    queue = EmailQueue(pool, workers=1)
+    jobs = [queue.submit(f"user{i}@example.com", b"%PDF-1.4 test") for i in range(3)]
+    try:
+        assert _wait_for(lambda: all(job.status == "sent" for job in jobs))
+    finally:
+        queue.shutdown()
+    assert smtp_server.connections == 1
+    assert pool.opened == 1
+    assert sorted(message["To"] for message in smtp_server.messages) == [f"user{i}@example.com" for i in range(3)]
+    attachment = next(smtp_server.messages[0].iter_attachments())
+    assert attachment.get_filename() == "HolinFlow_Report.pdf"
+    assert attachment.get_payload(decode=True) == b"%PDF-1.4 test"
+    assert all(job.pdf_bytes == b"" for job in jobs)  # 발송 후 PDF 는 메모리에서 해제
+
+
+def test_rejected_recipient_fails_without_retry(smtp_server):
+    smtp_server.rejected.add("bad@example.com")
+    queue = EmailQueue(SmtpConnectionPool(lambda: _settings(smtp_server.server_address[1])), backoff_base=0.01)
+    job = queue.submit("bad@example.com", b"%PDF")
+    try:
+        assert _wait_for(lambda: job.status == "failed")
+    finally:
+        queue.shutdown()
+    assert job.attempts == 1
+    assert "SMTPRecipientsRefused" in job.error
+    assert queue.stats()["failed"] == 1
+
+
+def test_connection_errors_retry_with_backoff_then_fail():
+    # 닫힌 포트: 연결할 때마다 실패 -> max_attempts 번 재시도 후 failed
+    probe = socketserver.TCPServer(("127.0.0.1", 0), socketserver.BaseRequestHandler)
+    port = probe.server_address[1]
+    probe.server_close()
+
+    statuses = []
+    queue = EmailQueue(SmtpConnectionPool(lambda: _settings(port), timeout=1.0), max_attempts=3, backoff_base=0.01)
+    original_mark = queue._mark
+    queue._mark = lambda job, status: (statuses.append(status), original_mark(job, status))
+    job = queue.submit("user@example.com", b"%PDF")
+    try:
+        assert _wait_for(lambda: job.status == "failed")
+    finally:
+        queue.shutdown()
+    assert job.attempts == 3
+    assert statuses == ["retrying", "retrying", "failed"]
+    assert job.pdf_bytes == b""
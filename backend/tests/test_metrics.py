@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import threading
+import time
+
+from backend import metrics
+from backend.metrics import Counter, Gauge, Histogram, MetricsMiddleware, gauge_lines
+
+
+def test_histogram_collect_is_cumulative_with_sum_and_count():
+    histogram = Histogram("t_seconds", "test", ("route",), buckets=(0.1, 0.5))
+    for value in (0.05, 0.1, 0.3, 2.0):
+        histogram.observe("/a", value=value)
+    histogram.observe("/b", value=0.2)
+    assert histogram.collect() == [
+        "# HELP t_seconds test",
+        "# TYPE t_seconds histogram",
+        't_seconds_bucket{route="/a",le="0.1"} 2',
+        't_seconds_bucket{route="/a",le="0.5"} 3',
+        't_seconds_bucket{route="/a",le="+Inf"} 4',
+        't_seconds_sum{route="/a"} 2.45',
+        't_seconds_count{route="/a"} 4',
+        't_seconds_bucket{route="/b",le="0.1"} 0',
+        't_seconds_bucket{route="/b",le="0.5"} 1',
+        't_seconds_bucket{route="/b",le="+Inf"} 1',
+        't_seconds_sum{route="/b"} 0.2',
+        't_seconds_count{route="/b"} 1',
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = Counter("t_total", "test", ("path",))
+    counter.inc('a\\b"c\nd')
+    assert counter.collect()[-1] == 't_total{path="a\\\\b\\"c\\nd"} 1'
+
+
+def test_gauge_and_gauge_lines():
+    gauge = Gauge("t_in_flight", "test")
+    gauge.set(value=3)
+    assert gauge.collect() == ["# HELP t_in_flight test", "# TYPE t_in_flight gauge", "t_in_flight 3"]
+    assert gauge_lines("t_pool", "pool", {"busy": 1, "idle": 2.5}, label="state")[2:] == [
+        't_pool{state="busy"} 1', 't_pool{state="idle"} 2.5'
+    ]
+
+
+def test_render_prometheus_includes_metrics_and_collectors(monkeypatch):
+    monkeypatch.setattr(metrics, "_collectors", [lambda: ["t_extra 7"]])
+    with metrics.span("test.render"):
+        pass
+    text = metrics.render_prometheus()
+    assert text.endswith("t_extra 7\n")
+    assert "# TYPE holinflow_http_requests_total counter" in text
+    assert 'holinflow_span_duration_seconds_count{span="test.render"}' in text
+
+
+async def _slow_app(scope, receive, send):
+    time.sleep(0.05)  # 샘플러가 이 스택을 잡도록 루프를 막는 작업
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def _call(middleware):
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(middleware({"type": "http", "method": "GET", "path": "/slow"}, receive, send))
+    for thread in threading.enumerate():
+        if thread.name == "profile-writer":
+            thread.join(5)
+    return messages
+
+
+def test_slow_request_profile_is_written(tmp_path):
+    middleware = MetricsMiddleware(_slow_app, slow_request_ms=1, profile_interval_ms=1, profile_dir=str(tmp_path))
+    assert _call(middleware)[0]["status"] == 200
+    files = list(tmp_path.iterdir())
+    assert len(files) == 1 and files[0].name.endswith(".folded")
+    assert "_slow_app" in files[0].read_text(encoding="utf-8")
+
+
+def test_unwritable_profile_dir_does_not_break_request(tmp_path, caplog):
+    blocker = tmp_path / "profiles"
+    blocker.write_text("not a directory")
+    middleware = MetricsMiddleware(_slow_app, slow_request_ms=1, profile_interval_ms=1, profile_dir=str(blocker))
+    caplog.set_level(logging.WARNING, logger=metrics.logger.name)
+    assert _call(middleware)[0]["status"] == 200
+    assert any("profile write failed" in r.getMessage() for r in caplog.records)
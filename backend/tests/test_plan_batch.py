@@ -0,0 +1,88 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.main import PlanRequest
+
+REQUESTS = [
+    PlanRequest(monthly_goal=goal, current_assets=assets, risk_level=risk_level, allocation_strategy=strategy)
+    for risk_level in ("보수적", "중립", "공격적", "모름")
+    for goal, assets in ((300, 50000), (0, 50000), (300, 0), (0, 0), (50, 1000000))
+    for strategy in ("fixed", "optimized")
+]
+
+
+def _expected_row(index, req):
+    """단건 설계 결과에서 배치 응답에 들어가는 부분만 (종목 추천/카탈로그 버전 제외)"""
+    plan = main.generate_detailed_plan(req, store=False)
+    report = {k: v for k, v in plan.report.items() if k != "catalog_version"}
+    return {
+        "index": index,
+        "monthly_goal": plan.monthly_goal,
+        "risk_level": req.risk_level,
+        "total_allocation": plan.total_allocation,
+        "report": report,
+        "assets": [
+            {
+                "category": asset.category,
+                "amount": asset.amount,
+                "allocation_percent": asset.allocation_percent,
+                "expected_income": asset.expected_income,
+            }
+            for asset in plan.assets
+        ],
+    }
+
+
+def _assert_close(actual, expected, path="row"):
+    """중첩 dict/list 비교 (float 는 합산 순서 차이만 허용)"""
+    if isinstance(expected, dict):
+        assert isinstance(actual, dict) and set(actual) == set(expected), path
+        for key in expected:
+            _assert_close(actual[key], expected[key], f"{path}.{key}")
+    elif isinstance(expected, list):
+        assert isinstance(actual, list) and len(actual) == len(expected), path
+        for i, (a, e) in enumerate(zip(actual, expected)):
+            _assert_close(a, e, f"{path}[{i}]")
+    elif isinstance(expected, float):
+        assert actual == pytest.approx(expected, rel=1e-9, abs=1e-9), path
+    else:
+        assert actual == expected, path
+
+
+def _rows(reqs):
+    return [json.loads(line) for chunk in main._iter_batch_ndjson(reqs, main.current_snapshot())
+            for line in chunk.splitlines()]
+
+
+def test_batch_matches_single_plans(monkeypatch):
+    # 청크 경계도 지나도록 작은 청크로
+    monkeypatch.setattr(main, "BATCH_CHUNK_SIZE", 7)
+    rows = _rows(REQUESTS)
+    assert len(rows) == len(REQUESTS)
+    for index, (row, req) in enumerate(zip(rows, REQUESTS)):
+        _assert_close(row, _expected_row(index, req), f"rows[{index}] {req}")
+
+
+def test_unknown_risk_level_uses_default_template():
+    row, = _rows([PlanRequest(monthly_goal=300, current_assets=50000, risk_level="모름")])
+    assert row["risk_level"] == "모름"
+    assert row["report"]["risk_level"] == main.DEFAULT_RISK_LEVEL
+
+
+def test_empty_batch_streams_nothing():
+    assert list(main._iter_batch_ndjson([], main.current_snapshot())) == []
+    response = TestClient(main.app).post("/api/plan-detailed/batch", json=[])
+    assert response.status_code == 200
+    assert response.content == b""
+
+
+def test_batch_endpoint_streams_one_line_per_request():
+    body = [req.model_dump() for req in REQUESTS[:3]]
+    response = TestClient(main.app).post("/api/plan-detailed/batch", json=body)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["index"] for row in rows] == [0, 1, 2]
+    _assert_close(rows[0], _expected_row(0, REQUESTS[0]))
@@ -0,0 +1,82 @@
+import json
+import sqlite3
+import time
+
+import pytest
+
+from backend.plan_store import PlanStore, plan_request_id
+
+
+def _store(path, **kwargs):
+    return PlanStore(str(path), encode=json.dumps, decode=json.loads, flush_interval=0.01, **kwargs)
+
+
+def _created_at(path, plan_id):
+    with sqlite3.connect(str(path)) as conn:
+        row = conn.execute("SELECT created_at FROM plans WHERE plan_id = ?", (plan_id,)).fetchone()
+    return row[0] if row else None
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "data" / "plans.db"  # 없는 디렉터리도 만들어야 함
+
+
+def test_plan_request_id_ignores_key_order_and_depends_on_catalog():
+    a = plan_request_id({"monthly_goal": 300, "risk_level": "중립"}, "v1")
+    assert a == plan_request_id({"risk_level": "중립", "monthly_goal": 300}, "v1")
+    assert a != plan_request_id({"monthly_goal": 300, "risk_level": "중립"}, "v2")
+    assert len(a) == 32
+
+
+def test_round_trip_through_sqlite(db_path):
+    store = _store(db_path)
+    plans = {f"id{i}": {"monthly_goal": i, "items": ["a", "b"]} for i in range(5)}
+    for plan_id, plan in plans.items():
+        store.put(plan_id, plan)
+    assert store.peek("id3") is plans["id3"]  # 기록 전에도 메모리에서 조회
+    store.flush()
+    store.close()
+    assert store.stats()["written"] == 5
+
+    reopened = _store(db_path)
+    assert reopened.peek("id3") is None  # 새 프로세스: 메모리에는 없음
+    assert reopened.get("id3") == plans["id3"]
+    assert reopened.peek("id3") == plans["id3"]  # DB 에서 읽은 플랜은 메모리에 보관
+    assert reopened.get("missing") is None
+    assert reopened.stats()["misses"] == 2
+    reopened.close()
+
+
+def test_put_again_refreshes_created_at(db_path):
+    store = _store(db_path, cache_size=1)
+    store.put("a", {"v": 1})
+    store.flush()
+    first = _created_at(db_path, "a")
+    store.put("b", {"v": 2})  # cache_size=1 -> a 는 메모리에서 밀려남
+    store.flush()
+    time.sleep(0.01)
+    store.put("a", {"v": 1})
+    store.flush()
+    store.close()
+    assert _created_at(db_path, "a") > first
+
+
+def test_expired_plans_are_hidden_and_swept(db_path):
+    store = _store(db_path)
+    store.put("old", {"v": 1})
+    store.put("new", {"v": 2})
+    store.flush()
+    store.close()
+    with sqlite3.connect(str(db_path)) as conn:
+        conn.execute("UPDATE plans SET created_at = ? WHERE plan_id = 'old'", (time.time() - 3 * 86400,))
+
+    store = _store(db_path, ttl=86400, sweep_interval=0)
+    assert store.get("old") is None
+    assert store.get("new") == {"v": 2}
+    assert _created_at(db_path, "old") is not None  # 조회만으로는 지우지 않음
+    store.put("another", {"v": 3})  # 쓰기 스레드가 기록 후 만료분 정리
+    store.flush()
+    store.close()
+    assert _created_at(db_path, "old") is None
+    assert store.stats()["expired"] == 1
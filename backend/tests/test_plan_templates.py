@@ -0,0 +1,45 @@
+import dataclasses
+import os
+
+import pytest
+
+from backend import plan_templates
+from backend.catalog import build_builtin_catalog
+from backend.catalog_file import write_catalog_file
+from backend.plan_templates import CATEGORY_RATES, DEFAULT_RISK_LEVEL, get_template
+
+
+def test_template_cannot_be_modified():
+    template = get_template("공격적")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        template.weighted_annual_return = 99.0
+    for mapping in (template.allocation, template.category_rates, template.category_volatility,
+                    template.allocation_bounds, plan_templates.current_snapshot().templates, CATEGORY_RATES):
+        with pytest.raises(TypeError):
+            mapping["투자"] = 1.0
+    for pool in (template.cash_products, template.investment_products, template.dividend_products,
+                 template.real_estate_products):
+        assert isinstance(pool, tuple)
+    assert get_template("공격적") is template
+
+
+def test_unknown_risk_level_gets_default_template():
+    assert get_template("모름") is get_template(DEFAULT_RISK_LEVEL)
+
+
+def test_get_template_follows_snapshot_swap(tmp_path, monkeypatch):
+    # 교체 후에는 원래 스냅샷으로 복원
+    monkeypatch.setattr(plan_templates, "_snapshot", plan_templates.current_snapshot())
+    before = get_template("중립")
+    path = tmp_path / "catalog.bin"
+    write_catalog_file(str(path), build_builtin_catalog(), {**CATEGORY_RATES, "투자": 11.5}, "v2")
+
+    snapshot = plan_templates.reload_catalog(str(path))
+    assert plan_templates.current_snapshot() is snapshot
+    assert snapshot.source_path == str(path) and snapshot.source_mtime == os.stat(path).st_mtime
+    after = get_template("중립")
+    assert after is snapshot.templates["중립"] and after is not before
+    assert after.category_rates["투자"] == 11.5
+    assert after.weighted_annual_return > before.weighted_annual_return
+    # 교체 전에 받은 템플릿은 그대로 (처리 중인 요청은 이전 버전으로 끝남)
+    assert before.category_rates["투자"] == CATEGORY_RATES["투자"]
@@ -0,0 +1,25 @@
+import numpy as np
+
+from backend.projection import _simulate_summary, _simulate_yearly_values, simulate_projection
+
+ARGS = ((1000.0, 2000.0, 500.0, 300.0), (4.0, 6.0, 8.0, 3.0), (5.0, 15.0, 20.0, 2.0))
+
+
+def test_shorter_horizon_is_prefix_of_longer_one():
+    # 요청한 기간만 시뮬레이션해도 같은 시드면 앞 구간 경로가 같아야 함
+    long = _simulate_yearly_values(*ARGS, 10.0, 20, 500, 7)
+    short = _simulate_yearly_values(*ARGS, 10.0, 5, 500, 7)
+    assert short.shape == (500, 6)
+    np.testing.assert_array_equal(long[:, :6], short)
+
+
+def test_only_summary_is_cached():
+    _simulate_summary.cache_clear()
+    first = simulate_projection(*ARGS, 5, 10.0, 5000.0, 500, 7)
+    second = simulate_projection(*ARGS, 5, 10.0, 5000.0, 500, 7)
+    assert first == second
+    assert _simulate_summary.cache_info().hits == 1
+    p10, p50, p90, probability = _simulate_summary(*ARGS, 10.0, 5000.0, 5, 500, 7)
+    assert len(p50) == 6 and all(isinstance(v, float) for v in p10 + p50 + p90)
+    assert p10[-1] <= p50[-1] <= p90[-1]
+    assert 0.0 <= probability <= 1.0
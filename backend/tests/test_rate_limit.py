@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from backend import main
+from backend.rate_limit import RateLimiter, client_key
+from backend.report_cache import ReportCache, SingleFlight
+
+
+def _request(client_host, forwarded=None):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "headers": headers, "client": (client_host, 1234)})
+
+
+def test_client_key_uses_last_forwarded_hop_only_when_trusted():
+    request = _request("10.0.0.1", "1.1.1.1, 203.0.113.7")
+    assert client_key(request) == "10.0.0.1"
+    assert client_key(request, trust_forwarded=True) == "203.0.113.7"
+    assert client_key(_request("10.0.0.1"), trust_forwarded=True) == "10.0.0.1"
+
+
+def test_token_bucket_allows_burst_then_reports_wait():
+    limiter = RateLimiter(rate_per_minute=60, burst=2)
+    assert limiter.acquire("a") is None
+    assert limiter.acquire("a") is None
+    wait = limiter.acquire("a")
+    assert wait is not None and 0 < wait <= 1.0
+    assert limiter.acquire("b") is None  # 클라이언트마다 따로
+    assert limiter.stats() == {"allowed": 3, "limited": 1, "clients": 2}
+    assert RateLimiter(rate_per_minute=0, burst=1).acquire("a") is None
+
+
+def test_single_flight_shares_one_run_and_its_error():
+    flights = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return b"pdf"
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        results = await asyncio.gather(*(flights.run("k", work) for _ in range(5)))
+        assert not flights.is_running("k")
+        errors = await asyncio.gather(*(flights.run("e", failing) for _ in range(2)), return_exceptions=True)
+        return results, errors
+
+    results, errors = asyncio.run(scenario())
+    assert results == [b"pdf"] * 5 and len(calls) == 1
+    assert all(isinstance(e, ValueError) for e in errors)
+    assert flights.stats() == {"in_flight": 0, "started": 2, "shared": 5}
+
+
+def test_single_flight_survives_first_caller_cancelling():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def scenario():
+        first = asyncio.ensure_future(flights.run("k", work))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flights.run("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
+
+
+@pytest.fixture
+def pdf_endpoint(monkeypatch):
+    renders = []
+
+    async def fake_render(plan, fingerprint):
+        renders.append(fingerprint)
+        main.report_cache.put(fingerprint, b"%PDF-fake")
+        return b"%PDF-fake"
+
+    monkeypatch.setattr(main, "_ensure_pdf_available", lambda: None)
+    monkeypatch.setattr(main, "_render_and_cache", fake_render)
+    monkeypatch.setattr(main, "report_cache", ReportCache(max_bytes=1 << 20))
+    monkeypatch.setitem(main.rate_limiters, "report-pdf", RateLimiter(rate_per_minute=1, burst=1))
+    return renders
+
+
+def _plan_body(goal):
+    plan = main.generate_detailed_plan(main.PlanRequest(monthly_goal=goal, current_assets=50000, risk_level="중립"),
+                                       store=False)
+    return {"plan": plan.model_dump()}
+
+
+def test_report_pdf_charges_only_new_renders(pdf_endpoint):
+    client = TestClient(main.app)
+    first, second = _plan_body(300), _plan_body(400)
+    assert client.post("/api/report-pdf", json=first).status_code == 200
+    # 같은 플랜은 캐시 적중이라 토큰이 없어도 응답
+    assert client.post("/api/report-pdf", json=first).status_code == 200
+    limited = client.post("/api/report-pdf", json=second)
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) >= 1
+    assert len(pdf_endpoint) == 1
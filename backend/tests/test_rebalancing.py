@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from backend.rebalancing import BUY_AND_HOLD, build_strategies, simulate_rebalancing
+
+WEIGHTS = np.array([[0.5, 0.5]])
+INITIAL = np.array([1000.0])
+
+
+def _months(*first, months=12):
+    """앞 몇 달만 주어진 수익률이고 나머지 달은 0 인 (months, 2) 수익률"""
+    returns = np.zeros((months, 2))
+    returns[:len(first)] = first
+    return returns
+
+
+def test_build_strategies_names_and_order():
+    strategies = build_strategies([6, 3, 3], [5, 1])
+    assert [s.name for s in strategies] == [BUY_AND_HOLD, "calendar_3m", "calendar_6m",
+                                            "threshold_1pp", "threshold_5pp"]
+    assert strategies[1].period_months == 3 and strategies[3].band == pytest.approx(0.01)
+
+
+def test_same_return_everywhere_never_drifts():
+    strategies = build_strategies([1, 3], [1])
+    result = simulate_rebalancing(WEIGHTS, INITIAL, np.full((24, 2), 0.01), strategies, fee_rate=0.01, tax_rate=0.2)
+    # 주기형은 거래할 것이 없어도 주기마다 한 번씩 세고, 허용범위형은 한 번도 움직이지 않음
+    assert result["rebalances"][:, 0].tolist() == [0, 24, 8, 0]
+    np.testing.assert_allclose(result["fees"], 0.0)
+    np.testing.assert_allclose(result["taxes"], 0.0)
+    np.testing.assert_allclose(result["final_value"], 1000 * 1.01 ** 24)
+    np.testing.assert_allclose(result["annualized_return"], 1.01 ** 12 - 1)
+    np.testing.assert_allclose(result["annual_volatility"], 0.0, atol=1e-9)
+    np.testing.assert_allclose(result["drift_max"], 0.0, atol=1e-12)
+
+
+def test_one_move_fees_and_taxes_are_exact():
+    # 첫 달 A 만 +10%: A 550 / B 500, 합 1050 -> 25 를 A 에서 B 로 옮김
+    strategies = build_strategies([3], [1, 5])
+    result = simulate_rebalancing(WEIGHTS, INITIAL, _months((0.10, 0.0)), strategies, fee_rate=0.01, tax_rate=0.1)
+    gain = 25 - 500 * 25 / 550  # 판 25 중 원가를 넘는 부분
+    cost = 0.01 * 50 + 0.1 * gain
+
+    assert result["rebalances"][:, 0].tolist() == [0, 4, 1, 0]
+    np.testing.assert_allclose(result["fees"][:, 0], [0.0, 0.5, 0.5, 0.0])
+    np.testing.assert_allclose(result["taxes"][:, 0], [0.0, 0.1 * gain, 0.1 * gain, 0.0])
+    np.testing.assert_allclose(result["final_value"][:, 0], [1050.0, 1050 - cost, 1050 - cost, 1050.0])
+    # 편도 거래금액 25 를 평균 평가액으로 나눈 값 (1년)
+    np.testing.assert_allclose(result["annual_turnover"][0, 0], 0.0)
+    np.testing.assert_allclose(result["annual_turnover"][2, 0], 25 / (1050 - cost))
+    np.testing.assert_allclose(result["drift_max"][:, 0], 25 / 1050)
+
+
+def test_calendar_rebalance_waits_for_its_month():
+    # 3개월 주기는 세 번째 달 끝에야 거래하므로 그 사이의 움직임도 함께 반영됨
+    strategies = build_strategies([3], [])
+    returns = _months((0.10, 0.0), (0.0, 0.10), (0.10, 0.0))
+    result = simulate_rebalancing(WEIGHTS, INITIAL, returns, strategies, fee_rate=0.01)
+    a, b = 500 * 1.1 * 1.1, 500 * 1.1
+    np.testing.assert_allclose(result["fees"][1, 0], 0.01 * abs(a - b))
+    np.testing.assert_allclose(result["final_value"][1, 0], a + b - 0.01 * abs(a - b))
+    assert result["taxes"][1, 0] == 0.0
+
+
+def test_cost_basis_includes_bought_shares():
+    strategies = build_strategies([], [1])
+    tax_rate = 0.5
+    result = simulate_rebalancing(WEIGHTS, INITIAL, _months((0.10, 0.0), (0.0, 0.10)), strategies, tax_rate=tax_rate)
+
+    # 1달: A 550 중 25 매도, 이익 부분에만 과세. B 의 원가는 500 + 매수분 25
+    tax1 = tax_rate * (25 - 500 * 25 / 550)
+    keep = 1 - tax1 / 1050
+    value = basis_b = 525 * keep  # 세금은 평가액과 원가를 같은 비율로 줄임
+    # 2달: B 가 +10%. 매수분까지 포함한 원가 기준으로 차익 계산
+    b = value * 1.1
+    sold = (b - value) / 2
+    tax2 = tax_rate * (sold - basis_b * sold / b)
+    assert result["rebalances"][1, 0] == 2
+    np.testing.assert_allclose(result["taxes"][1, 0], tax1 + tax2)
+    np.testing.assert_allclose(result["final_value"][1, 0], value + b - tax2)
+
+
+def test_losses_are_not_taxed():
+    # 1달: A -10% -> 원가 그대로인 B 를 팔아 차익 0. 2달: B -10% -> 원가 525 인 A 를 475 에 팔아 손실
+    strategies = build_strategies([], [1])
+    result = simulate_rebalancing(WEIGHTS, INITIAL, _months((-0.10, 0.0), (0.0, -0.10)), strategies, tax_rate=0.5)
+    assert result["rebalances"][1, 0] == 2
+    assert result["taxes"][1, 0] == 0.0
+    np.testing.assert_allclose(result["final_value"][1, 0], 950 - 47.5)
@@ -0,0 +1,85 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.rate_limit import RateLimiter
+from backend.render_pool import RenderPool, RenderQueueFull
+
+
+def _fail():
+    raise ValueError("render failed")
+
+
+def test_stats_track_queue_depth_and_render_times():
+    pool = RenderPool(workers=0, queue_size=2, retry_after=3)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = [asyncio.ensure_future(pool.submit(release.wait, 5)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        stats = pool.stats()
+        assert (stats["in_flight"], stats["queue_depth"]) == (3, 2)
+        with pytest.raises(RenderQueueFull) as exc:
+            await pool.submit(time.sleep, 0)
+        assert exc.value.retry_after == 3
+        release.set()
+        await asyncio.gather(*blocked)
+        assert await pool.submit(lambda: "pdf") == "pdf"
+        with pytest.raises(ValueError):
+            await pool.submit(_fail)
+
+    asyncio.run(scenario())
+    stats = pool.stats()
+    assert stats["in_flight"] == 0 and stats["queue_depth"] == 0
+    assert (stats["completed"], stats["failed"], stats["rejected"]) == (4, 1, 1)
+    assert stats["render_seconds_max"] >= stats["render_seconds_avg"] > 0
+    assert stats["render_seconds_total"] == pytest.approx(stats["render_seconds_avg"] * 4, abs=1e-3)
+
+
+def test_cancelled_request_keeps_slot_until_worker_finishes():
+    pool = RenderPool(workers=1, queue_size=0)
+
+    async def scenario():
+        await pool.warm_up()
+        task = asyncio.ensure_future(pool.submit(time.sleep, 0.5))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # 워커는 아직 렌더 중이므로 슬롯을 차지하고 있고, 새 작업은 거절됨
+        assert pool.stats()["in_flight"] == 1
+        with pytest.raises(RenderQueueFull):
+            await pool.submit(time.sleep, 0)
+        deadline = time.monotonic() + 5
+        while pool.stats()["in_flight"]:
+            assert time.monotonic() < deadline
+            await asyncio.sleep(0.02)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    assert pool.stats()["completed"] == 1
+
+
+def test_full_render_queue_returns_503_with_retry_after(monkeypatch):
+    pool = RenderPool(workers=0, queue_size=0, retry_after=7)
+    pool._pending = pool.capacity  # 실행/대기 슬롯이 모두 찬 상태
+    monkeypatch.setattr(main, "render_pool", pool)
+    # 거절되므로 렌더는 하지 않지만, 폰트 확인(_ensure_pdf_available)은 통과해야 함
+    font = os.path.join(os.path.dirname(__file__), "fixtures", "ReportTestSans.ttf")
+    monkeypatch.setattr(main, "report_font_path", lambda: font)
+    monkeypatch.setitem(main.rate_limiters, "report-pdf", RateLimiter(rate_per_minute=0, burst=1))
+    plan = main.generate_detailed_plan(main.PlanRequest(monthly_goal=123.45, current_assets=6789, risk_level="중립"),
+                                       store=False)
+    client = TestClient(main.app)
+
+    response = client.post("/api/report-pdf", json={"plan": plan.model_dump()})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+    assert client.get("/api/report-render/stats").json()["rejected"] == 1
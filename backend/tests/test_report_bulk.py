@@ -0,0 +1,76 @@
+import asyncio
+import io
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.plan_store import PlanStore
+from backend.render_pool import RenderQueueFull
+
+
+class _FullRenderPool:
+    """항상 대기열이 가득 찬 렌더 풀"""
+
+    workers = 1
+
+    def __init__(self):
+        self.attempts = 0
+
+    async def submit(self, fn, *args):
+        self.attempts += 1
+        raise RenderQueueFull(0)
+
+
+def _plan(goal=300):
+    return main.generate_detailed_plan(main.PlanRequest(monthly_goal=goal, current_assets=50000, risk_level="중립"), store=False)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    plan_store = PlanStore(str(tmp_path / "plans.db"), encode=lambda plan: plan.model_dump_json(),
+                           decode=main.DetailedPlanResponse.model_validate_json, cache_size=1)
+    monkeypatch.setattr(main, "plan_store", plan_store)
+    yield plan_store
+    plan_store.close()
+
+
+def test_bulk_render_gives_up_after_max_wait(monkeypatch):
+    pool = _FullRenderPool()
+    monkeypatch.setattr(main, "render_pool", pool)
+    monkeypatch.setattr(main, "REPORT_BULK_MAX_WAIT", 0.05)
+    with pytest.raises(RenderQueueFull):
+        asyncio.run(main._render_for_bulk(_plan()))
+    assert pool.attempts > 1
+
+
+def test_bulk_zip_records_entry_that_never_got_a_render_slot(monkeypatch):
+    monkeypatch.setattr(main, "render_pool", _FullRenderPool())
+    monkeypatch.setattr(main, "REPORT_BULK_MAX_WAIT", 0.0)
+
+    async def collect():
+        return b"".join([chunk async for chunk in main._iter_bulk_zip([_plan()])])
+
+    archive = zipfile.ZipFile(io.BytesIO(asyncio.run(collect())))
+    assert archive.namelist() == ["HolinFlow_Report_0001.error.txt"]
+    assert archive.read("HolinFlow_Report_0001.error.txt").startswith(b"RenderQueueFull")
+
+
+def test_load_stored_plans_keeps_order_and_reads_db_misses(store):
+    plans = [_plan(goal) for goal in (100, 200, 300)]
+    for plan in plans:
+        store.put(plan.plan_id, plan)
+    store.flush()
+    # cache_size=1 이라 마지막 플랜만 메모리에 남고 나머지는 DB 에서 읽음
+    loaded = asyncio.run(main._load_stored_plans([plans[2].plan_id, plans[0].plan_id, plans[1].plan_id]))
+    assert [plan.plan_id for plan in loaded] == [plans[2].plan_id, plans[0].plan_id, plans[1].plan_id]
+    assert loaded[1] == plans[0]
+
+
+def test_bulk_requires_plans_or_plan_ids_and_rejects_unknown_ids(store, monkeypatch):
+    monkeypatch.setattr(main, "_ensure_pdf_available", lambda: None)
+    monkeypatch.setattr(main, "_check_rate_limit", lambda request, endpoint: None)
+    client = TestClient(main.app)
+    assert client.post("/api/report-bulk", json={}).status_code == 422
+    assert client.post("/api/report-bulk", json={"plan_ids": ["missing"]}).status_code == 404
@@ -0,0 +1,45 @@
+from pydantic import BaseModel
+
+from backend.report_cache import ReportCache, plan_fingerprint, seed_from_fingerprint
+
+
+class _Plan(BaseModel):
+    monthly_goal: float
+    report: dict
+
+
+def test_fingerprint_ignores_key_order():
+    a = _Plan(monthly_goal=300, report={"a": 1, "b": 2})
+    b = _Plan(monthly_goal=300, report={"b": 2, "a": 1})
+    assert plan_fingerprint(a) == plan_fingerprint(b)
+    assert plan_fingerprint(a) != plan_fingerprint(_Plan(monthly_goal=301, report={"a": 1, "b": 2}))
+    assert seed_from_fingerprint(plan_fingerprint(a)) == seed_from_fingerprint(plan_fingerprint(b))
+
+
+def test_cache_evicts_least_recently_used_by_bytes():
+    cache = ReportCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    assert cache.get("a") == b"1234"  # a 를 최근 사용으로
+    cache.put("c", b"1234")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234"
+    assert cache.get("c") == b"1234"
+    assert cache.size_bytes == 8
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_cache_skips_entries_larger_than_limit():
+    cache = ReportCache(max_bytes=4)
+    cache.put("big", b"12345")
+    assert cache.get("big") is None
+    assert len(cache) == 0
+
+
+def test_cache_replaces_existing_entry_size():
+    cache = ReportCache(max_bytes=10)
+    cache.put("a", b"12345678")
+    cache.put("a", b"12")
+    assert cache.size_bytes == 2
+    cache.clear()
+    assert cache.size_bytes == 0 and len(cache) == 0
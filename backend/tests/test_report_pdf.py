@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+pytest.importorskip("fpdf")
+
+from fpdf import FPDF
+from fpdf.template import FlexTemplate
+
+from backend import main, report_pdf
+
+# 리포트에 쓰이는 글자만 남긴 NanumGothic 부분 폰트 (OFL, tests/fixtures/OFL.txt)
+FONT_FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "ReportTestSans.ttf")
+
+
+def _inputs():
+    plan = main.generate_detailed_plan(main.PlanRequest(monthly_goal=300, current_assets=50000, risk_level="중립"),
+                                       store=False)
+    return main._prepare_report_inputs(plan)
+
+
+def test_skeleton_has_a_value_cell_per_summary_row():
+    elements = report_pdf._skeleton_elements("Helvetica")
+    assert report_pdf._skeleton_elements("Helvetica") is elements  # 폰트별로 한 번만 생성
+    template = FlexTemplate(FPDF(), list(elements))
+    for _, key in report_pdf._SUMMARY_ROWS:
+        assert key in template
+    assert max(e["y2"] for e in elements) == report_pdf._SKELETON_BOTTOM
+
+
+def _clear_font_caches():
+    report_pdf.report_font_path.cache_clear()
+    report_pdf._font_cache.cache_clear()
+
+
+@pytest.fixture
+def font(monkeypatch):
+    """테스트 폰트로 렌더 (설치된 폰트와 무관하게 항상 실행, 프로세스 폰트 캐시는 전후로 비움)"""
+    monkeypatch.setenv("PDF_FONT_PATH", FONT_FIXTURE)
+    monkeypatch.setattr(report_pdf, "_attach_failed", False)
+    _clear_font_caches()
+    yield report_pdf._font_cache()
+    _clear_font_caches()
+
+
+def test_render_report_pdf(font):
+    pdf_bytes = report_pdf.render_report_pdf(*_inputs())
+    assert pdf_bytes.startswith(b"%PDF-")
+    assert b"ReportTestSans" in pdf_bytes
+    assert not report_pdf._attach_failed  # 미리 파싱한 폰트 붙이기 경로로 렌더
+
+
+def test_attached_font_has_every_report_glyph(font, monkeypatch):
+    attached = []
+    original = report_pdf._ParsedFont.attach
+
+    def recording_attach(self, pdf):
+        original(self, pdf)
+        attached.append(pdf.fonts[report_pdf.FONT_FAMILY.lower()])
+
+    monkeypatch.setattr(report_pdf._ParsedFont, "attach", recording_attach)
+    report_pdf.render_report_pdf(*_inputs())
+    assert len(attached) == 1 and attached[0].missing_glyphs == []
+
+
+def test_font_cache_uses_full_font_only_for_characters_outside_subset(font):
+    assert font.for_text(map(ord, "월 목표 만원 ABC")) is font.subset
+    assert font.for_text([0x2603]) is font.full  # 부분 폰트에 없는 글자
+    assert font.subset.charset <= font.full.charset
+
+
+def test_documents_do_not_share_font_state(font):
+    prototype = font.subset.prototype
+    used_before = len(prototype.subset)
+    for _ in range(2):
+        assert report_pdf.render_report_pdf(*_inputs()).startswith(b"%PDF-")
+    # 문서마다 새 SubsetMap / ttfont 를 쓰므로 공유 원본은 그대로
+    assert len(prototype.subset) == used_before and prototype.missing_glyphs == []
+
+
+def test_attach_failure_falls_back_to_add_font(font, monkeypatch):
+    def broken_attach(self, pdf):
+        raise KeyError("internal layout changed")
+
+    monkeypatch.setattr(report_pdf._ParsedFont, "attach", broken_attach)
+    monkeypatch.setattr(report_pdf, "_attach_failed", False)
+    pdf_bytes = report_pdf.render_report_pdf(*_inputs())
+    assert pdf_bytes.startswith(b"%PDF-")
+    assert report_pdf._attach_failed
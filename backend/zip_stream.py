@@ -0,0 +1,54 @@
+"""
+zip_stream.py - 메모리에 쌓지 않고 흘려보내는 ZIP 작성기
+
+zipfile 은 seek 할 수 없는 출력에 쓰면 각 항목 뒤에 data descriptor 를 붙이는 방식으로
+동작합니다. 출력 버퍼를 항목마다 비워 내보내므로 메모리 사용량은 항목 하나 크기로 일정합니다.
+"""
+import time
+import zipfile
+
+
+class _DrainBuffer:
+    """write 만 지원하는 출력 (tell/seek 이 없어 zipfile 이 스트리밍 모드로 씀)"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ZipStream:
+    """
+    zs = ZipStream()
+    yield zs.add("a.pdf", pdf_bytes)
+    yield zs.close()
+    """
+
+    def __init__(self, compression: int = zipfile.ZIP_STORED):
+        self._buffer = _DrainBuffer()
+        self._zip = zipfile.ZipFile(self._buffer, mode="w", compression=compression)
+        self.entries = 0
+
+    def add(self, name: str, data: bytes) -> bytes:
+        """항목 하나를 쓰고 그동안 만들어진 ZIP 바이트를 반환"""
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.compress_type = self._zip.compression
+        with self._zip.open(info, mode="w") as entry:
+            entry.write(data)
+        self.entries += 1
+        return self._buffer.drain()
+
+    def close(self) -> bytes:
+        """중앙 디렉터리를 쓰고 남은 바이트 반환"""
+        self._zip.close()
+        return self._buffer.drain()
@@ -1,4 +1,4 @@
-import { useState } from 'react'
+import { useEffect, useState } from 'react'
 import {
   Area,
   AreaChart,
@@ -8,7 +8,8 @@ import {
   XAxis,
   YAxis,
 } from 'recharts'
-import type { DetailedPlanResponse } from '../types'
+import type { DetailedPlanResponse, ProjectionResponse } from '../types'
+import { fetchProjection } from '../utils/api'
 
 interface ProjectionPageProps {
   result: DetailedPlanResponse
@@ -18,6 +19,23 @@ interface ProjectionPageProps {
 
 export default function ProjectionPage({ result, onBackToResult, onReset }: ProjectionPageProps) {
   const [projectionYears, setProjectionYears] = useState<number>(10)
+  const [projection, setProjection] = useState<ProjectionResponse | null>(null)
+
+  // 슬라이더를 멈춘 뒤 한 번만 요청 (이전 기간의 늦은 응답은 무시)
+  useEffect(() => {
+    let cancelled = false
+    const timer = window.setTimeout(() => {
+      fetchProjection(result, projectionYears)
+        .then((data) => {
+          if (!cancelled) setProjection(data)
+        })
+        .catch((err) => console.error('Projection error:', err))
+    }, 200)
+    return () => {
+      cancelled = true
+      window.clearTimeout(timer)
+    }
+  }, [result, projectionYears])
 
   const buildProjectionSeries = (data: DetailedPlanResponse, years: number) => {
     const annualRate = data.report.weighted_annual_return / 100
@@ -31,12 +49,19 @@ export default function ProjectionPage({ result, onBackToResult, onReset }: Proj
 
   const formatWan = (value: number) => `${Number(value).toLocaleString()}만원`
 
-  const series = buildProjectionSeries(result, projectionYears)
-  const labelStep = Math.max(1, Math.ceil(series.length / 8))
-  const chartData = series.map((point) => ({
-    year: `${point.year}년`,
-    value: Number(point.value.toFixed(0)),
-  }))
+  // 서버 몬테카를로 결과(중앙값 + p10~p90 구간)가 없거나 아직 이전 기간이면 기대수익률 복리로 표시
+  const simulated = projection && projection.years.length === projectionYears + 1 ? projection : null
+  const chartData = simulated
+    ? simulated.years.map((year, index) => ({
+        year: `${year}년`,
+        value: simulated.p50[index],
+        range: [simulated.p10[index], simulated.p90[index]],
+      }))
+    : buildProjectionSeries(result, projectionYears).map((point) => ({
+        year: `${point.year}년`,
+        value: Number(point.value.toFixed(0)),
+      }))
+  const labelStep = Math.max(1, Math.ceil(chartData.length / 8))
   const yearTicks = chartData
     .filter((_, index) => index % labelStep === 0 || index === chartData.length - 1)
     .map((point) => point.year)
@@ -96,12 +121,27 @@ export default function ProjectionPage({ result, onBackToResult, onReset }: Proj
               tick={{ fontSize: 11 }}
             />
             <Tooltip
-              formatter={(value) => formatWan(Number(value))}
+              formatter={(value) =>
+                Array.isArray(value)
+                  ? `${formatWan(Number(value[0]))} ~ ${formatWan(Number(value[1]))}`
+                  : formatWan(Number(value))
+              }
               labelFormatter={(label) => label}
             />
+            {simulated && (
+              <Area
+                type="monotone"
+                dataKey="range"
+                name="p10~p90"
+                stroke="none"
+                fill="#38bdf8"
+                fillOpacity={0.2}
+              />
+            )}
             <Area
               type="monotone"
               dataKey="value"
+              name={simulated ? '중앙값' : '예상'}
               stroke="#1d4ed8"
               strokeWidth={3}
               fill="url(#projectionFill)"
@@ -121,8 +161,14 @@ export default function ProjectionPage({ result, onBackToResult, onReset }: Proj
         </div>
         <div>
           <span>{projectionYears}년 후 예상</span>
-          <strong>{formatWan(Math.round(buildProjectionSeries(result, projectionYears)[projectionYears].value))}</strong>
+          <strong>{formatWan(Math.round(Number(chartData[chartData.length - 1].value)))}</strong>
         </div>
+        {simulated && (
+          <div>
+            <span>목표 달성 확률</span>
+            <strong>{(simulated.probability_reaching_goal * 100).toFixed(0)}%</strong>
+          </div>
+        )}
       </div>
     </section>
   )
@@ -1,6 +1,6 @@
 import { useState } from 'react'
 import type { DetailedPlanResponse } from '../types'
-import { downloadPdf, sendEmail } from '../utils/api'
+import { RateLimitError, downloadPdf, sendEmail, waitForEmail } from '../utils/api'
 
 interface ResultPageProps {
   result: DetailedPlanResponse
@@ -14,6 +14,8 @@ export default function ResultPage({ result, onBack, onReset, onViewProjection }
   const [emailAddress, setEmailAddress] = useState<string>('')
   const [emailLoading, setEmailLoading] = useState<boolean>(false)
   const [emailSuccess, setEmailSuccess] = useState<string>('')
+  const [emailError, setEmailError] = useState<string>('')
+  const [pdfLoading, setPdfLoading] = useState<boolean>(false)
 
   const getCategoryColor = (category: string): string => {
     const colors: { [key: string]: string } = {
@@ -30,27 +32,51 @@ export default function ResultPage({ result, onBack, onReset, onViewProjection }
   }
 
   const handleDownloadPdf = async () => {
+    // 생성 중 다시 누르면 같은 PDF 를 또 요청하지 않음
+    if (pdfLoading) return
+    setPdfLoading(true)
     try {
       await downloadPdf(result)
     } catch (err) {
-      alert('PDF 다운로드 중 오류가 발생했습니다.')
+      alert(err instanceof RateLimitError ? err.message : 'PDF 다운로드 중 오류가 발생했습니다.')
       console.error('PDF error:', err)
+    } finally {
+      setPdfLoading(false)
     }
   }
 
   const handleSendEmail = async () => {
+    if (emailLoading) return
     if (!emailAddress) {
       alert('이메일 주소를 입력하세요.')
       return
     }
     setEmailLoading(true)
     setEmailSuccess('')
+    setEmailError('')
+    let queued = false
     try {
-      await sendEmail(emailAddress, result)
-      setEmailSuccess('이메일이 성공적으로 발송되었습니다.')
+      // 서버는 발송 큐에 등록만 하고 바로 응답하므로, 결과는 상태를 조회해 표시
+      const job = await sendEmail(emailAddress, result)
+      queued = true
+      setEmailSuccess('이메일 발송을 요청했습니다. 발송 결과를 확인하는 중입니다...')
       setEmailAddress('')
+      const finished = await waitForEmail(job.job_id)
+      if (finished.status === 'sent') {
+        setEmailSuccess('이메일이 발송되었습니다.')
+      } else if (finished.status === 'failed') {
+        setEmailSuccess('')
+        setEmailError(`이메일 발송에 실패했습니다.${finished.error ? ` (${finished.error})` : ''}`)
+      } else {
+        setEmailSuccess('이메일 발송 대기 중입니다. 잠시 후 메일함을 확인하세요.')
+      }
     } catch (err) {
-      alert('이메일 전송 중 오류가 발생했습니다. SMTP 설정을 확인하세요.')
+      if (queued) {
+        // 등록은 됐지만 상태 조회가 실패한 경우 (발송은 서버에서 계속 진행)
+        setEmailSuccess('이메일 발송을 요청했습니다. 잠시 후 메일함을 확인하세요.')
+      } else {
+        alert(err instanceof RateLimitError ? err.message : '이메일 전송 중 오류가 발생했습니다. SMTP 설정을 확인하세요.')
+      }
       console.error('Email error:', err)
     } finally {
       setEmailLoading(false)
@@ -107,8 +133,8 @@ export default function ResultPage({ result, onBack, onReset, onViewProjection }
             추가 추천 종목(3개), 배당 상세 정보, AI 투자 의견 및 시장 의견이 포함된 PDF 리포트를 다운로드하거나 이메일로 받을 수 있습니다.
           </p>
           <div className="report-actions">
-            <button className="btn-primary" onClick={handleDownloadPdf}>
-              📥 PDF 다운로드
+            <button className="btn-primary" onClick={handleDownloadPdf} disabled={pdfLoading}>
+              {pdfLoading ? '생성 중...' : '📥 PDF 다운로드'}
             </button>
             <div className="email-group">
               <input
@@ -128,6 +154,7 @@ export default function ResultPage({ result, onBack, onReset, onViewProjection }
             </div>
           </div>
           {emailSuccess && <div className="success-message">{emailSuccess}</div>}
+          {emailError && <div className="error-message">{emailError}</div>}
         </div>
 
         <div className="allocation-section">
@@ -28,6 +28,32 @@ export interface DetailedPlanResponse {
     required_total_assets: number
     required_additional_assets: number
     weighted_annual_return: number
+    risk_level?: string
+    allocation_strategy?: 'optimized'
+    target_annual_return?: number | null
+    target_reachable?: boolean
+    portfolio_volatility?: number
+    catalog_version?: string
   }
   assets: AssetCategory[]
+  plan_id?: string
+}
+
+// /api/report-email 은 발송 큐에 등록만 하고 job_id 로 상태를 조회
+export interface EmailJob {
+  job_id: string
+  status: 'queued' | 'sending' | 'retrying' | 'sent' | 'failed'
+  error?: string | null
+}
+
+export interface ProjectionResponse {
+  years: number[]
+  p10: number[]
+  p50: number[]
+  p90: number[]
+  expected: number[]
+  required_total_assets: number
+  probability_reaching_goal: number
+  paths: number
+  seed: number
 }
@@ -1,4 +1,4 @@
-import type { DetailedPlanResponse } from '../types'
+import type { DetailedPlanResponse, EmailJob, ProjectionResponse } from '../types'
 
 const getAPIBaseUrl = (): string => {
   const hostname = window.location.hostname
@@ -30,15 +30,55 @@ export const generatePlan = async (
   return response.json()
 }
 
-export const downloadPdf = async (plan: DetailedPlanResponse): Promise<void> => {
-  const apiUrl = `${getAPIBaseUrl()}/api/report-pdf`
-  const response = await fetch(apiUrl, {
+// 서버에 저장된 플랜은 plan_id 만 전송 (서버 저장소에 없으면 404 -> 플랜 전체로 재시도)
+const postReport = async (url: string, plan: DetailedPlanResponse, extra: Record<string, unknown>,
+  headers: Record<string, string> = {}): Promise<Response> => {
+  const send = (body: Record<string, unknown>) => fetch(url, {
     method: 'POST',
-    headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify({ plan })
+    headers: { 'Content-Type': 'application/json', ...headers },
+    body: JSON.stringify({ ...extra, ...body })
   })
-  if (!response.ok) throw new Error('PDF 생성 실패')
-  const blob = await response.blob()
+  if (plan.plan_id) {
+    const response = await send({ plan_id: plan.plan_id })
+    if (response.status !== 404) return response
+  }
+  return send({ plan })
+}
+
+// 요청 제한(429)에 걸리면 Retry-After 를 안내 문구로 전달
+export class RateLimitError extends Error {
+  retryAfter: number
+
+  constructor(retryAfter: number) {
+    super(`요청이 너무 많습니다. ${retryAfter}초 후 다시 시도하세요.`)
+    this.retryAfter = retryAfter
+  }
+}
+
+const throwIfRateLimited = (response: Response): void => {
+  if (response.status === 429) {
+    throw new RateLimitError(Number(response.headers.get('Retry-After')) || 1)
+  }
+}
+
+// 마지막으로 받은 PDF (서버 ETag 가 같으면 304 응답 후 재사용)
+let cachedPdf: { etag: string; blob: Blob } | null = null
+
+export const downloadPdf = async (plan: DetailedPlanResponse): Promise<void> => {
+  const apiUrl = `${getAPIBaseUrl()}/api/report-pdf`
+  const headers: Record<string, string> = {}
+  if (cachedPdf) headers['If-None-Match'] = cachedPdf.etag
+  const response = await postReport(apiUrl, plan, {}, headers)
+  let blob: Blob
+  if (response.status === 304 && cachedPdf) {
+    blob = cachedPdf.blob
+  } else {
+    throwIfRateLimited(response)
+    if (!response.ok) throw new Error('PDF 생성 실패')
+    blob = await response.blob()
+    const etag = response.headers.get('ETag')
+    cachedPdf = etag ? { etag, blob } : null
+  }
   const url = window.URL.createObjectURL(blob)
   const a = document.createElement('a')
   a.href = url
@@ -47,15 +87,46 @@ export const downloadPdf = async (plan: DetailedPlanResponse): Promise<void> =>
   window.URL.revokeObjectURL(url)
 }
 
+// 발송 큐에 등록 (202). 실제 발송 결과는 waitForEmail 로 확인
 export const sendEmail = async (
   email: string,
   plan: DetailedPlanResponse
-): Promise<void> => {
+): Promise<EmailJob> => {
   const apiUrl = `${getAPIBaseUrl()}/api/report-email`
+  const response = await postReport(apiUrl, plan, { email })
+  throwIfRateLimited(response)
+  if (!response.ok) throw new Error('이메일 전송 실패')
+  return response.json()
+}
+
+const EMAIL_POLL_INTERVAL_MS = 2000
+// 서버 재시도(2, 4, 8초 대기)가 끝날 때까지 충분히 기다림
+const EMAIL_POLL_TIMEOUT_MS = 60000
+
+// sent / failed 가 될 때까지 상태 조회. 시간 안에 끝나지 않으면 마지막 상태(queued/retrying 등) 반환
+export const waitForEmail = async (jobId: string): Promise<EmailJob> => {
+  const apiUrl = `${getAPIBaseUrl()}/api/report-email/${encodeURIComponent(jobId)}`
+  const deadline = Date.now() + EMAIL_POLL_TIMEOUT_MS
+  for (;;) {
+    const response = await fetch(apiUrl)
+    if (!response.ok) throw new Error('이메일 상태 조회 실패')
+    const job: EmailJob = await response.json()
+    if (job.status === 'sent' || job.status === 'failed' || Date.now() >= deadline) return job
+    await new Promise((resolve) => setTimeout(resolve, EMAIL_POLL_INTERVAL_MS))
+  }
+}
+
+export const fetchProjection = async (
+  plan: DetailedPlanResponse,
+  years: number,
+  monthlyContribution = 0
+): Promise<ProjectionResponse> => {
+  const apiUrl = `${getAPIBaseUrl()}/api/projection`
   const response = await fetch(apiUrl, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify({ email, plan })
+    body: JSON.stringify({ plan, years, monthly_contribution: monthlyContribution })
   })
-  if (!response.ok) throw new Error('이메일 전송 실패')
+  if (!response.ok) throw new Error('예측 계산 실패')
+  return response.json()
 }